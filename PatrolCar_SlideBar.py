@@ -8,84 +8,9 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import QTimer, Qt
 
-CONFIG_FILE = "can_config.json"
-
-class CANParser:
-    """
-    CAN 메시지를 파싱하여 사람이 읽을 수 있는 형태로 변환하는 클래스.
-    """
-    def __init__(self):
-        pass
+from can_codec import CANParser
 
-    def parse(self, can_id, data):
-        """
-        주어진 CAN ID와 데이터에 따라 메시지를 파싱합니다.
-        """
-        parsed = {}
-        # 0x303: 차량 기어, 주행 상태 모드, 차량 속도 요청
-        if can_id == 0x303:
-            if len(data) >= 4: # 데이터 길이 확인
-                vehicle_gear = data[0] & 0x03
-                parsed['Vehicle Gear'] = ["P Gear", "D Gear", "N Gear", "R Gear"][vehicle_gear]
-                drive_state_mode = data[1] & 0x03
-                parsed['Drive_State_Mode'] = ["Remote Control Mode", "Represents the AD Mode",
-                                              "Indicates parallel Mode", "Indicates semi-autonomous"][drive_state_mode]
-                vcu_speed_req = int.from_bytes(data[2:4], byteorder='little') * 0.1 - 80
-                parsed['Vehicle Speed Request (km/h)'] = f"{vcu_speed_req:.1f}"
-
-        # 0x314: 방향각, EPS 제어 상태
-        elif can_id == 0x314:
-            if len(data) >= 3: # 데이터 길이 확인
-                directional_angle = int.from_bytes(data[1:3], byteorder='little')
-                parsed['Direction Angle (deg)'] = f"{directional_angle}"
-                parsed['eps Control'] = "Works" if data[0] & 0x01 else "Stops"
-
-        # 0x304: 차량 속도, 휠 엔드 각도, 브레이크 압력
-        elif can_id == 0x304:
-            if len(data) >= 6: # 데이터 길이 확인
-                speed = int.from_bytes(data[0:2], byteorder='little') * 0.1 - 80
-                parsed['Vehicle Speed (km/h)'] = f"{speed:.1f}"
-                parsed['Vehicle Wheel End Angle (deg)'] = f"{int.from_bytes(data[4:6], 'little') * 0.1 - 35:.1f}"
-                parsed['Vehicle Break Pressure (Mps)'] = f"{int.from_bytes(data[2:4], 'little') * 0.01:.2f}"
-
-        # 0x301: 라이트, 스위치 상태
-        elif can_id == 0x301:
-            if len(data) >= 6: # 데이터 길이 확인
-                parsed['Brake Light'] = "ON" if data[5] & 0x01 else "OFF"
-                parsed['Head Light'] = "ON" if data[1] & 0x80 else "OFF"
-                parsed['Emergency Button'] = "Pressed" if data[0] & 0x01 else "Not Pressed"
-                parsed['Back Touch Switch State'] = "trigger" if data[1] & 0x20 else "Not trigger"
-                parsed['Front Touch Switch State'] = "trigger" if data[1] & 0x10 else "Not trigger"
-
-        # 0x18F: EPS 현재 각도, ECU 온도
-        elif can_id == 0x18F:
-            if len(data) >= 7: # 데이터 길이 확인
-                parsed['EPS_Current_Angle (deg)'] = str(int.from_bytes(data[1:3], 'little', signed=True))
-                parsed['EPS_ECU_Temperature (℃)'] = str(int.from_bytes(data[6:7], 'little', signed=True))
-
-        # 0x060: 버스 전압, 버스 전류
-        elif can_id == 0x060:
-            if len(data) >= 4: # 데이터 길이 확인
-                parsed['BUS Voltage (V)'] = f"{int.from_bytes(data[0:2], 'little') * 0.1:.2f}"
-                parsed['BUS Current (A)'] = f"{int.from_bytes(data[2:4], 'little') * 0.1 - 1000:.2f}"
-
-        # 0x160: 드라이브 모드, MCU 브레이크 요청, MCU 속도/토크 요청
-        elif can_id == 0x160:
-            if len(data) >= 6: # 데이터 길이 확인
-                mode = (data[0] & 0x06) >> 1
-                parsed['Drive Mode'] = ["Torque", "Speed", "Torque ring", "Speed loop"][mode]
-                parsed['MCU_Brake_Request'] = "Hold brake" if data[0] & 0x08 else "Release"
-                parsed['MCU Speed Request (RPM)'] = str(int.from_bytes(data[3:6], 'little') - 7000)
-                parsed['MCU Torque Request (Nm)'] = f"{int.from_bytes(data[1:3], 'little') * 0.1 - 1000:.1f}"
-
-        # 0x0A0: BMS 배터리 SOH, SOC, 전압
-        elif can_id == 0x0A0:
-            if len(data) >= 8: # 데이터 길이 확인
-                parsed['BMS Battery SOH (%)'] = str(data[7])
-                parsed['BMS Battery SOC (%)'] = f"{data[4] * 0.4:.2f}"
-                parsed['BMS Battery Voltage (V)'] = f"{int.from_bytes(data[2:4], 'little') * 0.1:.2f}"
-
-        return parsed
+CONFIG_FILE = "can_config.json"
 
 class MainWindow(QMainWindow):
     """
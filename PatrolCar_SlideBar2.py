@@ -2,90 +2,33 @@ import sys
 import time
 import can
 import json
+import logging
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
-    QLabel, QHBoxLayout, QPushButton, QMessageBox, QLineEdit, QSlider
+    QLabel, QHBoxLayout, QPushButton, QMessageBox, QLineEdit, QSlider, QTabWidget,
+    QFileDialog, QCheckBox
 )
-from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtCore import QTimer, Qt, QEvent
+
+from can_codec import CANParser
+from can_trace import TraceStore, TraceView
+from can_filter import compile_filter
+from can_highlight import ByteChangeTracker, ByteChangeDelegate
+from can_analysis import AnalysisPanel
+from can_latency import LatencyPanel
+from can_dashboard import Dashboard
+from ui_governor import RefreshGovernor
+from drive_control import DriveController
+from can_tx import TransmitQueue
+from can_bulk import load_frame_list, BulkTransmitter
+from can_export import SignalExportThread
+from can_plot import PlotViewer
+from can_capture import CaptureRing, default_triggers
+from can_alarm import AlarmEngine
+from drive_script import load_drive_script, DriveScriptPlayer
 
 CONFIG_FILE = "can_config.json"
-
-class CANParser:
-    """
-    CAN 메시지를 파싱하여 사람이 읽을 수 있는 형태로 변환하는 클래스.
-    """
-    def __init__(self):
-        pass
-
-    def parse(self, can_id, data):
-        """
-        주어진 CAN ID와 데이터에 따라 메시지를 파싱합니다.
-        """
-        parsed = {}
-        # 0x303: 차량 기어, 주행 상태 모드, 차량 속도 요청
-        if can_id == 0x303:
-            if len(data) >= 4: # 데이터 길이 확인
-                vehicle_gear = data[0] & 0x03
-                parsed['Vehicle Gear'] = ["P Gear", "D Gear", "N Gear", "R Gear"][vehicle_gear]
-                drive_state_mode = data[1] & 0x03
-                parsed['Drive_State_Mode'] = ["Remote Control Mode", "Represents the AD Mode",
-                                              "Indicates parallel Mode", "Indicates semi-autonomous"][drive_state_mode]
-                vcu_speed_req = int.from_bytes(data[2:4], byteorder='little') * 0.1 - 80
-                parsed['Vehicle Speed Request (km/h)'] = f"{vcu_speed_req:.1f}"
-
-        # 0x314: 방향각, EPS 제어 상태
-        elif can_id == 0x314:
-            if len(data) >= 3: # 데이터 길이 확인
-                directional_angle = int.from_bytes(data[1:3], byteorder='little')
-                parsed['Direction Angle (deg)'] = f"{directional_angle}"
-                parsed['eps Control'] = "Works" if data[0] & 0x01 else "Stops"
-
-        # 0x304: 차량 속도, 휠 엔드 각도, 브레이크 압력
-        elif can_id == 0x304:
-            if len(data) >= 6: # 데이터 길이 확인
-                speed = int.from_bytes(data[0:2], byteorder='little') * 0.1 - 80
-                parsed['Vehicle Speed (km/h)'] = f"{speed:.1f}"
-                parsed['Vehicle Wheel End Angle (deg)'] = f"{int.from_bytes(data[4:6], 'little') * 0.1 - 35:.1f}"
-                parsed['Vehicle Break Pressure (Mps)'] = f"{int.from_bytes(data[2:4], 'little') * 0.01:.2f}"
-
-        # 0x301: 라이트, 스위치 상태
-        elif can_id == 0x301:
-            if len(data) >= 6: # 데이터 길이 확인
-                parsed['Brake Light'] = "ON" if data[5] & 0x01 else "OFF"
-                parsed['Head Light'] = "ON" if data[1] & 0x80 else "OFF"
-                parsed['Emergency Button'] = "Pressed" if data[0] & 0x01 else "Not Pressed"
-                parsed['Back Touch Switch State'] = "trigger" if data[1] & 0x20 else "Not trigger"
-                parsed['Front Touch Switch State'] = "trigger" if data[1] & 0x10 else "Not trigger"
-
-        # 0x18F: EPS 현재 각도, ECU 온도
-        elif can_id == 0x18F:
-            if len(data) >= 7: # 데이터 길이 확인
-                parsed['EPS_Current_Angle (deg)'] = str(int.from_bytes(data[1:3], 'little', signed=True))
-                parsed['EPS_ECU_Temperature (℃)'] = str(int.from_bytes(data[6:7], 'little', signed=True))
-
-        # 0x060: 버스 전압, 버스 전류
-        elif can_id == 0x060:
-            if len(data) >= 4: # 데이터 길이 확인
-                parsed['BUS Voltage (V)'] = f"{int.from_bytes(data[0:2], 'little') * 0.1:.2f}"
-                parsed['BUS Current (A)'] = f"{int.from_bytes(data[2:4], 'little') * 0.1 - 1000:.2f}"
-
-        # 0x160: 드라이브 모드, MCU 브레이크 요청, MCU 속도/토크 요청
-        elif can_id == 0x160:
-            if len(data) >= 6: # 데이터 길이 확인
-                mode = (data[0] & 0x06) >> 1
-                parsed['Drive Mode'] = ["Torque", "Speed", "Torque ring", "Speed loop"][mode]
-                parsed['MCU_Brake_Request'] = "Hold brake" if data[0] & 0x08 else "Release"
-                parsed['MCU Speed Request (RPM)'] = str(int.from_bytes(data[3:6], 'little') - 7000)
-                parsed['MCU Torque Request (Nm)'] = f"{int.from_bytes(data[1:3], 'little') * 0.1 - 1000:.1f}"
-
-        # 0x0A0: BMS 배터리 SOH, SOC, 전압
-        elif can_id == 0x0A0:
-            if len(data) >= 8: # 데이터 길이 확인
-                parsed['BMS Battery SOH (%)'] = str(data[7])
-                parsed['BMS Battery SOC (%)'] = f"{data[4] * 0.4:.2f}"
-                parsed['BMS Battery Voltage (V)'] = f"{int.from_bytes(data[2:4], 'little') * 0.1:.2f}"
-
-        return parsed
+log = logging.getLogger(__name__)
 
 class MainWindow(QMainWindow):
     """
@@ -94,13 +37,52 @@ class MainWindow(QMainWindow):
     # 슬라이더 스케일링을 위한 상수 정의
     SPEED_SLIDER_FACTOR = 10.0 # 10 = 0.1km/h 단위 (슬라이더 값 10 -> 1.0 km/h)
     ANGLE_SLIDER_FACTOR = 10.0  # 10 = 0.1도 단위 (슬라이더 값 10 -> 1.0 deg)
+    # 주행 명령 프레임 송신 순서 (0x501, 0x503, 0x502, 0x506, 0x504)
+    DRIVE_FRAME_IDS = (0x501, 0x503, 0x502, 0x506, 0x504)
+    READ_INTERVAL_MS = 20 # CAN 수신 주기 (화면 갱신 주기와 별개)
+    MAX_FRAMES_PER_READ = 1000 # 수신 한 번에 처리하는 최대 프레임 수
+    # 주행 제어 루프 기본값 (can_config.json의 같은 이름 키로 바꿀 수 있음)
+    DRIVE_RATE_HZ = 50 # 주행 명령 송신 주기 (Hz)
+    ACCEL_LIMIT = 5.0 # 가속 한계 (km/h/s)
+    DECEL_LIMIT = 10.0 # 감속 한계 (km/h/s)
+    STEER_RATE_LIMIT = 20.0 # 조향 속도 한계 (deg/s)
+    # 워치독: GUI가 이 시간 동안 응답하지 않거나 제어 루프가 이만큼 늦으면 속도 0 송신 (초)
+    GUI_DEADLINE = 0.5
+    LOOP_DEADLINE = 0.2
+    # 송신 큐 ID별 최대 송신 빈도 {CAN ID: Hz} (can_config.json의 tx_rate_limits: {"0x501": 100})
+    TX_RATE_LIMITS = {}
+    NOTICE_LINES = 20 # 워치독 정지/캡처 저장 실패 알림 창에 표시하는 최근 기록 수
+    # 트리거 캡처: 트리거 전/후 구간 (초), BUS 전류 트리거 한계 (A), 저장 폴더
+    # (can_config.json의 capture_triggers: {"이름": "필터 식"}로 트리거를 추가/변경)
+    CAPTURE_PRE_SECONDS = 10.0
+    CAPTURE_POST_SECONDS = 5.0
+    CAPTURE_CURRENT_LIMIT = 100.0
+    CAPTURE_DIR = "captures"
+    # 알람 규칙 (can_config.json의 alarm_rules 목록에서 같은 name이면 바꾸고 없으면 추가, 형식은 can_alarm 참고)
+    ALARM_RULES = [
+        {"name": "Emergency Button", "when": 'Emergency_Button == "Pressed"', "severity": "critical"},
+        {"name": "Low Battery", "when": "BMS_SOC < 20", "for": 2.0},
+        {"name": "BMS Timeout", "signal": "BMS_SOC", "stale": 1.0},
+    ]
 
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Withus CAN Monitor")
         self.resize(1200, 800)
-        self.interface_name = self._load_config()
+        self.config = self._load_config()
+        self.interface_name = self.config.get("interface", "can0")
+        # python-can 인터페이스 종류 (시뮬레이터와 프로세스 간 시험 시 "udp_multicast" 등)
+        self.bus_type = self.config.get("bustype", "socketcan")
         self.parser = CANParser()
+        # 수신/송신 프레임 시간순 기록 (최대 프레임 수를 넘으면 오래된 것부터 버림)
+        self.trace_store = TraceStore()
+        # Raw 테이블 바이트 변경 강조용 ID별 직전 페이로드/바이트별 변경 시각
+        self.byte_changes = ByteChangeTracker()
+        # 주행 명령 송신용 메시지는 ID별로 한 번만 만들고 data 버퍼를 재사용
+        self.drive_msgs = {
+            frame_id: can.Message(arbitration_id=frame_id, data=bytearray(8), is_extended_id=False)
+            for frame_id in self.DRIVE_FRAME_IDS
+        }
 
         self._setup_ui() # UI 설정 메서드 호출
         self._connect_signals_slots() # 시그널-슬롯 연결 메서드 호출
@@ -109,13 +91,49 @@ class MainWindow(QMainWindow):
         self.read_timer = QTimer()
         self.read_timer.timeout.connect(self._read_can_messages)
 
-        self.drive_timer = QTimer()
-        self.drive_timer.timeout.connect(self._send_repeated_drive_command)
-        # drive_timer의 주기를 더 짧게 변경 (예: 50ms 또는 100ms)
-        self.drive_timer.setInterval(100) # 100ms마다 반복 전송
-
-        self.current_speed = 0.0
-        self.current_angular = 0.0
+        # 화면 갱신은 측정된 갱신/그리기 비용에 따라 5~60Hz 사이에서 주기를 조절
+        self.governor = RefreshGovernor(min_hz=5, max_hz=60)
+        self.ui_timer = QTimer()
+        self.ui_timer.timeout.connect(self._refresh_ui)
+        self.status_time = 0.0 # 상태 표시줄 마지막 갱신 시각
+
+        # 주행 명령은 GUI 스레드가 아닌 고정 주기 제어 스레드가 송신
+        # 슬라이더는 목표값만 바꾸고, 송신 값은 가속/조향 속도 한계 안에서 목표를 따라감
+        self.drive_controller = DriveController(
+            self._send_drive_frame,
+            rate_hz=self.config.get("drive_rate_hz", self.DRIVE_RATE_HZ),
+            accel_limit=self.config.get("accel_limit", self.ACCEL_LIMIT),
+            decel_limit=self.config.get("decel_limit", self.DECEL_LIMIT),
+            steer_rate_limit=self.config.get("steer_rate_limit", self.STEER_RATE_LIMIT),
+            gui_deadline=self.config.get("gui_deadline", self.GUI_DEADLINE),
+            loop_deadline=self.config.get("loop_deadline", self.LOOP_DEADLINE),
+        )
+        # 모든 송신은 송신 큐를 거침 (연결 중에만 존재, 트레이스 기록은 GUI 스레드의 _read_can_messages에서)
+        self.tx_queue = None
+        self.script_steps = None # 불러온 주행 스크립트 단계 목록
+        self.script_player = None # 재생 중이거나 마지막으로 재생한 DriveScriptPlayer
+        self._update_script_buttons()
+        self.bulk_frames = None # 불러온 일괄 송신 프레임 목록
+        self.export_thread = None # 실행 중이거나 마지막으로 실행한 신호 내보내기 스레드
+        self.plot_viewers = [] # 열려 있는 기록 그래프 창
+        self.bulk_sender = None # 송신 중이거나 마지막으로 송신한 BulkTransmitter
+        self.notices = {} # 알림 종류 -> (모달리스 알림 창, 표시 중인 기록). 처음 알릴 때 만들어 재사용
+        self._update_bulk_buttons()
+        # 수신/송신 프레임을 링 버퍼에 계속 담아 두고 트리거가 걸리면 전/후 구간을 파일로 저장
+        self.capture = self._create_capture()
+        # 수신 주기마다 바뀐 신호만 알람 규칙으로 평가
+        self.alarms = self._create_alarms()
+        self.alarm_details = {} # 알람 중인 규칙 -> 발생 시점 신호 값 설명
+
+        # 테이블 행 조회용 인덱스 (행을 선형 탐색하지 않도록)
+        self.raw_rows = {} # CAN ID -> Raw 테이블 행 번호
+        self.raw_latest = {} # CAN ID -> 최신 can.Message
+        self.parsed_rows = {} # 신호 이름 -> 파싱 테이블 행 번호
+        self.parsed_values = {} # 신호 이름 -> 현재 표시 중인 값
+        self.frame_filter = None # Raw/Trace 뷰에 적용 중인 필터 (can_filter.FrameFilter)
+        self.pending_batch = {} # 수신 후 아직 뷰에 나눠 주지 않은 CAN ID별 최신 메시지
+        self.monitor_pending = {} # Monitor 탭에 아직 반영하지 않은 메시지 (탭이 가려진 동안 누적)
+        self.dashboard_pending = {} # Dashboard 탭에 아직 반영하지 않은 메시지
 
         # 초기값 설정 (슬라이더와 입력 필드 연동)
         self._update_speed_input_from_slider(self.speed_slider.value())
@@ -136,17 +154,38 @@ class MainWindow(QMainWindow):
         self.btn_connect = QPushButton("Connect CAN")
         self.btn_disconnect = QPushButton("Disconnect CAN")
         self.btn_clear = QPushButton("Clear Tables")
-        for btn in [self.btn_connect, self.btn_disconnect, self.btn_clear]:
+        self.btn_export = QPushButton("Export Signals")
+        self.btn_plot = QPushButton("Plot Recording")
+        self.btn_capture = QPushButton("Capture Now")
+        for btn in [self.btn_connect, self.btn_disconnect, self.btn_clear, self.btn_export, self.btn_plot,
+                    self.btn_capture]:
             btn_layout.addWidget(btn)
         layout.addLayout(btn_layout)
 
-        # Raw 데이터 및 파싱된 데이터 테이블
-        table_layout = QHBoxLayout()
+        # Raw/Trace 뷰 필터 (예: 18F, 314 / data "01 ?? ?? F1" / Vehicle_Speed > 10)
+        filter_layout = QHBoxLayout()
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText('Filter: 18F, 314 | 500-50F | data "01 ?? ?? F1" | Vehicle_Speed > 10 (Enter로 적용)')
+        filter_layout.addWidget(QLabel("Filter:"))
+        filter_layout.addWidget(self.filter_input)
+        layout.addLayout(filter_layout)
+
+        # 알람 중인 규칙 표시 (알람이 없으면 숨김)
+        self.alarm_label = QLabel()
+        self.alarm_label.setWordWrap(True)
+        self.alarm_label.hide()
+        layout.addWidget(self.alarm_label)
+
+        # Raw 데이터 및 파싱된 데이터 테이블 (Monitor 탭), 시간순 트레이스 (Trace 탭)
+        self.tabs = QTabWidget()
+        self.monitor_tab = QWidget()
+        table_layout = QHBoxLayout(self.monitor_tab)
         self.raw_table = QTableWidget(0, 3)
         self.raw_table.setHorizontalHeaderLabels(["CAN ID", "DLC", "Data"])
         self.raw_table.setColumnWidth(0, 100)
         self.raw_table.setColumnWidth(1, 50)
         self.raw_table.setColumnWidth(2, 200)
+        self.raw_table.setItemDelegateForColumn(2, ByteChangeDelegate(self.byte_changes, self.raw_table))
         table_layout.addWidget(self.raw_table)
 
         self.parsed_table = QTableWidget(0, 2)
@@ -154,7 +193,23 @@ class MainWindow(QMainWindow):
         self.parsed_table.setColumnWidth(0, 300)
         self.parsed_table.setColumnWidth(1, 200)
         table_layout.addWidget(self.parsed_table)
-        layout.addLayout(table_layout)
+        self.tabs.addTab(self.monitor_tab, "Monitor")
+
+        # 속도계/조향각/배터리/표시등 대시보드 (배경은 캐시, 바뀐 바늘과 표시등만 다시 그림)
+        self.dashboard = Dashboard(self.parser)
+        self.tabs.addTab(self.dashboard, "Dashboard")
+
+        self.trace_view = TraceView(self.trace_store, self.parser)
+        self.tabs.addTab(self.trace_view, "Trace")
+
+        # 미해석 ID 비트 히트맵/신호 후보 (탭이 보일 때만 백그라운드 분석)
+        self.analysis_panel = AnalysisPanel(self.trace_store, self.parser.messages)
+        self.tabs.addTab(self.analysis_panel, "Analysis")
+
+        # 명령(0x504/0x502) -> 응답(0x303/0x304/0x18F) 지연 히스토그램
+        self.latency_panel = LatencyPanel(self.trace_store, self.parser.messages)
+        self.tabs.addTab(self.latency_panel, "Latency")
+        layout.addWidget(self.tabs)
 
         # 차량 제어 섹션 (속도, 각도, 전송, 정지) - 슬라이더 추가
         control_layout = QVBoxLayout() # 수직 레이아웃으로 변경하여 각 제어 그룹을 수직으로 쌓음
@@ -205,6 +260,21 @@ class MainWindow(QMainWindow):
         action_buttons_layout.addWidget(self.btn_stop)
         control_layout.addLayout(action_buttons_layout)
 
+        # 주행 스크립트 재생 (CSV/JSON: time, speed, angle, indicator, gear)
+        script_layout = QHBoxLayout()
+        self.btn_load_script = QPushButton("Load Script")
+        self.btn_play_script = QPushButton("Play")
+        self.btn_pause_script = QPushButton("Pause")
+        self.btn_abort_script = QPushButton("Abort")
+        self.btn_save_script_log = QPushButton("Save Log")
+        self.script_loop = QCheckBox("Loop")
+        self.script_label = QLabel("Script: -")
+        for widget in [self.btn_load_script, self.btn_play_script, self.btn_pause_script,
+                       self.btn_abort_script, self.btn_save_script_log, self.script_loop]:
+            script_layout.addWidget(widget)
+        script_layout.addWidget(self.script_label, 1)
+        control_layout.addLayout(script_layout)
+
         layout.addLayout(control_layout) # 메인 레이아웃에 컨트롤 레이아웃 추가
 
         # 수동 CAN 메시지 전송 섹션 1
@@ -237,15 +307,51 @@ class MainWindow(QMainWindow):
         self.btn_write2 = QPushButton("Write CAN 2")
         layout.addLayout(form_layout2)
 
+        # 프레임 목록 일괄 송신 (cansend 형식 'ID#DATA' 또는 candump -L 로그 파일)
+        bulk_layout = QHBoxLayout()
+        self.btn_load_bulk = QPushButton("Load Frames")
+        self.bulk_rate = QLineEdit("0")
+        self.bulk_rate.setPlaceholderText("frames/s (0 = max)")
+        self.bulk_repeat = QLineEdit("1")
+        self.bulk_repeat.setPlaceholderText("Repeat")
+        self.btn_bulk_send = QPushButton("Send All")
+        self.btn_bulk_stop = QPushButton("Stop")
+        self.bulk_label = QLabel("Bulk: -")
+        bulk_layout.addWidget(self.btn_load_bulk)
+        bulk_layout.addWidget(QLabel("Rate (frames/s, 0=max):"))
+        bulk_layout.addWidget(self.bulk_rate)
+        bulk_layout.addWidget(QLabel("Repeat:"))
+        bulk_layout.addWidget(self.bulk_repeat)
+        bulk_layout.addWidget(self.btn_bulk_send)
+        bulk_layout.addWidget(self.btn_bulk_stop)
+        bulk_layout.addWidget(self.bulk_label, 1)
+        layout.addLayout(bulk_layout)
+
     def _connect_signals_slots(self):
         """UI 요소의 시그널과 슬롯을 연결합니다."""
         self.btn_connect.clicked.connect(self.connect_can_interface)
         self.btn_disconnect.clicked.connect(self.disconnect_can_interface)
         self.btn_clear.clicked.connect(self.clear_tables)
+        self.btn_export.clicked.connect(self._export_signals)
+        self.btn_plot.clicked.connect(self._open_plot)
+        self.btn_capture.clicked.connect(self._capture_now)
         # self.btn_send_drive.clicked.connect(self._send_drive_command) # 삭제
         self.btn_stop.clicked.connect(self._stop_vehicle)
+        self.btn_load_script.clicked.connect(self._load_script)
+        self.btn_play_script.clicked.connect(self._play_script)
+        self.btn_pause_script.clicked.connect(self._pause_script)
+        self.btn_abort_script.clicked.connect(self._abort_script)
+        self.btn_save_script_log.clicked.connect(self._save_script_log)
         self.btn_write.clicked.connect(self._send_can_frame)
         self.btn_write2.clicked.connect(self._send_can_frame2)
+        self.btn_load_bulk.clicked.connect(self._load_bulk_frames)
+        self.btn_bulk_send.clicked.connect(self._start_bulk_send)
+        self.btn_bulk_stop.clicked.connect(self._stop_bulk_send)
+        self.filter_input.returnPressed.connect(self._apply_filter)
+
+        # Raw 테이블 스크롤/크기 변경 시 새로 보이는 행 갱신
+        self.raw_table.verticalScrollBar().valueChanged.connect(self._refresh_visible_raw_rows)
+        self.raw_table.verticalScrollBar().rangeChanged.connect(self._refresh_visible_raw_rows)
 
         # 슬라이더 -> QLineEdit 연동
         self.speed_slider.valueChanged.connect(self._update_speed_input_from_slider)
@@ -312,42 +418,24 @@ class MainWindow(QMainWindow):
     def _on_slider_value_changed(self):
         """
         슬라이더 값이 변경될 때 호출됩니다.
-        변경된 속도와 각도 값을 기반으로 주행 명령을 보냅니다.
+        주행 제어 루프의 목표값만 바꾸며, 송신은 제어 스레드가 고정 주기로 수행합니다.
         """
         try:
-            # CAN 버스가 연결되어 있지 않으면 동작하지 않음
-            if self.bus is None:
-                # QMessageBox.warning(self, "경고", "CAN 버스가 연결되어 있지 않습니다.") # 너무 자주 뜰 수 있으므로 주석 처리
-                self.drive_timer.stop() # 버스 연결 안 되면 타이머 중지
-                return
-            
             speed = float(self.speed_input.text())
             angular = float(self.angle_input.text())
-            
-            self.current_speed = speed
-            self.current_angular = angular
-
-            # 슬라이더 조작 시 즉시 CAN 메시지 전송
-            self._send_drive_frame(speed, angular)
-
-            # 반복 전송 타이머 시작 (이미 실행 중이면 유지)
-            if not self.drive_timer.isActive():
-                self.drive_timer.start() # self.drive_timer.setInterval(100)으로 설정된 주기로 시작
-            
         except ValueError:
             # 유효하지 않은 숫자 입력 시 발생하는 오류는 이미 _update_X_slider_from_input에서 처리됨
-            pass
-        except Exception as e:
-            QMessageBox.critical(self, "주행 명령 오류", f"슬라이더 조작 중 오류 발생:\n{e}")
-            self.drive_timer.stop() # 오류 발생 시 타이머 중지
+            return
+        self.drive_controller.set_target(speed, angular)
+        self.dashboard.set_steering_target(angular)
 
     def _load_config(self):
-        """설정 파일에서 CAN 인터페이스 이름을 로드합니다."""
+        """설정 파일(can_config.json)을 로드합니다. 없거나 잘못되었으면 빈 설정."""
         try:
             with open(CONFIG_FILE, 'r') as f:
-                return json.load(f).get("interface", "can0")
+                return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
-            return "can0"
+            return {}
 
     def connect_can_interface(self):
         """CAN 버스에 연결합니다."""
@@ -355,41 +443,173 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "경고", "이미 CAN 버스에 연결되어 있습니다.")
             return
         try:
-            self.bus = can.Bus(channel=self.interface_name, interface='socketcan')
-            self.read_timer.start(50) # 50ms마다 메시지 읽기 시도
+            self.bus = can.Bus(channel=self.interface_name, interface=self.bus_type)
+            self._start_transmit_queue()
+            self.read_timer.start(self.READ_INTERVAL_MS)
+            self.ui_timer.start(self.governor.interval_ms)
             QMessageBox.information(self, "정보", f"CAN 버스 '{self.interface_name}' 연결 성공.")
-            # 연결 성공 시 현재 슬라이더 값으로 즉시 전송 시작
-            self._on_slider_value_changed() 
+            # 연결 성공 시 현재 슬라이더 값을 목표로 주행 명령 송신 시작 (0에서 한계 안에서 출발)
+            self._on_slider_value_changed()
+            self.drive_controller.start()
         except Exception as e:
             QMessageBox.critical(self, "오류", f"CAN 연결 실패:\n{e}")
 
     def disconnect_can_interface(self):
         """CAN 버스 연결을 해제합니다."""
         if self.bus:
-            self.read_timer.stop()
-            self.drive_timer.stop()
-            self.bus.shutdown()
-            self.bus = None
+            self._shutdown_bus()
+            self.alarms.reset() # 연결이 끊긴 뒤의 미수신/알람 상태는 의미가 없으므로 해제
+            self._report_alarms()
+            self._refresh_ui() # 마지막으로 수신한 내용 반영
             QMessageBox.information(self, "정보", "CAN 버스 연결 해제됨.")
         else:
             QMessageBox.warning(self, "경고", "CAN 버스가 연결되어 있지 않습니다.")
 
+    def _show_notice(self, icon, title, header, lines):
+        """
+        종류(title)별 모달리스 창 하나에 알립니다. 수신 타이머 안에서 모달 창을 띄우면 중첩 이벤트
+        루프에서 _read_can_messages가 다시 불려 창이 겹쳐 뜨므로, 창이 열려 있으면 내용만 덧붙입니다.
+        """
+        box, shown = self.notices.get(title, (None, []))
+        if box is None:
+            box = QMessageBox(icon, title, "", parent=self)
+            box.setWindowModality(Qt.WindowModality.NonModal)
+        if not box.isVisible():
+            shown = [] # 닫은 뒤의 기록만 표시
+        shown = (shown + lines)[-self.NOTICE_LINES:]
+        self.notices[title] = (box, shown)
+        box.setText(header + "\n" + "\n".join(shown))
+        box.show()
+
+    def _report_stalls(self, stalls):
+        """워치독 정지를 알림 창에 알립니다."""
+        lines = [f"{time.strftime('%H:%M:%S', time.localtime(started))} {kind} 멈춤 {duration:.3f}초"
+                 for kind, started, duration in stalls]
+        self._show_notice(QMessageBox.Icon.Warning, "주행 정지", "응답 지연으로 속도 0 명령을 보냈습니다.", lines)
+
+    def _shutdown_bus(self):
+        """
+        송신/수신을 멈추고 버스를 닫습니다. 주행 제어 스레드를 멈춘 뒤 속도 0 주행 프레임을 직접
+        송신 큐에 넣으므로, 송신 큐가 대기열을 비우면서 정지 명령이 마지막으로 나갑니다.
+        """
+        self.read_timer.stop()
+        self.ui_timer.stop()
+        self._finish_script_player()
+        self._stop_bulk_send()
+        self.drive_controller.stop()
+        self.drive_controller.stop_vehicle() # 다시 연결하면 0부터 출발
+        self._send_drive_frame(0.0, 0.0)
+        self.tx_queue.stop() # 정지 명령까지 보낸 뒤 멈춤
+        self._record_sent_frames()
+        self.tx_queue = None
+        self.bus.shutdown()
+        self.bus = None
+
     def _read_can_messages(self):
-        """CAN 버스에서 메시지를 읽고 테이블을 업데이트합니다."""
+        """
+        CAN 버스에서 메시지를 읽어 트레이스와 화면 반영 대기 목록에 넣습니다.
+        테이블 갱신은 _refresh_ui()가 governor가 정한 주기로 수행합니다.
+        GUI 스레드가 살아 있음을 주행 제어 루프의 워치독에 알리는 heartbeat도 여기서 보냅니다.
+        """
+        self.drive_controller.heartbeat()
         try:
-            # 한 번에 여러 메시지를 처리하여 효율성을 높임
-            for _ in range(100): # 최대 100개의 메시지 처리
+            # 같은 ID의 프레임은 화면에 마지막 값만 보이므로 ID별 최신 메시지만 모아 둠
+            # 트레이스에는 모든 프레임을 순서대로 기록
+            batch = self.pending_batch
+            frames = []
+            now = time.monotonic()
+            track_changes = self.byte_changes.update
+            for _ in range(self.MAX_FRAMES_PER_READ):
                 msg = self.bus.recv(timeout=0.0) # 논블로킹으로 메시지 수신
                 if msg is None:
                     break # 더 이상 메시지가 없으면 종료
-                self._update_raw_table(msg)
-                self._update_parsed_table(msg)
+                batch[msg.arbitration_id] = msg
+                frames.append(msg)
+                track_changes(msg.arbitration_id, msg.data, now) # 바이트 변경은 중간 프레임까지 모두 반영
+            if frames:
+                self.trace_store.extend(frames)
+                self.alarms.process(frames)
+            self.alarms.poll()
+            self._record_sent_frames()
+            self.capture.update(self.trace_store)
         except Exception as e:
             # 읽기 중 오류 발생 시 타이머 중지 및 메시지 표시
             if self.bus: # 버스가 아직 연결 상태라면
                 self.read_timer.stop()
                 QMessageBox.critical(self, "CAN 읽기 오류", f"메시지 읽기 중 오류 발생:\n{e}")
                 self.disconnect_can_interface() # 오류 발생 시 자동 연결 해제
+            return
+        self._report_alarms() # 오류 창보다 먼저 알람을 표시
+        error = self.drive_controller.take_error()
+        if error is None and self.tx_queue is not None:
+            error = self.tx_queue.take_error()
+        if error is not None and self.bus:
+            # 제어 스레드/송신 큐의 송신 오류는 GUI 스레드에서 알림
+            self.read_timer.stop()
+            QMessageBox.critical(self, "주행 명령 오류", f"주행 명령 송신 중 오류 발생:\n{error}")
+            self.disconnect_can_interface()
+            return
+        stalls = self.drive_controller.take_stalls()
+        if stalls:
+            # 제어 루프는 이미 속도 0을 보내는 중. 슬라이더도 0으로 맞춰 운전자가 다시 출발하게 함
+            self.speed_slider.setValue(0)
+            self._report_stalls(stalls)
+        self._report_captures()
+
+    def _refresh_ui(self):
+        """
+        수신한 내용을 보이는 뷰에만 반영하고, 모델 갱신 시간과 그리기 시간을 측정하여
+        다음 갱신 주기를 정합니다. 창이 최소화되었거나 탭이 가려진 뷰는 갱신하지 않으며,
+        대기 중인 내용은 다시 보일 때 한 번에 반영됩니다.
+        """
+        if self.isMinimized() or not self.isVisible():
+            self.ui_timer.setInterval(int(self.governor.max_interval * 1000))
+            return
+        start = time.perf_counter()
+        if self.pending_batch:
+            batch, self.pending_batch = self.pending_batch, {}
+            self.monitor_pending.update(batch)
+            self.dashboard_pending.update(batch)
+        dirty = []
+        if self.monitor_tab.isVisible():
+            if self.monitor_pending:
+                batch, self.monitor_pending = self.monitor_pending, {}
+                self._update_raw_table(batch)
+                self._update_parsed_table(batch)
+                dirty += [self.raw_table.viewport(), self.parsed_table.viewport()]
+            elif self.byte_changes.fading(time.monotonic()):
+                # 강조가 남아 있는 동안만 Raw 테이블을 다시 그려 색이 흐려지도록 함
+                dirty.append(self.raw_table.viewport())
+        dashboard_dirty = False
+        if self.dashboard.isVisible() and self.dashboard_pending:
+            batch, self.dashboard_pending = self.dashboard_pending, {}
+            self.dashboard.update_messages(batch)
+            dashboard_dirty = True
+        if self.trace_view.isVisible() and self.trace_view.refresh():
+            dirty.append(self.trace_view.table.viewport())
+        painted = time.perf_counter()
+        for viewport in dirty:
+            viewport.repaint() # 이벤트 루프로 미루지 않고 바로 그려 그리기 비용을 측정
+        if dashboard_dirty:
+            # 대시보드는 바뀐 영역만 update()로 표시해 두었으므로 그 영역만 바로 그림
+            QApplication.sendPostedEvents(self, QEvent.Type.UpdateRequest)
+        end = time.perf_counter()
+
+        self.governor.record(painted - start, end - painted)
+        self.ui_timer.setInterval(self.governor.interval_ms)
+        if end - self.status_time >= 1.0:
+            self.status_time = end
+            status = self.governor.status_text()
+            if self.drive_controller.stalls:
+                status += f" | Watchdog stops {len(self.drive_controller.stalls)}"
+            if self.tx_queue is not None:
+                status += " | " + self.tx_queue.stats_text()
+            status += " | " + self.capture.status_text()
+            if self._script_playing():
+                status += " | " + self.script_player.status_text()
+            if self._bulk_sending():
+                self.bulk_label.setText(self.bulk_sender.status_text())
+            self.statusBar().showMessage(status)
 
     def _send_can_frame(self):
         """사용자 입력에 따라 CAN 프레임을 전송합니다."""
@@ -437,83 +657,85 @@ class MainWindow(QMainWindow):
                 raise ValueError("DLC(Data Length Code)는 8바이트를 초과할 수 없습니다.")
             
             # DLC는 데이터 배열의 실제 길이에 따라 자동으로 설정됩니다.
+            # 송신 큐에 넣기만 하므로 버퍼가 가득 차도 UI나 주행 명령 송신이 멈추지 않음
             msg = can.Message(arbitration_id=can_id, data=data, is_extended_id=is_extended)
-            self.bus.send(msg)
+            self.tx_queue.send(msg)
         except Exception as e:
             QMessageBox.critical(self, f"전송 오류 ({error_title})", str(e))
 
-    def _send_drive_frame(self, speed, angular):
+    def _start_transmit_queue(self):
+        """연결한 버스의 송신 큐를 만들고 시작합니다."""
+        rate_limits = dict(self.TX_RATE_LIMITS)
+        for key, hz in self.config.get("tx_rate_limits", {}).items():
+            rate_limits[int(key, 0) if isinstance(key, str) else key] = hz
+        self.tx_queue = TransmitQueue(self.bus, rate_limits)
+        self.tx_queue.start()
+
+    def _record_sent_frames(self):
+        """송신 큐가 실제로 보낸 프레임(일괄 송신 포함)을 송신 시각과 함께 트레이스에 기록합니다."""
+        if self.tx_queue is None:
+            return
+        sent = self.tx_queue.sent_frames
+        if sent:
+            frames = []
+            while sent:
+                frames.append(sent.popleft())
+            self.trace_store.extend(frames, tx=True)
+
+    def _send_drive_frame(self, speed, angular, indicator=None, gear=None, on_sent=None):
         """
         실제 CAN 드라이브 프레임을 구성하여 전송합니다.
+        주행 제어/스크립트 재생 스레드에서 호출되므로 위젯이나 트레이스를 직접 건드리지 않습니다.
+        indicator/gear를 주면 속도/각도로 정하는 대신 그 값을 보냅니다 (주행 스크립트).
+        on_sent는 명령의 마지막 프레임이 버스에 나갈 때 송신 스레드에서 불립니다 (can_tx).
         """
-        if self.bus is None:
+        tx_queue = self.tx_queue
+        if tx_queue is None:
             return # CAN 버스가 연결되어 있지 않으면 전송하지 않음
 
-        # 각도 범위 제한 (-30 ~ 30)
-        angular = max(-30.0, min(30.0, angular))
-
         # 기어 설정 (0:P, 1:D, 2:N, 3:R)
-        gear = 0x2 # 기본 N (Neutral)
-        if speed > 0.1: # 전진 (정지 임계값 추가)
-            gear = 0x1 # D Gear
-        elif speed < -0.1: # 후진 (정지 임계값 추가)
-            gear = 0x3 # R Gear
-            speed = abs(speed) # 속도 값은 양수로 변환
-        else: # 속도가 0에 가까우면 중립
-            gear = 0x2 # N Gear
+        if gear is None:
+            gear = 0x2 # 기본 N (Neutral)
+            if speed > 0.1: # 전진 (정지 임계값 추가)
+                gear = 0x1 # D Gear
+            elif speed < -0.1: # 후진 (정지 임계값 추가)
+                gear = 0x3 # R Gear
+            else: # 속도가 0에 가까우면 중립
+                gear = 0x2 # N Gear
+        speed = abs(speed) # 속도 값은 양수로 변환 (방향은 기어로 표시)
 
         # 방향 지시등 설정 (0: 없음, 0xF1: 좌, 0xF2: 우)
-        indicator = 0x00 # 기본 (없음)
-        # --- MODIFICATION START ---
-        if angular < -5.0: # 우회전 (임의의 임계값, 5도 기준)
-            indicator = 0xF2
-        elif angular > 5.0: # 좌회전 (임의의 임계값, 5도 기준)
-            indicator = 0xF1
-        # --- MODIFICATION END ---
+        if indicator is None:
+            indicator = 0x00 # 기본 (없음)
+            # --- MODIFICATION START ---
+            if angular < -5.0: # 우회전 (임의의 임계값, 5도 기준)
+                indicator = 0xF2
+            elif angular > 5.0: # 좌회전 (임의의 임계값, 5도 기준)
+                indicator = 0xF1
+            # --- MODIFICATION END ---
 
-        # VCU_Speed_Req (CAN ID 0x303)에 사용되는 속도 값 변환
-        # (VCU_Speed_Req = (value * 0.1) - 80 역산 -> value = (VCU_Speed_Req + 80) / 0.1)
-        # 이 변환은 CANParser의 VCU_Speed_Req 계산과 역산 관계를 가집니다.
-        # 여기서는 0x504 메시지 스펙에 맞춰 속도(km/h)를 직접 변환하는 것으로 가정합니다.
-        speed_val_for_504 = int(speed / 0.1) # 0.1 km/h 단위
-        linear_v1 = speed_val_for_504 & 0xFF
-        linear_v2 = (speed_val_for_504 >> 8) & 0xFF
-
-        # 0x502 메시지의 각도 값 변환 (현재 로직: (angular + 30) / 0.1)
-        # 이 변환은 차량 제어 스펙에 따라 다를 수 있으므로 정확한 확인이 필수입니다.
-        # angular 값이 -30에서 30일 때, (angular + 30)은 0에서 60
-        # 이를 0.1 단위로 변환하면 0에서 600이 됩니다. (0.1 deg/LSB 기준)
-        angular_val_for_502 = int((angular + 30) / 0.1) # 특정 범위 매핑 (예: -30도 ~ 30도 -> 0 ~ 600)
-        angular_v1 = angular_val_for_502 & 0xFF
-        angular_v2 = (angular_val_for_502 >> 8) & 0xFF
-
-        msgs = [
-            # 0x501: 더미/안전 메시지로 추정 (스펙 확인 필요)
-            can.Message(arbitration_id=0x501, data=[0xF1, 0, 0, 0, 0, 0, 0, 0], is_extended_id=False),
-            # 0x503: 더미/안전 메시지로 추정 (스펙 확인 필요)
-            can.Message(arbitration_id=0x503, data=[0xF1, 0, 0, 0, 0, 0, 0, 0], is_extended_id=False),
-            # 0x502: 조향 각도 제어 (angular_v1, angular_v2)
-            can.Message(arbitration_id=0x502, data=[0xF1, 0, 0, 0, angular_v1, angular_v2, 0, 0], is_extended_id=False),
-            # 0x506: 방향 지시등 제어
-            can.Message(arbitration_id=0x506, data=[indicator, 0, 0, 0, 0, 0, 0, 0], is_extended_id=False),
-            # 0x504: 주행 명령 (기어, 속도)
-            can.Message(arbitration_id=0x504, data=[0xF1, 0x00, 0x01, gear, 0, 0, linear_v1, linear_v2], is_extended_id=False)
-        ]
-        
-        for m in msgs:
-            self.bus.send(m)
-            # time.sleep(0.01) # 이 지연이 UI 반응성을 저하시킬 수 있으므로 제거하거나 매우 짧게 조정
-                               # 대신 QTimer 주기를 짧게 가져가는 것이 더 효율적
-
-    def _send_repeated_drive_command(self):
-        """QTimer에 의해 반복적으로 호출되어 현재 속도와 각도로 주행 명령을 전송합니다."""
-        self._send_drive_frame(self.current_speed, self.current_angular)
+        # 0x501~0x506 프레임은 patrolcar.dbc 신호 정의로 생성된 인코더가 구성합니다.
+        # 각도(-30 ~ 30도)/속도 범위 제한과 0.1 단위 변환은 DBC의 [min|max], scale/offset을 따르며
+        # 스펙 확인 후 변경이 필요하면 DBC만 수정하면 됩니다.
+        encoders = self.parser.encoders
+        msgs = self.drive_msgs
+        encoders[0x501](msgs[0x501].data)
+        encoders[0x503](msgs[0x503].data)
+        encoders[0x502](msgs[0x502].data, Steer_Angle_Req=angular)
+        encoders[0x506](msgs[0x506].data, Indicator_Req=indicator)
+        encoders[0x504](msgs[0x504].data, Gear_Req=gear, Speed_Req=speed)
+
+        # 송신 큐가 data를 복사하므로 다음 주기에 버퍼를 재사용해도 됨
+        # 이전 주기 프레임이 아직 대기 중이면 최신 값으로 바뀜 (coalescing)
+        for frame_id in self.DRIVE_FRAME_IDS[:-1]:
+            tx_queue.send(msgs[frame_id])
+        tx_queue.send(msgs[self.DRIVE_FRAME_IDS[-1]], on_sent=on_sent)
 
     def _stop_vehicle(self):
-        """차량을 정지시키는 명령을 전송하고 반복 전송을 중지합니다."""
+        """차량 정지 명령으로 바꿉니다. 제어 루프는 속도 0, 각도 0을 계속 송신합니다."""
         if self.bus:
-            self.drive_timer.stop() # 반복 전송 타이머 중지
-            self._send_drive_frame(0.0, 0.0) # 속도 0, 각도 0으로 정지 명령 전송
+            self._finish_script_player() # 스크립트 재생 중이면 중단 (정지 명령 송신)
+            self.drive_controller.stop_vehicle() # 감속 한계 없이 바로 0
             # 슬라이더와 입력 필드를 0으로 초기화
             self.speed_slider.setValue(0)
             self.angle_slider.setValue(0)
@@ -521,53 +743,383 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.warning(self, "경고", "CAN 버스가 연결되어 있지 않아 정지 명령을 보낼 수 없습니다.")
 
-    def _update_raw_table(self, message):
-        """Raw CAN 메시지 테이블을 업데이트합니다."""
-        can_id = hex(message.arbitration_id)
-        data_hex = message.data.hex()
-        dlc = str(message.dlc)
-
-        # 기존 행을 찾아서 업데이트
-        for row in range(self.raw_table.rowCount()):
-            if self.raw_table.item(row, 0).text() == can_id:
-                self.raw_table.setItem(row, 1, QTableWidgetItem(dlc))
-                self.raw_table.setItem(row, 2, QTableWidgetItem(data_hex))
-                return
-        
-        # 새 행 추가
-        row_count = self.raw_table.rowCount()
-        self.raw_table.insertRow(row_count)
-        self.raw_table.setItem(row_count, 0, QTableWidgetItem(can_id))
-        self.raw_table.setItem(row_count, 1, QTableWidgetItem(dlc))
-        self.raw_table.setItem(row_count, 2, QTableWidgetItem(data_hex))
-
-    def _update_parsed_table(self, message):
-        """파싱된 CAN 메시지 테이블을 업데이트합니다."""
-        parsed_data = self.parser.parse(message.arbitration_id, message.data)
-        for name, value in parsed_data.items():
-            found = False
-            # 기존 행을 찾아서 업데이트
-            for row in range(self.parsed_table.rowCount()):
-                item = self.parsed_table.item(row, 0)
-                if item and item.text() == name:
+    def _script_playing(self):
+        return self.script_player is not None and self.script_player.isRunning()
+
+    def _update_script_buttons(self):
+        playing = self._script_playing()
+        self.btn_load_script.setEnabled(not playing)
+        self.btn_play_script.setEnabled(not playing and self.script_steps is not None)
+        self.btn_pause_script.setEnabled(playing)
+        self.btn_pause_script.setText("Resume" if playing and self.script_player.paused else "Pause")
+        self.btn_abort_script.setEnabled(playing)
+        self.btn_save_script_log.setEnabled(
+            not playing and self.script_player is not None and bool(self.script_player.log))
+
+    def _load_script(self):
+        """주행 스크립트 파일을 불러옵니다."""
+        path, _ = QFileDialog.getOpenFileName(self, "Load Drive Script", "",
+                                              "Drive Script (*.csv *.json);;All Files (*)")
+        if not path:
+            return
+        try:
+            steps, loop = load_drive_script(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "스크립트 오류", f"주행 스크립트를 읽을 수 없습니다:\n{e}")
+            return
+        self.script_steps = steps
+        self.script_loop.setChecked(loop)
+        self.script_label.setText(f"Script: {path.split('/')[-1]} ({len(steps)} steps, {steps[-1].time:.1f} s)")
+        self._update_script_buttons()
+
+    def _play_script(self):
+        """
+        불러온 스크립트를 재생합니다. 재생하는 동안 주행 제어 루프는 멈추고,
+        끝나면 정지 명령(0, 0)부터 다시 시작합니다.
+        """
+        if self.bus is None:
+            QMessageBox.warning(self, "경고", "CAN 버스가 연결되어 있지 않습니다.")
+            return
+        self.drive_controller.stop()
+        self.script_player = DriveScriptPlayer(
+            self.script_steps, self._send_drive_frame,
+            hold_period=1.0 / self.drive_controller.rate_hz, loop=self.script_loop.isChecked())
+        self.script_player.finished.connect(self._on_script_finished)
+        self.script_player.start()
+        self._update_script_buttons()
+
+    def _pause_script(self):
+        if not self._script_playing():
+            return
+        if self.script_player.paused:
+            self.script_player.resume()
+        else:
+            self.script_player.pause()
+        self._update_script_buttons()
+
+    def _abort_script(self):
+        """재생을 중단하고 정지 명령을 보냅니다."""
+        self._finish_script_player()
+
+    def _finish_script_player(self):
+        """재생 중인 스크립트를 중단하고 스레드가 끝날 때까지 기다립니다."""
+        if self._script_playing():
+            self.script_player.abort()
+            self.script_player.wait()
+
+    def _on_script_finished(self):
+        """재생이 끝나면 (정상 종료/중단/오류) 슬라이더를 0으로 돌리고 주행 제어 루프를 재개합니다."""
+        player = self.script_player
+        mean, worst = player.lateness()
+        self.script_label.setText(f"Script: done {len(player.log)} sends, "
+                                  f"late mean {mean * 1000:.3f} ms, max {worst * 1000:.3f} ms")
+        self.drive_controller.stop_vehicle()
+        self.speed_slider.setValue(0)
+        self.angle_slider.setValue(0)
+        if self.bus is not None:
+            self.drive_controller.start()
+        self._update_script_buttons()
+        if player.error is not None:
+            QMessageBox.critical(self, "스크립트 재생 오류", f"주행 스크립트 송신 중 오류 발생:\n{player.error}")
+
+    def _save_script_log(self):
+        """마지막 재생의 계획/큐에 넣은/버스 송신 시각 기록을 CSV로 저장합니다."""
+        path, _ = QFileDialog.getSaveFileName(self, "Save Script Log", "script_log.csv", "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            self.script_player.save_log(path)
+        except OSError as e:
+            QMessageBox.critical(self, "저장 오류", str(e))
+
+    def _bulk_sending(self):
+        return self.bulk_sender is not None and self.bulk_sender.isRunning()
+
+    def _update_bulk_buttons(self):
+        sending = self._bulk_sending()
+        self.btn_load_bulk.setEnabled(not sending)
+        self.btn_bulk_send.setEnabled(not sending and self.bulk_frames is not None)
+        self.btn_bulk_stop.setEnabled(sending)
+
+    def _load_bulk_frames(self):
+        """일괄 송신할 프레임 목록 파일을 불러와 미리 can.Message로 만들어 둡니다."""
+        path, _ = QFileDialog.getOpenFileName(self, "Load Frames", "",
+                                              "Frame List (*.txt *.log);;Recording (*.pclog);;All Files (*)")
+        if not path:
+            return
+        try:
+            self.bulk_frames = load_frame_list(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "프레임 목록 오류", f"프레임 목록을 읽을 수 없습니다:\n{e}")
+            return
+        self.bulk_label.setText(f"Bulk: {path.split('/')[-1]} ({len(self.bulk_frames)} frames)")
+        self._update_bulk_buttons()
+
+    def _start_bulk_send(self):
+        """불러온 프레임 목록을 백그라운드 스레드에서 송신합니다."""
+        if self.bus is None:
+            QMessageBox.warning(self, "경고", "CAN 버스가 연결되어 있지 않습니다.")
+            return
+        try:
+            rate = float(self.bulk_rate.text())
+            repeat = int(self.bulk_repeat.text())
+            if rate < 0 or repeat < 1:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "입력 오류", "Rate는 0 이상의 숫자, Repeat는 1 이상의 정수여야 합니다.")
+            return
+        self.bulk_sender = BulkTransmitter(self.tx_queue, self.bulk_frames, rate, repeat)
+        self.bulk_sender.finished.connect(self._on_bulk_finished)
+        self.bulk_sender.start()
+        self._update_bulk_buttons()
+
+    def _stop_bulk_send(self):
+        """일괄 송신을 중단하고 스레드가 끝날 때까지 기다립니다."""
+        if self._bulk_sending():
+            self.bulk_sender.abort()
+            self.bulk_sender.wait()
+
+    def _on_bulk_finished(self):
+        sender = self.bulk_sender
+        # 송신 오류/버린 프레임은 송신 큐 통계(상태 표시줄)와 송신 오류 알림으로 확인
+        self.bulk_label.setText(f"Bulk done: {sender.queued}/{sender.total} frames in {sender.elapsed:.2f} s, "
+                                f"{sender.frames_per_second:.0f} frames/s")
+        self._update_bulk_buttons()
+
+    def _visible_rows(self, table):
+        """테이블 뷰포트에 보이는 행 범위 (first, last)를 반환합니다. 행이 없으면 (0, -1)."""
+        first = table.rowAt(0)
+        if first < 0:
+            return 0, -1
+        last = table.rowAt(table.viewport().height() - 1)
+        if last < 0:
+            last = table.rowCount() - 1
+        return first, last
+
+    def _update_raw_table(self, messages):
+        """
+        Raw CAN 메시지 테이블을 업데이트합니다.
+        messages: {CAN ID: 최신 can.Message}
+        화면에 보이지 않는 행은 최신 메시지만 보관하고 hex 문자열은 만들지 않습니다.
+        """
+        self.raw_latest.update(messages)
+        first, last = self._visible_rows(self.raw_table)
+        for can_id, message in messages.items():
+            row = self.raw_rows.get(can_id)
+            if row is None:
+                # 새 행 추가 (ID 문자열과 셀 아이템은 행 생성 시 한 번만 만듦)
+                row = self.raw_table.rowCount()
+                self.raw_table.insertRow(row)
+                self.raw_table.setItem(row, 0, QTableWidgetItem(hex(can_id)))
+                self.raw_table.setItem(row, 1, QTableWidgetItem(str(message.dlc)))
+                data_item = QTableWidgetItem(message.data.hex())
+                data_item.setData(Qt.ItemDataRole.UserRole, can_id) # 바이트 변경 강조 델리게이트용
+                self.raw_table.setItem(row, 2, data_item)
+                self.raw_rows[can_id] = row
+            elif first <= row <= last:
+                self._set_raw_row(row, message)
+            if self.frame_filter is not None:
+                # 필터는 이번에 갱신된 ID의 행에만 다시 적용
+                hidden = not self.frame_filter.match_message(message)
+                if self.raw_table.isRowHidden(row) != hidden:
+                    self.raw_table.setRowHidden(row, hidden)
+
+    def _set_raw_row(self, row, message):
+        """Raw 테이블의 기존 행에 메시지 내용을 표시합니다."""
+        self.raw_table.item(row, 1).setText(str(message.dlc))
+        self.raw_table.item(row, 2).setText(message.data.hex())
+
+    def _refresh_visible_raw_rows(self, *_):
+        """스크롤/크기 변경으로 새로 보이게 된 Raw 행을 최신 메시지로 채웁니다."""
+        first, last = self._visible_rows(self.raw_table)
+        for can_id, row in self.raw_rows.items():
+            if first <= row <= last:
+                self._set_raw_row(row, self.raw_latest[can_id])
+
+    def _apply_filter(self):
+        """필터 입력창의 식을 컴파일하여 Raw 테이블과 Trace 뷰에 적용합니다."""
+        try:
+            frame_filter = compile_filter(self.filter_input.text(), self.parser.messages)
+        except ValueError as e:
+            QMessageBox.warning(self, "필터 오류", str(e))
+            return
+        self.frame_filter = frame_filter
+        for can_id, row in self.raw_rows.items():
+            hidden = frame_filter is not None and not frame_filter.match_message(self.raw_latest[can_id])
+            self.raw_table.setRowHidden(row, hidden)
+        self._refresh_visible_raw_rows()
+        self.trace_view.set_filter(frame_filter)
+
+    def _update_parsed_table(self, messages):
+        """
+        파싱된 CAN 메시지 테이블을 업데이트합니다.
+        messages: {CAN ID: 최신 can.Message}
+        값이 바뀐 셀만 setText 하여 불필요한 아이템 생성과 다시 그리기를 피합니다.
+        """
+        parse = self.parser.parse
+        for can_id, message in messages.items():
+            for name, value in parse(can_id, message.data).items():
+                if self.parsed_values.get(name) == value:
+                    continue
+                self.parsed_values[name] = value
+                row = self.parsed_rows.get(name)
+                if row is None:
+                    # 새 행 추가
+                    row = self.parsed_table.rowCount()
+                    self.parsed_table.insertRow(row)
+                    self.parsed_table.setItem(row, 0, QTableWidgetItem(name))
                     self.parsed_table.setItem(row, 1, QTableWidgetItem(value))
-                    found = True
-                    break
-            # 새 행 추가
-            if not found:
-                row = self.parsed_table.rowCount()
-                self.parsed_table.insertRow(row)
-                self.parsed_table.setItem(row, 0, QTableWidgetItem(name))
-                self.parsed_table.setItem(row, 1, QTableWidgetItem(value))
+                    self.parsed_rows[name] = row
+                else:
+                    self.parsed_table.item(row, 1).setText(value)
 
     def clear_tables(self):
         """모든 테이블의 내용을 지웁니다."""
         self.raw_table.setRowCount(0)
         self.parsed_table.setRowCount(0)
+        self.raw_rows.clear()
+        self.raw_latest.clear()
+        self.parsed_rows.clear()
+        self.parsed_values.clear()
+        self.pending_batch.clear()
+        self.monitor_pending.clear()
+        self.dashboard_pending.clear()
+        self.byte_changes.clear()
+        self.trace_view.clear()
+        self.analysis_panel.clear()
+        self.latency_panel.clear()
         QMessageBox.information(self, "정보", "모든 테이블이 초기화되었습니다.")
 
+    def _export_signals(self):
+        """
+        트레이스의 프레임을 신호별 열로 디코딩하여 Parquet/HDF5 파일로 내보냅니다 (백그라운드).
+        .pclog를 고르면 원본 프레임을 기록 파일로 저장합니다.
+        """
+        if not len(self.trace_store):
+            QMessageBox.warning(self, "경고", "내보낼 프레임이 없습니다.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Signals", "signals.parquet",
+                                              "Parquet (*.parquet);;HDF5 (*.h5 *.hdf5);;Recording (*.pclog)")
+        if not path:
+            return
+        # 수신 중에도 내보낼 수 있도록 지금까지의 트레이스 사본을 씀
+        self.export_thread = SignalExportThread(self.trace_store, path, self.parser.messages)
+        self.export_thread.finished.connect(self._on_export_finished)
+        self.btn_export.setEnabled(False)
+        self.export_thread.start()
+
+    def _on_export_finished(self):
+        thread = self.export_thread
+        self.btn_export.setEnabled(True)
+        if thread.error is not None:
+            QMessageBox.critical(self, "오류", f"신호 내보내기 실패:\n{thread.error}")
+        else:
+            QMessageBox.information(self, "정보", f"{thread.rows}행을 {thread.path}에 저장했습니다 "
+                                                  f"({thread.elapsed:.2f}초).")
+
+    def _open_plot(self):
+        """기록 파일(.pclog)의 신호 그래프 창을 엽니다."""
+        path, _ = QFileDialog.getOpenFileName(self, "Plot Recording", "", "Recording (*.pclog)")
+        if not path:
+            return
+        viewer = PlotViewer(path, self.parser.messages)
+        viewer.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        viewer.destroyed.connect(lambda _=None, v=viewer: self.plot_viewers.remove(v))
+        self.plot_viewers.append(viewer)
+        viewer.show()
+
+    def _create_capture(self):
+        """설정의 트리거로 캡처 링 버퍼를 만듭니다. 트리거 식이 잘못되면 기본 트리거만 사용합니다."""
+        pre = self.config.get("capture_pre_seconds", self.CAPTURE_PRE_SECONDS)
+        post = self.config.get("capture_post_seconds", self.CAPTURE_POST_SECONDS)
+        directory = self.config.get("capture_dir", self.CAPTURE_DIR)
+        triggers = default_triggers(self.config.get("capture_current_limit", self.CAPTURE_CURRENT_LIMIT))
+        try:
+            return CaptureRing(self.parser.messages, {**triggers, **self.config.get("capture_triggers", {})},
+                               directory, pre, post)
+        except ValueError as e:
+            QMessageBox.warning(self, "경고", f"캡처 트리거 설정 오류 (기본 트리거 사용):\n{e}")
+            return CaptureRing(self.parser.messages, triggers, directory, pre, post)
+
+    def _create_alarms(self):
+        """기본 알람 규칙과 설정의 alarm_rules로 알람 엔진을 만듭니다. 규칙이 잘못되면 기본 규칙만 사용합니다."""
+        rules = {rule["name"]: rule for rule in self.ALARM_RULES}
+        for rule in self.config.get("alarm_rules", []):
+            rules[rule.get("name")] = rule
+        try:
+            return AlarmEngine(self.parser.messages, list(rules.values()))
+        except ValueError as e:
+            QMessageBox.warning(self, "경고", f"알람 규칙 설정 오류 (기본 규칙 사용):\n{e}")
+            return AlarmEngine(self.parser.messages, self.ALARM_RULES)
+
+    def _report_alarms(self):
+        """
+        알람 발생/해제를 로그(logging, 발생은 severity에 따라 WARNING/CRITICAL)로 남기고 알람 표시줄을
+        갱신합니다. 이벤트가 있을 때만 표시줄을 바꿉니다.
+        """
+        events = self.alarms.take_events()
+        if not events:
+            return
+        for when, rule, raised, detail in events:
+            stamp = time.strftime("%H:%M:%S", time.localtime(when)) + f".{int(when * 1000) % 1000:03d}"
+            if raised:
+                level = logging.CRITICAL if rule.severity == "critical" else logging.WARNING
+                self.alarm_details[rule] = detail
+            else:
+                level = logging.INFO
+            log.log(level, "알람 %s %s [%s] %s: %s", "발생" if raised else "해제", stamp,
+                    rule.severity, rule.name, detail)
+        active = self.alarms.active
+        self.alarm_details = {rule: self.alarm_details.get(rule, "") for rule in active}
+        if not active:
+            self.alarm_label.hide()
+            return
+        color = "#c00000" if any(rule.severity == "critical" for rule in active) else "#c06000"
+        items = " | ".join(f"{rule.name} ({self.alarm_details[rule]}, "
+                           f"{time.strftime('%H:%M:%S', time.localtime(rule.since))})" for rule in active)
+        self.alarm_label.setText(f'<b style="color:{color}">ALARM: {items}</b>')
+        self.alarm_label.show()
+
+    def _capture_now(self):
+        """지금 시각을 기준으로 수동 캡처를 겁니다."""
+        self.capture.trigger("Manual")
+
+    def _report_captures(self):
+        """
+        저장 스레드가 마친 캡처를 알립니다. 수신을 막지 않도록 저장 완료는 로그(logging)로만 남기고,
+        저장 실패는 로그와 모달리스 알림 창에 알립니다.
+        """
+        saved, errors = self.capture.take_saved()
+        for path, frames, triggers in saved:
+            log.info("캡처 저장: %s (%d 프레임, 트리거: %s)", path, frames, ", ".join(triggers))
+        for error in errors:
+            log.error("캡처 저장 실패: %s", error)
+        if errors:
+            now = time.strftime("%H:%M:%S")
+            self._show_notice(QMessageBox.Icon.Critical, "캡처 저장 실패", "캡처 파일을 저장하지 못했습니다.",
+                              [f"{now} {error}" for error in errors])
+
+    def closeEvent(self, event):
+        """
+        창을 닫을 때 백그라운드 분석 스레드와 주행 제어 스레드가 끝나기를 기다립니다.
+        연결 중이면 정지 명령을 보내고 버스를 닫습니다.
+        """
+        self.analysis_panel.shutdown()
+        self.latency_panel.shutdown()
+        if self.bus:
+            self._shutdown_bus()
+        self.drive_controller.stop()
+        if self.export_thread is not None:
+            self.export_thread.wait() # 쓰다 만 파일이 남지 않도록 끝까지 기다림
+        for viewer in list(self.plot_viewers):
+            viewer.close()
+        self.capture.close() # 기다리던 캡처까지 저장
+        super().closeEvent(event)
+
 # --- 애플리케이션 실행 ---
 if __name__ == "__main__":
+    # 워치독 정지/캡처/알람 기록은 logging으로 남음 (기본: 표준 오류)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -0,0 +1,64 @@
+"""
+코드 생성 디코더(can_codec)와 기존 손으로 작성한 CANParser.parse의 속도 비교.
+
+사용법: python bench_codec.py [반복 횟수]
+"""
+import sys
+import timeit
+
+from can_codec import CANParser
+
+
+class HandWrittenCANParser:
+    """
+    can_codec 도입 이전 PatrolCar_SlideBar2.py의 CANParser.parse (비교 기준).
+    """
+    def parse(self, can_id, data):
+        parsed = {}
+        if can_id == 0x301:
+            if len(data) >= 6:
+                parsed['Brake Light'] = "ON" if data[5] & 0x01 else "OFF"
+                parsed['Head Light'] = "ON" if data[1] & 0x80 else "OFF"
+                parsed['Emergency Button'] = "Pressed" if data[0] & 0x01 else "Not Pressed"
+                parsed['Back Touch Switch State'] = "trigger" if data[1] & 0x20 else "Not trigger"
+                parsed['Front Touch Switch State'] = "trigger" if data[1] & 0x10 else "Not trigger"
+
+        elif can_id == 0x160:
+            if len(data) >= 6:
+                mode = (data[0] & 0x06) >> 1
+                parsed['Drive Mode'] = ["Torque", "Speed", "Torque ring", "Speed loop"][mode]
+                parsed['MCU_Brake_Request'] = "Hold brake" if data[0] & 0x08 else "Release"
+                parsed['MCU Speed Request (RPM)'] = str(int.from_bytes(data[3:6], 'little') - 7000)
+                parsed['MCU Torque Request (Nm)'] = f"{int.from_bytes(data[1:3], 'little') * 0.1 - 1000:.1f}"
+
+        elif can_id == 0x0A0:
+            if len(data) >= 8:
+                parsed['BMS Battery SOH (%)'] = str(data[7])
+                parsed['BMS Battery SOC (%)'] = f"{data[4] * 0.4:.2f}"
+                parsed['BMS Battery Voltage (V)'] = f"{int.from_bytes(data[2:4], 'little') * 0.1:.2f}"
+
+        return parsed
+
+
+FRAMES = {
+    0x160: bytearray([0x0A, 0x10, 0x27, 0x58, 0x1B, 0x00, 0x00, 0x00]),
+    0x301: bytearray([0x01, 0xB0, 0x00, 0x00, 0x00, 0x01, 0x00, 0x00]),
+    0x0A0: bytearray([0x00, 0x00, 0xF4, 0x01, 0xC8, 0x00, 0x00, 0x64]),
+}
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    baseline = HandWrittenCANParser()
+    generated = CANParser()
+
+    print(f"{'CAN ID':>8} {'hand-written':>14} {'generated':>12} {'speedup':>8}  (ns/frame, {number} frames)")
+    for can_id, data in FRAMES.items():
+        assert baseline.parse(can_id, data) == generated.parse(can_id, data), hex(can_id)
+        t_base = min(timeit.repeat(lambda: baseline.parse(can_id, data), number=number, repeat=5))
+        t_gen = min(timeit.repeat(lambda: generated.parse(can_id, data), number=number, repeat=5))
+        print(f"{can_id:#8x} {t_base / number * 1e9:14.0f} {t_gen / number * 1e9:12.0f} {t_base / t_gen:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+디코딩된 신호 알람 규칙.
+
+규칙은 한 번만 컴파일되며, 수신한 프레임 중 규칙에 쓰인 ID의 프레임만 신호를 꺼내고, 값이 바뀐
+신호를 참조하는 규칙만 다시 평가합니다. 나머지 프레임은 ID 조회 한 번으로 건너뜁니다.
+
+규칙은 dict 하나이며 (can_config.json의 alarm_rules 목록과 같은 형식):
+    {"name": "Emergency Button", "when": "Emergency_Button == \"Pressed\"", "severity": "critical"}
+        when: can_filter 문법의 신호 조건 (and/or/not, VAL_ 문자열, 표시 이름). 참인 동안 알람
+    {"name": "Low Battery", "when": "BMS_SOC < 20", "for": 2.0}
+        for: 조건이 이 시간(초) 동안 계속 참이어야 알람 (지속 시간)
+    {"name": "Gear Change", "when": "Vehicle_Gear == \"R Gear\"", "edge": "rising", "hold": 5.0}
+        edge: rising/falling. 조건이 바뀌는 순간에만 알람을 내고 hold초 뒤 해제
+    {"name": "Current Jump", "signal": "BUS_Current", "rate": 50.0}
+        rate: 신호 값의 변화율(단위/초) 절댓값이 이보다 크면 알람
+    {"name": "BMS Timeout", "signal": "BMS_SOC", "stale": 1.0}
+        stale: 신호를 한 번 받은 뒤 이 시간(초) 동안 다시 받지 못하면 알람
+severity는 warning(기본) 또는 critical입니다.
+
+process(frames)는 수신 주기마다 수신한 can.Message 목록으로, poll()은 지속 시간/hold/stale 판단을
+위해 같은 주기로 호출합니다. 알람 발생/해제는 take_events()로 가져갑니다.
+"""
+import time
+
+from can_filter import FilterParser, SignalFilter, COMPARISONS, find_signal
+
+SEVERITIES = ("warning", "critical")
+EDGES = ("rising", "falling")
+DEFAULT_HOLD = 5.0 # edge 알람 표시 시간 (초)
+
+
+class _Watch:
+    """규칙이 참조하는 신호 하나의 마지막 수신 값."""
+    def __init__(self, message, sig):
+        self.message = message
+        self.sig = sig
+        self.min_length = max(message.min_length, 1)
+        self.raw = None # 아직 수신 없음
+        self.value = None # 물리값
+        self.time = None # 마지막 수신 프레임 시각
+        self.previous = None # 값이 바뀌기 직전 (값, 프레임 시각). 변화율 계산용
+        self.seen = None # 마지막 수신 시각 (time.monotonic())
+        self.rules = [] # 값이 바뀌면 평가할 규칙
+        self.steady_rules = [] # 값이 그대로여도 알람/대기 중이면 평가할 규칙 (변화율, stale)
+
+    def text(self):
+        if self.raw is None:
+            return f"{self.sig.name}=?"
+        choice = (self.sig.choices or {}).get(self.raw)
+        if choice is not None:
+            return f"{self.sig.name}={choice}"
+        return f"{self.sig.name}={self.value:g}{self.sig.unit or ''}"
+
+
+class _Condition(SignalFilter):
+    """신호 비교 조건 하나. 각 신호의 마지막 수신 값으로 평가합니다."""
+    def __init__(self, targets, op, value, watches):
+        super().__init__(targets, op, value)
+        self.watches = watches
+
+    def evaluate(self):
+        for watch in self.watches:
+            if watch.raw is None:
+                continue
+            if self.by_raw:
+                if self.compare(watch.raw, self.raw_values[watch.sig]):
+                    return True
+            elif self.compare(watch.value, self.value):
+                return True
+        return False
+
+
+class _All:
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def evaluate(self):
+        return all(node.evaluate() for node in self.nodes)
+
+
+class _Any:
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def evaluate(self):
+        return any(node.evaluate() for node in self.nodes)
+
+
+class _Negate:
+    def __init__(self, node):
+        self.node = node
+
+    def evaluate(self):
+        return not self.node.evaluate()
+
+
+class _RuleParser(FilterParser):
+    """can_filter 문법에서 신호 비교만 허용하는 규칙 조건 파서. 비교마다 신호 watch를 연결합니다."""
+    or_node = _Any
+    and_node = _All
+    not_node = _Negate
+
+    def __init__(self, text, messages, watch):
+        super().__init__(text, messages)
+        self.watch = watch
+        self.watches = []
+
+    def signal_node(self, targets, op, value):
+        targets = [(message, sig) for message, sig in targets if message.payload_length <= 8]
+        if not targets:
+            raise ValueError(f"8바이트를 넘는 메시지의 신호는 쓸 수 없습니다: {value}")
+        watches = [self.watch(message, sig) for message, sig in targets]
+        self.watches += watches
+        return _Condition(targets, op, value, watches)
+
+    def parse_atom(self):
+        following = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else (None, None)
+        if following[0] != "op" or following[1] not in COMPARISONS:
+            raise ValueError(f"알람 조건에는 신호 비교만 쓸 수 있습니다: '{self.peek()[1]}'")
+        return super().parse_atom()
+
+
+class AlarmRule:
+    """
+    컴파일된 규칙 하나. active는 알람 중 여부, since는 알람 시각(time.time())입니다.
+    하위 클래스가 evaluate(now)/steady(now)/poll(now)에서 set_state()로 조건 상태를 알립니다.
+    """
+    def __init__(self, spec):
+        self.name = spec["name"]
+        self.severity = spec.get("severity", "warning")
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"알람 '{self.name}'의 severity는 {'/'.join(SEVERITIES)} 중 하나여야 합니다.")
+        self.delay = float(spec.get("for", 0.0))
+        self.watches = []
+        self.active = False
+        self.since = None
+        self.pending = None # 조건이 참이 된 시각 (지속 시간 대기 중, time.monotonic())
+        self.engine = None
+
+    @property
+    def waiting(self):
+        """값이 그대로인 프레임이나 poll()에서도 확인해야 하는 상태인지."""
+        return self.active or self.pending is not None
+
+    def set_state(self, state, now):
+        if state:
+            if self.active:
+                return
+            if self.pending is None:
+                self.pending = now
+            if now - self.pending >= self.delay:
+                self.pending = None
+                self.engine._raise(self)
+        else:
+            self.pending = None
+            if self.active:
+                self.engine._clear(self)
+
+    def evaluate(self, now):
+        pass
+
+    def steady(self, now):
+        pass
+
+    def poll(self, now):
+        if self.pending is not None:
+            self.set_state(True, now)
+
+    def describe(self):
+        return ", ".join(watch.text() for watch in self.watches)
+
+
+class ConditionRule(AlarmRule):
+    """when 조건 규칙 (임계값/지속 시간/edge)."""
+    def __init__(self, spec, messages, watch):
+        super().__init__(spec)
+        parser = _RuleParser(spec["when"], messages, watch)
+        self.root = parser.parse()
+        self.watches = list(dict.fromkeys(parser.watches))
+        self.edge = spec.get("edge")
+        if self.edge is not None and self.edge not in EDGES:
+            raise ValueError(f"알람 '{self.name}'의 edge는 {'/'.join(EDGES)} 중 하나여야 합니다.")
+        self.hold = float(spec.get("hold", DEFAULT_HOLD))
+        self.state = False
+
+    def evaluate(self, now):
+        state = self.root.evaluate()
+        if self.edge is None:
+            self.set_state(state, now)
+        elif state != self.state and state == (self.edge == "rising"):
+            if self.active:
+                self.engine._clear(self)
+            self.engine._raise(self)
+            self.pending = now # hold 시작
+        self.state = state
+
+    def poll(self, now):
+        if self.edge is None:
+            super().poll(now)
+        elif self.active and now - self.pending >= self.hold:
+            self.pending = None
+            self.engine._clear(self)
+
+
+class RateRule(AlarmRule):
+    """신호 값 변화율 규칙. 값이 바뀔 때 직전 값과의 변화율로, 값이 그대로인 프레임은 0으로 판단합니다."""
+    def __init__(self, spec, messages, watch):
+        super().__init__(spec)
+        self.watches = [watch(message, sig) for message, sig in _signal_targets(spec, messages)]
+        self.limit = float(spec["rate"])
+        self.rate = 0.0
+
+    def evaluate(self, now):
+        rate = 0.0
+        for watch in self.watches:
+            if watch.previous is not None and watch.time > watch.previous[1]:
+                value, t = watch.previous
+                rate = max(rate, abs(watch.value - value) / (watch.time - t))
+        self.rate = rate
+        self.set_state(rate > self.limit, now)
+
+    def steady(self, now):
+        self.rate = 0.0
+        self.set_state(False, now)
+
+    def describe(self):
+        unit = self.watches[0].sig.unit or ""
+        return f"{super().describe()}, {self.rate:g}{unit}/s"
+
+
+class StaleRule(AlarmRule):
+    """신호 미수신 규칙. 한 번 수신한 뒤 timeout초 동안 다시 받지 못하면 알람입니다."""
+    def __init__(self, spec, messages, watch):
+        super().__init__(spec)
+        self.watches = [watch(message, sig) for message, sig in _signal_targets(spec, messages)]
+        self.timeout = float(spec["stale"])
+
+    @property
+    def waiting(self):
+        return self.active
+
+    def steady(self, now):
+        self.set_state(False, now)
+
+    evaluate = steady
+
+    def poll(self, now):
+        seen = [watch.seen for watch in self.watches if watch.seen is not None]
+        if seen and not self.active and now - max(seen) >= self.timeout:
+            self.set_state(True, now)
+
+    def describe(self):
+        if not self.active:
+            return f"{self.watches[0].sig.name} 수신 재개"
+        seen = [watch.seen for watch in self.watches if watch.seen is not None]
+        age = time.monotonic() - max(seen) if seen else 0.0
+        return f"{self.watches[0].sig.name} {age:.1f}초 미수신"
+
+
+def _signal_targets(spec, messages):
+    if "signal" not in spec:
+        raise ValueError(f"알람 '{spec['name']}'에 signal이 없습니다.")
+    targets = [(message, sig) for message, sig in find_signal(messages, spec["signal"])
+               if message.payload_length <= 8]
+    if not targets:
+        raise ValueError(f"8바이트를 넘는 메시지의 신호는 쓸 수 없습니다: {spec['signal']}")
+    return targets
+
+
+def compile_rule(spec, messages, watch):
+    """규칙 dict 하나를 컴파일합니다. 잘못된 규칙이면 ValueError를 발생시킵니다."""
+    if not spec.get("name"):
+        raise ValueError(f"알람 규칙에 name이 없습니다: {spec}")
+    kinds = [key for key in ("when", "rate", "stale") if key in spec]
+    if len(kinds) != 1:
+        raise ValueError(f"알람 '{spec['name']}'에는 when, rate, stale 중 하나만 있어야 합니다.")
+    try:
+        if kinds[0] == "when":
+            return ConditionRule(spec, messages, watch)
+        if kinds[0] == "rate":
+            return RateRule(spec, messages, watch)
+        return StaleRule(spec, messages, watch)
+    except ValueError as e:
+        raise ValueError(f"알람 '{spec['name']}': {e}") from None
+
+
+class AlarmEngine:
+    """
+    알람 규칙 묶음. process()/poll()은 수신 주기(GUI 스레드)에서 호출하고, 발생/해제 이벤트
+    (time.time(), 규칙, 발생 여부, 설명)는 take_events()로 가져갑니다.
+    """
+    def __init__(self, messages, rules):
+        self.watches = {} # (frame_id, 신호 이름) -> _Watch
+        self.by_id = {} # frame_id -> [_Watch]
+        self.rules = []
+        for spec in rules:
+            rule = compile_rule(spec, messages, self._watch)
+            rule.engine = self
+            for watch in rule.watches:
+                watch.rules.append(rule)
+                if isinstance(rule, (RateRule, StaleRule)):
+                    watch.steady_rules.append(rule)
+            self.rules.append(rule)
+        self.events = []
+        self.raised = 0 # 지금까지 발생한 알람 수
+
+    def _watch(self, message, sig):
+        key = (message.frame_id, sig.name)
+        watch = self.watches.get(key)
+        if watch is None:
+            watch = self.watches[key] = _Watch(message, sig)
+            self.by_id.setdefault(message.frame_id, []).append(watch)
+        return watch
+
+    def reset(self):
+        """신호 값과 알람 상태를 모두 지웁니다 (연결/해제 시). 알람 중이던 규칙은 해제 이벤트를 냅니다."""
+        for rule in self.rules:
+            if rule.active:
+                self._clear(rule)
+            rule.pending = None
+            if isinstance(rule, ConditionRule):
+                rule.state = False
+        for watch in self.watches.values():
+            watch.raw = watch.value = watch.time = watch.previous = watch.seen = None
+
+    @property
+    def active(self):
+        return [rule for rule in self.rules if rule.active]
+
+    def process(self, frames):
+        """수신한 can.Message 목록으로 참조 신호를 갱신하고, 값이 바뀐 신호의 규칙만 평가합니다."""
+        by_id = self.by_id
+        now = time.monotonic()
+        for msg in frames:
+            watches = by_id.get(msg.arbitration_id)
+            if watches is None or msg.is_error_frame or msg.is_remote_frame:
+                continue
+            data = int.from_bytes(msg.data[:8], "little")
+            for watch in watches:
+                message = watch.message
+                if msg.dlc < watch.min_length or msg.is_extended_id != message.is_extended:
+                    continue
+                sig = watch.sig
+                if sig.multiplexer_id is not None and message.multiplexer is not None:
+                    if SignalFilter.extract_raw(message.multiplexer, data) != sig.multiplexer_id:
+                        continue
+                watch.seen = now
+                raw = SignalFilter.extract_raw(sig, data)
+                if raw == watch.raw:
+                    watch.time = msg.timestamp
+                    for rule in watch.steady_rules:
+                        if rule.waiting:
+                            rule.steady(now)
+                    continue
+                value = raw * sig.scale + sig.offset
+                if watch.raw is not None:
+                    watch.previous = (watch.value, watch.time)
+                watch.raw = raw
+                watch.value = value
+                watch.time = msg.timestamp
+                for rule in watch.rules:
+                    rule.evaluate(now)
+
+    def poll(self, now=None):
+        """지속 시간이 찬 조건, hold가 끝난 edge 알람, 미수신 신호를 확인합니다."""
+        now = time.monotonic() if now is None else now
+        for rule in self.rules:
+            if rule.waiting or isinstance(rule, StaleRule):
+                rule.poll(now)
+
+    def _raise(self, rule):
+        rule.active = True
+        rule.since = time.time()
+        self.raised += 1
+        self.events.append((rule.since, rule, True, rule.describe()))
+
+    def _clear(self, rule):
+        rule.active = False
+        self.events.append((time.time(), rule, False, rule.describe()))
+
+    def take_events(self):
+        events, self.events = self.events, []
+        return events
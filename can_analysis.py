@@ -0,0 +1,439 @@
+"""
+DBC에 정의되지 않은 CAN ID의 비트 변화 히트맵과 신호 후보 탐색.
+
+SignalDiscovery는 트레이스 저장소에서 아직 처리하지 않은 프레임만 청크 단위 NumPy
+연산으로 누적하여 ID별 비트 토글 횟수와 바이트 값 범위를 유지합니다. 카운터/체크섬/
+플래그/수치 신호 후보는 ID별 최근 WINDOW_FRAMES 프레임으로 판단하고, 수치 후보는
+Vehicle Speed 등 이미 알고 있는 신호와 시간 정렬 후 상관계수를 계산합니다.
+분석은 AnalysisWorker(QThread)에서 실행되므로 실시간 모니터링을 방해하지 않습니다.
+"""
+import numpy as np
+from PyQt6.QtCore import Qt, QThread, QTimer, QRectF, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import (
+    QWidget, QHBoxLayout, QVBoxLayout, QTableWidget, QTableWidgetItem, QLabel, QListWidget,
+    QAbstractItemView
+)
+
+from can_trace import FLAG_TX, FLAG_ERROR
+
+WINDOW_FRAMES = 4096 # ID별 후보 탐색에 사용하는 최근 프레임 수
+MIN_FRAMES = 16 # 후보 탐색에 필요한 최소 프레임 수
+COUNTER_RATIO = 0.9 # 같은 증가량이 이 비율 이상이면 카운터
+CHECKSUM_RATIO = 0.95 # 나머지 바이트 합/XOR과의 차이가 이 비율 이상 일정하면 체크섬
+SMOOTH_RATIO = 0.9 # 변화량이 작은(연속적인) 프레임이 이 비율 이상이면 수치 신호
+FLAG_TOGGLE_RATE = 0.05 # 이 비율 이하로 바뀌는 비트는 플래그 후보
+CORRELATION_THRESHOLD = 0.8 # 알려진 신호와 |r|이 이 값 이상이면 표시
+REFERENCE_SIGNALS = ("Vehicle_Speed", "Vehicle_Wheel_End_Angle", "EPS_Current_Angle", "BUS_Current")
+ANALYSIS_INTERVAL_MS = 2000 # 분석 패널이 보일 때 분석 주기
+
+
+def payload_bytes(data):
+    """little-endian uint64 페이로드 배열을 (n, 8) uint8 바이트 배열로 변환합니다."""
+    return np.ascontiguousarray(data, dtype="<u8").view(np.uint8).reshape(-1, 8)
+
+
+def _mode_fraction(values):
+    """가장 많이 나온 값과 그 비율을 반환합니다."""
+    uniq, counts = np.unique(values, return_counts=True)
+    k = counts.argmax()
+    return int(uniq[k]), counts[k] / len(values)
+
+
+class IdStatistics:
+    """
+    CAN ID 하나의 누적 통계 (비트별 토글 횟수, 바이트별 최소/최대)와 최근 프레임 창.
+    비트 번호는 DBC Intel start bit와 같습니다 (바이트 j의 비트 i -> 8*j + i).
+    """
+    def __init__(self, can_id):
+        self.can_id = can_id
+        self.frames = 0
+        self.dlc = 0
+        self.toggles = np.zeros(64, np.int64)
+        self.byte_min = np.full(8, 255, np.uint8)
+        self.byte_max = np.zeros(8, np.uint8)
+        self.last = None # 직전 페이로드
+        self.first_time = None
+        self.last_time = None
+        self.window_time = np.empty(0, np.float64)
+        self.window_data = np.empty(0, np.uint64)
+
+    def add(self, timestamps, dlc, data):
+        """같은 ID의 프레임 배열(시간순)을 누적합니다."""
+        previous = data[:1] if self.last is None else np.array([self.last], np.uint64)
+        diff = np.concatenate((previous, data[:-1])) ^ data
+        self.toggles += np.unpackbits(payload_bytes(diff), axis=1, bitorder="little").sum(axis=0, dtype=np.int64)
+        payload = payload_bytes(data)
+        np.minimum(self.byte_min, payload.min(axis=0), out=self.byte_min)
+        np.maximum(self.byte_max, payload.max(axis=0), out=self.byte_max)
+        self.dlc = max(self.dlc, int(dlc.max()))
+        self.frames += len(data)
+        self.last = data[-1]
+        if self.first_time is None:
+            self.first_time = float(timestamps[0])
+        self.last_time = float(timestamps[-1])
+        self.window_time = np.concatenate((self.window_time, timestamps))[-WINDOW_FRAMES:]
+        self.window_data = np.concatenate((self.window_data, data))[-WINDOW_FRAMES:]
+
+    @property
+    def rate(self):
+        """평균 수신 주기(Hz)."""
+        if self.frames < 2 or self.last_time <= self.first_time:
+            return 0.0
+        return (self.frames - 1) / (self.last_time - self.first_time)
+
+
+class IdReport:
+    """GUI 스레드로 넘겨주는 ID 하나의 분석 결과 (통계 사본과 후보 목록)."""
+    def __init__(self, stats, suggestions):
+        self.can_id = stats.can_id
+        self.frames = stats.frames
+        self.rate = stats.rate
+        self.dlc = stats.dlc
+        self.toggles = stats.toggles.copy()
+        self.byte_min = stats.byte_min.copy()
+        self.byte_max = stats.byte_max.copy()
+        self.suggestions = suggestions
+
+
+def _correlate(t, values, references):
+    """알려진 신호 중 상관계수 절댓값이 가장 큰 (이름, r)을 반환합니다."""
+    best = None
+    for name, (ref_time, ref_values) in references.items():
+        idx = np.searchsorted(ref_time, t, side="right") - 1 # 직전 값으로 정렬 (forward-fill)
+        valid = idx >= 0
+        if valid.sum() < MIN_FRAMES:
+            continue
+        x = values[valid].astype(np.float64)
+        y = ref_values[idx[valid]]
+        if x.std() == 0 or y.std() == 0:
+            continue
+        r = float(np.corrcoef(x, y)[0, 1])
+        if best is None or abs(r) > abs(best[1]):
+            best = (name, r)
+    return best
+
+
+def discover_signals(stats, references=None):
+    """
+    최근 프레임 창으로 카운터, 체크섬, 플래그, 8/16비트 수치 신호 후보를 찾아
+    설명 문자열 목록으로 반환합니다. references는 {신호 이름: (시각 배열, 물리값 배열)}.
+    """
+    references = references or {}
+    t = stats.window_time
+    n = len(t)
+    if n < MIN_FRAMES:
+        return []
+    payload = payload_bytes(stats.window_data).astype(np.int64)
+    nbytes = stats.dlc
+    constant = [payload[:, j].min() == payload[:, j].max() for j in range(nbytes)]
+    used = set() # 카운터/체크섬으로 판단된 바이트
+    suggestions = []
+
+    # 카운터: 바이트 또는 니블 값이 프레임마다 같은 양만큼 증가 (랩어라운드 포함)
+    for j in range(nbytes):
+        if constant[j]:
+            continue
+        for name, shift, mask in ((f"byte {j}", 0, 0xFF), (f"byte {j} low nibble", 0, 0xF),
+                                  (f"byte {j} high nibble", 4, 0xF)):
+            values = (payload[:, j] >> shift) & mask
+            if values.min() == values.max():
+                continue
+            step, ratio = _mode_fraction((values[1:] - values[:-1]) & mask)
+            if step and ratio >= COUNTER_RATIO:
+                suggestions.append(f"{name}: 카운터 후보 (증가량 {step}, {values.min()}~{values.max()}, 일치 {ratio:.0%})")
+                used.add(j)
+                break
+
+    # 체크섬: 나머지 바이트의 합 또는 XOR과 일정한 관계
+    for j in range(nbytes):
+        others = [k for k in range(nbytes) if k != j]
+        if constant[j] or j in used or not others or all(constant[k] for k in others):
+            continue
+        total = payload[:, others].sum(axis=1) & 0xFF
+        xor = np.bitwise_xor.reduce(payload[:, others], axis=1)
+        for name, op, residual in (("합", "+", (payload[:, j] - total) & 0xFF),
+                                   ("XOR", "^", payload[:, j] ^ xor)):
+            k, ratio = _mode_fraction(residual)
+            if ratio >= CHECKSUM_RATIO:
+                suggestions.append(f"byte {j}: 체크섬 후보 (나머지 바이트 {name} {op} 0x{k:02X}, 일치 {ratio:.0%})")
+                used.add(j)
+                break
+
+    # 16비트 수치: 상위 바이트가 바뀔 때(자리 올림) 합친 값이 연속적으로 변함
+    numeric = [] # (설명, 값 배열, 부호 있는 해석 가능 여부)
+    paired = set()
+    for j in range(nbytes - 1):
+        if {j, j + 1} & (used | paired):
+            continue
+        best = None
+        for order, lo, hi, start in (("Intel", j, j + 1, f"{8 * j}|16@1+"),
+                                     ("Motorola", j + 1, j, f"{8 * j + 7}|16@0+")):
+            if constant[hi]:
+                continue
+            if constant[lo]:
+                continue
+            values = payload[:, lo] + 256 * payload[:, hi]
+            carries = np.diff(payload[:, hi]) != 0
+            if carries.sum() < 4:
+                continue
+            smooth = float(np.mean(np.abs(np.diff(values)[carries]) < 256))
+            if smooth >= SMOOTH_RATIO and (best is None or smooth > best[0]):
+                best = (smooth, order, start, values)
+        if best is not None:
+            smooth, order, start, values = best
+            paired.update((j, j + 1))
+            numeric.append((f"bytes {j}-{j + 1}: 16비트 수치 후보 ({order}, SG_ {start}, "
+                            f"{values.min()}~{values.max()})", values, True))
+
+    # 8비트 수치 / 플래그
+    window_toggles = np.unpackbits(payload_bytes(stats.window_data[1:] ^ stats.window_data[:-1]),
+                                   axis=1, bitorder="little").sum(axis=0)
+    for j in range(nbytes):
+        if constant[j] or j in used or j in paired:
+            continue
+        distinct = len(np.unique(payload[:, j]))
+        if distinct > 8:
+            values = payload[:, j]
+            changes = np.abs(np.diff(values))
+            changes = changes[changes != 0]
+            if np.mean(changes <= 32) >= SMOOTH_RATIO:
+                numeric.append((f"byte {j}: 8비트 수치 후보 (SG_ {8 * j}|8@1+, {values.min()}~{values.max()})",
+                                values, False))
+            else:
+                suggestions.append(f"byte {j}: 불규칙하게 변함 ({distinct}가지 값, 해시/암호화 또는 다른 바이트와 결합된 값일 수 있음)")
+            continue
+        for i in range(8):
+            count = int(window_toggles[8 * j + i])
+            if 0 < count <= FLAG_TOGGLE_RATE * n:
+                suggestions.append(f"byte {j} bit {i}: 플래그 후보 (SG_ {8 * j + i}|1@1+, 최근 {n}프레임 중 {count}회 변화)")
+
+    for text, values, signed in numeric:
+        best = _correlate(t, values, references)
+        if signed and values.max() >= 0x8000:
+            signed_best = _correlate(t, np.where(values >= 0x8000, values - 0x10000, values), references)
+            if signed_best is not None and (best is None or abs(signed_best[1]) > abs(best[1])):
+                best = (signed_best[0] + " (부호 있음)", signed_best[1])
+        if best is not None and abs(best[1]) >= CORRELATION_THRESHOLD:
+            text += f" ~ {best[0]} (r={best[1]:+.2f})"
+        suggestions.append(text)
+    return suggestions
+
+
+class SignalDiscovery:
+    """
+    트레이스 저장소의 새 프레임을 ID별로 누적하고 미해석 ID의 분석 결과를 만듭니다.
+    update()/report()는 한 스레드(AnalysisWorker)에서만 호출합니다.
+    """
+    def __init__(self, messages, reference_signals=REFERENCE_SIGNALS):
+        self.known_ids = set(messages)
+        self.references = [] # (표시 이름, Message, Signal)
+        for message in messages.values():
+            for sig in message.signals:
+                if sig.name in reference_signals and message.payload_length <= 8:
+                    self.references.append((sig.label, message, sig))
+        self.reference_ids = {message.frame_id for _, message, _ in self.references}
+        self.stats = {} # CAN ID -> IdStatistics
+        self.scanned = 0 # 처리를 마친 전역 프레임 번호
+
+    def update(self, store):
+        """store(TraceStore.snapshot())에서 아직 처리하지 않은 수신 프레임을 누적합니다."""
+        for start, chunk, i, j in store.iter_chunks(max(self.scanned, store.base), store.count):
+            rows = np.flatnonzero((chunk.flags[i:j] & (FLAG_TX | FLAG_ERROR)) == 0) + i
+            ids = chunk.can_id[rows]
+            order = np.argsort(ids, kind="stable") # ID별로 모으되 시간 순서는 유지
+            uniq, first = np.unique(ids[order], return_index=True)
+            bounds = np.append(first, len(order))
+            for k, can_id in enumerate(uniq.tolist()):
+                if can_id in self.known_ids and can_id not in self.reference_ids:
+                    continue
+                sel = rows[order[bounds[k]:bounds[k + 1]]]
+                stats = self.stats.get(can_id)
+                if stats is None:
+                    stats = self.stats[can_id] = IdStatistics(can_id)
+                stats.add(chunk.timestamp[sel], chunk.dlc[sel], chunk.data[sel])
+        self.scanned = store.count
+
+    def report(self):
+        """미해석 ID별 IdReport 목록을 반환합니다."""
+        references = {}
+        for label, message, sig in self.references:
+            stats = self.stats.get(message.frame_id)
+            if stats is not None and stats.dlc >= message.min_length:
+                references[label] = (stats.window_time, sig.physical_array(stats.window_data))
+        return [IdReport(stats, discover_signals(stats, references))
+                for can_id, stats in sorted(self.stats.items()) if can_id not in self.known_ids]
+
+
+class AnalysisWorker(QThread):
+    """
+    SignalDiscovery처럼 update(store)/report()를 가진 분석기를 백그라운드에서 실행하고
+    결과를 report_ready 시그널로 전달합니다.
+    """
+    report_ready = pyqtSignal(object, object) # (분석기, report() 결과)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.discovery = None
+        self.snapshot = None
+
+    def run(self):
+        discovery = self.discovery
+        discovery.update(self.snapshot)
+        self.report_ready.emit(discovery, discovery.report())
+
+
+class BitHeatmap(QWidget):
+    """
+    바이트(행) x 비트(열, 7..0) 토글 빈도 히트맵.
+    색이 진할수록 해당 비트가 자주 바뀝니다.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rates = np.zeros(64)
+        self.dlc = 0
+        self.setMinimumSize(260, 200)
+
+    def set_report(self, report):
+        if report is None:
+            self.rates = np.zeros(64)
+            self.dlc = 0
+        else:
+            self.rates = report.toggles / max(report.frames - 1, 1)
+            self.dlc = report.dlc
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        margin = 24
+        cell_w = (self.width() - margin) / 8
+        cell_h = (self.height() - margin) / 8
+        painter.setPen(self.palette().text().color())
+        for bit in range(8):
+            painter.drawText(QRectF(margin + (7 - bit) * cell_w, 0, cell_w, margin),
+                             Qt.AlignmentFlag.AlignCenter, str(bit))
+        for byte in range(8):
+            painter.drawText(QRectF(0, margin + byte * cell_h, margin, cell_h),
+                             Qt.AlignmentFlag.AlignCenter, str(byte))
+            for bit in range(8):
+                rect = QRectF(margin + (7 - bit) * cell_w, margin + byte * cell_h, cell_w - 1, cell_h - 1)
+                if byte >= self.dlc:
+                    painter.fillRect(rect, QColor(220, 220, 220))
+                    continue
+                rate = float(self.rates[8 * byte + bit])
+                level = int(255 * (1.0 - min(rate, 1.0) ** 0.5)) # 드물게 바뀌는 비트도 보이도록 제곱근 스케일
+                painter.fillRect(rect, QColor(255, level, level))
+                if rate:
+                    painter.setPen(Qt.GlobalColor.black)
+                    painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, f"{rate:.0%}" if rate >= 0.01 else "<1%")
+        painter.end()
+
+
+class AnalysisPanel(QWidget):
+    """
+    미해석 ID 목록, 선택한 ID의 비트 히트맵/바이트 범위/신호 후보를 보여주는 패널.
+    패널이 보일 때만 ANALYSIS_INTERVAL_MS 주기로 백그라운드 분석을 요청합니다.
+    """
+    def __init__(self, store, messages, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.messages = messages
+        self.discovery = SignalDiscovery(messages)
+        self.reports = {}
+        self.selected_id = None
+
+        self.worker = AnalysisWorker(self)
+        self.worker.report_ready.connect(self._on_report)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.request_analysis)
+        self.timer.start(ANALYSIS_INTERVAL_MS)
+
+        layout = QHBoxLayout(self)
+        self.id_table = QTableWidget(0, 5)
+        self.id_table.setHorizontalHeaderLabels(["CAN ID", "Frames", "Hz", "DLC", "Candidates"])
+        self.id_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.id_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.id_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.id_table.verticalHeader().hide()
+        layout.addWidget(self.id_table, 2)
+
+        detail_layout = QVBoxLayout()
+        self.title_label = QLabel("미해석 ID를 선택하세요.")
+        detail_layout.addWidget(self.title_label)
+        self.heatmap = BitHeatmap()
+        detail_layout.addWidget(self.heatmap, 2)
+        self.range_table = QTableWidget(2, 8)
+        self.range_table.setVerticalHeaderLabels(["Min", "Max"])
+        self.range_table.setHorizontalHeaderLabels([f"B{i}" for i in range(8)])
+        self.range_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.range_table.setMaximumHeight(90)
+        for column in range(8):
+            self.range_table.setColumnWidth(column, 40)
+        detail_layout.addWidget(self.range_table)
+        self.suggestion_list = QListWidget()
+        detail_layout.addWidget(self.suggestion_list, 1)
+        layout.addLayout(detail_layout, 3)
+
+        self.id_table.itemSelectionChanged.connect(self._on_selection_changed)
+
+    def request_analysis(self):
+        """보이는 상태이고 이전 분석이 끝났으면 새 프레임에 대한 분석을 시작합니다."""
+        if not self.isVisible() or self.worker.isRunning():
+            return
+        self.worker.discovery = self.discovery
+        self.worker.snapshot = self.store.snapshot()
+        self.worker.start(QThread.Priority.LowPriority)
+
+    def clear(self):
+        """누적 통계를 초기화합니다."""
+        self.discovery = SignalDiscovery(self.messages)
+        self.reports = {}
+        self.selected_id = None
+        self.id_table.setRowCount(0)
+        self._show_detail(None)
+
+    def shutdown(self):
+        """창을 닫을 때 실행 중인 분석이 끝날 때까지 기다립니다."""
+        self.timer.stop()
+        self.worker.wait()
+
+    def _on_report(self, discovery, reports):
+        if discovery is not self.discovery:
+            return # clear() 이전에 시작된 분석 결과
+        self.reports = {report.can_id: report for report in reports}
+        self.id_table.blockSignals(True)
+        self.id_table.setRowCount(len(reports))
+        for row, report in enumerate(reports):
+            values = [f"0x{report.can_id:03X}", str(report.frames), f"{report.rate:.1f}",
+                      str(report.dlc), str(len(report.suggestions))]
+            for column, text in enumerate(values):
+                item = self.id_table.item(row, column)
+                if item is None:
+                    self.id_table.setItem(row, column, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
+            if report.can_id == self.selected_id:
+                self.id_table.selectRow(row)
+        self.id_table.blockSignals(False)
+        self._show_detail(self.reports.get(self.selected_id))
+
+    def _on_selection_changed(self):
+        rows = self.id_table.selectionModel().selectedRows()
+        if not rows:
+            return
+        self.selected_id = int(self.id_table.item(rows[0].row(), 0).text(), 16)
+        self._show_detail(self.reports.get(self.selected_id))
+
+    def _show_detail(self, report):
+        self.heatmap.set_report(report)
+        self.suggestion_list.clear()
+        if report is None:
+            self.title_label.setText("미해석 ID를 선택하세요.")
+            self.range_table.clearContents()
+            return
+        self.title_label.setText(f"0x{report.can_id:03X}: {report.frames} frames, {report.rate:.1f} Hz, DLC {report.dlc}")
+        for byte in range(8):
+            inside = byte < report.dlc
+            self.range_table.setItem(0, byte, QTableWidgetItem(f"{report.byte_min[byte]:02X}" if inside else ""))
+            self.range_table.setItem(1, byte, QTableWidgetItem(f"{report.byte_max[byte]:02X}" if inside else ""))
+        self.suggestion_list.addItems(report.suggestions or ["후보 없음 (프레임이 부족하거나 값이 일정함)"])
@@ -0,0 +1,131 @@
+"""
+프레임 목록 일괄 송신 (벤치 테스트용).
+
+파일 한 줄에 프레임 하나를 cansend 형식(123#DEADBEEF, 1ABCDEF0#01, 123#R)으로 적거나,
+candump -L 로그 줄("(1690000000.123456) can0 123#DEADBEEF")을 그대로 사용할 수 있습니다.
+빈 줄과 '#'으로 시작하는 줄은 무시합니다. 기록 파일(.pclog)은 에러 프레임을 뺀 모든 프레임을
+기록된 순서대로 불러옵니다.
+
+불러올 때 모든 프레임을 can.Message로 미리 만들어 두고, BulkTransmitter 스레드는 반복
+송신 시에도 같은 객체를 송신 큐(can_tx)에 넣습니다. coalesce=False로 넣으므로 같은 ID의
+프레임도 합쳐지지 않고 순서대로 나가며, 송신 버퍼 가득 참 재시도와 송신 빈도 제한은 다른
+송신과 똑같이 송신 큐가 처리합니다. 버스에 직접 보내지 않으므로 일괄 송신이 송신 버퍼를
+채워 주행 명령 프레임이 버려지는 일이 없습니다.
+"""
+import threading
+import time
+
+import can
+from PyQt6.QtCore import QThread
+
+from can_log import RecordingReader, RECORDING_EXTENSION
+
+MAX_QUEUED = 32 # 송신 큐에 쌓아 둘 최대 프레임 수 (1Mbps에서 약 4ms 분량)
+QUEUE_POLL = 0.0005 # 송신 큐가 줄기를 기다리는 간격 (초)
+
+
+def parse_frame(text, where):
+    """cansend 형식 'ID#DATA' 한 프레임을 can.Message로 변환합니다."""
+    can_id_text, sep, data_text = text.partition("#")
+    if not sep:
+        raise ValueError(f"{where}: 'ID#DATA' 형식이 아닙니다.")
+    try:
+        can_id = int(can_id_text, 16)
+    except ValueError:
+        raise ValueError(f"{where}: 유효한 16진수 CAN ID가 아닙니다: '{can_id_text}'")
+    extended = len(can_id_text) > 3 # cansend와 같이 8자리 ID는 확장 ID
+    if can_id > (0x1FFFFFFF if extended else 0x7FF):
+        raise ValueError(f"{where}: CAN ID 범위를 벗어났습니다: '{can_id_text}'")
+    if data_text.upper().startswith("R"):
+        dlc = int(data_text[1:]) if data_text[1:] else 0
+        return can.Message(arbitration_id=can_id, is_extended_id=extended, is_remote_frame=True, dlc=dlc)
+    data_text = data_text.replace(".", "")
+    if data_text.startswith("#"):
+        raise ValueError(f"{where}: CAN FD 프레임은 지원하지 않습니다.")
+    try:
+        data = bytes.fromhex(data_text)
+    except ValueError:
+        raise ValueError(f"{where}: 데이터가 16진수 바이트가 아닙니다: '{data_text}'")
+    if len(data) > 8:
+        raise ValueError(f"{where}: 데이터가 8바이트를 넘습니다.")
+    return can.Message(arbitration_id=can_id, data=data, is_extended_id=extended)
+
+
+def load_frame_list(path):
+    """프레임 목록 파일을 읽어 can.Message 목록을 반환합니다. 형식 오류는 ValueError."""
+    if path.lower().endswith(RECORDING_EXTENSION):
+        with RecordingReader(path) as reader:
+            frames = [msg for msg in reader.messages() if not msg.is_error_frame]
+        if not frames:
+            raise ValueError("보낼 프레임이 없습니다.")
+        return frames
+    frames = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split()
+            if fields[0].startswith("("): # candump -L: (timestamp) interface ID#DATA
+                if len(fields) < 3:
+                    raise ValueError(f"{line_no}행: candump 로그 형식이 아닙니다.")
+                fields = fields[2:]
+            frames.append(parse_frame(fields[0], f"{line_no}행"))
+    if not frames:
+        raise ValueError("보낼 프레임이 없습니다.")
+    return frames
+
+
+class BulkTransmitter(QThread):
+    """
+    미리 만든 프레임 목록을 repeat번 송신 큐에 넣는 스레드.
+    rate가 0이면 송신 큐가 받아 주는 만큼 빠르게, 아니면 초당 rate 프레임으로 넣습니다.
+    송신 큐에 MAX_QUEUED개가 넘게 대기 중이면 줄어들 때까지 기다리므로, 주행 명령 프레임은
+    일괄 송신 중에도 많아야 MAX_QUEUED개 뒤에서 기다립니다. 송신/트레이스 기록은 송신 큐가 합니다.
+    """
+    def __init__(self, tx_queue, frames, rate=0.0, repeat=1, parent=None):
+        super().__init__(parent)
+        self.tx_queue = tx_queue
+        self.frames = frames
+        self.rate = rate
+        self.repeat = repeat
+        self.total = len(frames) * repeat
+        self.queued = 0 # 송신 큐에 넣은 프레임 수
+        self.started_at = None
+        self.elapsed = 0.0
+        self._abort = threading.Event()
+
+    def abort(self):
+        self._abort.set()
+
+    @property
+    def frames_per_second(self):
+        elapsed = (time.perf_counter() - self.started_at) if self.isRunning() and self.started_at else self.elapsed
+        return self.queued / elapsed if elapsed > 0 else 0.0
+
+    def status_text(self):
+        return f"Bulk {self.queued}/{self.total}, {self.frames_per_second:.0f} frames/s"
+
+    def run(self):
+        tx_queue = self.tx_queue
+        frames = self.frames
+        period = 1.0 / self.rate if self.rate > 0 else 0.0
+        self.started_at = start = time.perf_counter()
+        index = 0
+        for _ in range(self.repeat):
+            if self._abort.is_set():
+                break
+            for msg in frames:
+                if self._abort.is_set():
+                    break
+                if period:
+                    delay = start + index * period - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                index += 1
+                while len(tx_queue) >= MAX_QUEUED and not self._abort.is_set():
+                    time.sleep(QUEUE_POLL)
+                # 같은 ID를 합치지 않고 넣은 순서대로 보냄
+                tx_queue.send(msg, coalesce=False)
+                self.queued += 1
+        self.elapsed = time.perf_counter() - start
@@ -0,0 +1,264 @@
+"""
+트리거 전/후 구간 캡처.
+
+CaptureRing은 (pre_seconds + post_seconds) * max_rate 프레임 크기로 미리 할당한 필드별 NumPy 링
+버퍼에 트레이스의 새 프레임(수신/송신)을 계속 복사해 둡니다. 트리거가 걸리면 그 시각 기준 앞
+pre_seconds와 뒤 post_seconds 동안의 프레임을, 뒤 구간이 지난 뒤 링에서 잘라 CaptureWriter 스레드로
+넘기고, 스레드가 기록 파일(.pclog)로 저장합니다. GUI 스레드는 배열 복사만 하므로 저장 중에도 수신이
+멈추지 않습니다.
+
+트리거는 can_filter 식이며 조건이 거짓에서 참으로 바뀌는 프레임에서 걸립니다. 조건에 쓰인 ID의
+프레임으로만 참/거짓을 판단하므로 다른 ID의 프레임이 사이에 있어도 눌린 동안 한 번만 걸립니다.
+    Emergency Button   Emergency_Button == "Pressed"
+    Touch Switch       Front_Touch_Switch == "trigger" or Back_Touch_Switch == "trigger"
+    BUS Current        BUS_Current > current_limit
+    trigger(이름)       수동 트리거
+캡처를 기다리는 동안 걸린 다른 트리거는 새 캡처를 만들지 않고 그 캡처의 트리거 목록에 더합니다.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from can_filter import compile_filter, AndFilter, OrFilter, NotFilter, IdFilter, SignalFilter
+from can_log import RecordingWriter
+
+log = logging.getLogger(__name__)
+
+CAPTURE_MAX_RATE = 10000 # 링 크기를 정하는 최대 프레임 수/초 (1Mbps CAN 8바이트 프레임은 약 8000)
+
+
+def default_triggers(current_limit):
+    """기본 트리거 {이름: 필터 식}."""
+    return {
+        "Emergency Button": 'Emergency_Button == "Pressed"',
+        "Touch Switch": 'Front_Touch_Switch == "trigger" or Back_Touch_Switch == "trigger"',
+        "BUS Current": f"BUS_Current > {current_limit}",
+    }
+
+
+def _condition_ids(node):
+    """조건이 참/거짓을 판단하는 데 쓰는 CAN ID 집합. 데이터 패턴/ID 범위가 있으면 None(모든 프레임)."""
+    if isinstance(node, (AndFilter, OrFilter)):
+        ids = set()
+        for child in node.nodes:
+            child_ids = _condition_ids(child)
+            if child_ids is None:
+                return None
+            ids |= child_ids
+        return ids
+    if isinstance(node, NotFilter):
+        return _condition_ids(node.node)
+    if isinstance(node, SignalFilter):
+        return {message.frame_id for message, _ in node.targets}
+    if isinstance(node, IdFilter) and not node.ranges:
+        return set(node.id_set)
+    return None
+
+
+class CaptureTrigger:
+    """필터 식 하나로 만든 트리거. 조건에 쓰인 ID의 마지막 프레임에서의 참/거짓을 기억합니다."""
+    def __init__(self, name, text, messages):
+        self.name = name
+        self.filter = compile_filter(text, messages)
+        if self.filter is None:
+            raise ValueError(f"트리거 '{name}'의 식이 비어 있습니다.")
+        ids = _condition_ids(self.filter.root)
+        self.ids = None if ids is None else np.array(sorted(ids), np.uint32)
+        self.active = False
+
+    def fired(self, timestamp, can_id, dlc, data):
+        """블록에서 조건이 참으로 바뀐 프레임들의 시각 배열을 반환합니다."""
+        if self.ids is not None:
+            rows = np.flatnonzero(np.isin(can_id, self.ids))
+            if not len(rows):
+                return timestamp[:0]
+            timestamp, can_id, dlc, data = timestamp[rows], can_id[rows], dlc[rows], data[rows]
+        state = self.filter.mask(can_id, dlc, data)
+        previous = np.empty(len(state), bool)
+        previous[0] = self.active
+        previous[1:] = state[:-1]
+        self.active = bool(state[-1])
+        return timestamp[state & ~previous]
+
+
+class Capture:
+    """
+    저장을 기다리는 캡처 하나. start/stop은 프레임 시각 기준이고, 인터페이스에 따라 프레임 시각이
+    벽시계와 다를 수 있으므로 완료 시점은 트리거를 감지한 벽시계 시각 기준 deadline으로 판단합니다.
+    """
+    def __init__(self, name, trigger_time, pre_seconds, post_seconds):
+        self.triggers = [(name, trigger_time)]
+        self.start = trigger_time - pre_seconds
+        self.stop = trigger_time + post_seconds
+        self.deadline = time.time() + post_seconds
+
+
+class CaptureWriter:
+    """캡처한 프레임 배열을 기록 파일로 저장하는 스레드. 결과는 saved/errors에 쌓입니다."""
+    def __init__(self, directory):
+        self.directory = directory
+        self.saved = deque() # (경로, 프레임 수, 트리거 이름 목록)
+        self.errors = deque()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="CaptureWriter", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """대기 중인 캡처를 모두 저장한 뒤 스레드를 멈춥니다."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, capture, fields):
+        self._queue.put((capture, fields))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            capture, fields = item
+            try:
+                self.saved.append(self._write(capture, fields))
+            except Exception as e:
+                self.errors.append(e)
+
+    def _write(self, capture, fields):
+        os.makedirs(self.directory, exist_ok=True)
+        name, trigger_time = capture.triggers[0]
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(trigger_time))
+        label = "".join(c if c.isalnum() else "_" for c in name)
+        path = os.path.join(self.directory, f"capture_{stamp}_{label}.pclog")
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.directory, f"capture_{stamp}_{label}_{suffix}.pclog")
+        # 송신 프레임은 수신 프레임보다 늦게 기록될 수 있으므로 시각 순으로 정렬하여 저장
+        order = np.argsort(fields[0], kind="stable")
+        with RecordingWriter(path) as writer:
+            writer.write(*(column[order] for column in fields))
+        return path, len(order), [trigger for trigger, _ in capture.triggers]
+
+
+class CaptureRing:
+    """
+    트리거 전/후 구간 캡처용 링 버퍼. update(store)를 수신 주기마다 GUI 스레드에서 호출합니다.
+    triggers는 {이름: 필터 식}이며 식이 잘못되면 ValueError를 발생시킵니다.
+    """
+    def __init__(self, messages, triggers, directory, pre_seconds=10.0, post_seconds=5.0,
+                 max_rate=CAPTURE_MAX_RATE):
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.capacity = max(1, int((pre_seconds + post_seconds) * max_rate))
+        self.timestamp = np.zeros(self.capacity, np.float64)
+        self.can_id = np.zeros(self.capacity, np.uint32)
+        self.dlc = np.zeros(self.capacity, np.uint8)
+        self.flags = np.zeros(self.capacity, np.uint8)
+        self.data = np.zeros(self.capacity, np.uint64)
+        self.count = 0 # 링에 넣은 전체 프레임 수
+        self.scanned = None # 트레이스에서 다음에 읽을 전역 프레임 번호
+        self.triggers = [CaptureTrigger(name, text, messages) for name, text in triggers.items()]
+        self.pending = [] # 뒤 구간을 기다리는 Capture
+        self.captures = 0 # 저장을 요청한 캡처 수
+        self.truncated = 0 # 링이 작아 앞 구간 일부를 잃은 캡처 수
+        self.writer = CaptureWriter(directory)
+        self.writer.start()
+
+    def close(self):
+        """기다리는 캡처를 지금까지의 프레임으로 저장하고 저장 스레드를 멈춥니다."""
+        for capture in self.pending:
+            self._submit(capture)
+        self.pending = []
+        self.writer.stop()
+
+    def trigger(self, name, trigger_time=None):
+        """
+        트리거를 겁니다 (수동 트리거 등). 시각을 주지 않으면 마지막 프레임 시각을 사용합니다.
+        기다리는 캡처가 있으면 그 캡처에 더합니다.
+        """
+        if trigger_time is None:
+            trigger_time = self.latest_time()
+        for capture in self.pending:
+            if capture.start <= trigger_time <= capture.stop:
+                capture.triggers.append((name, trigger_time))
+                return
+        log.info("캡처 트리거: %s (%s)", name, time.strftime("%H:%M:%S", time.localtime(trigger_time)))
+        self.pending.append(Capture(name, trigger_time, self.pre_seconds, self.post_seconds))
+
+    def update(self, store):
+        """트레이스의 새 프레임을 링에 넣고 트리거를 검사한 뒤, 뒤 구간이 지난 캡처를 저장 스레드로 넘깁니다."""
+        if self.scanned is None or self.scanned < store.base:
+            self.scanned = store.base
+        for _, chunk, i, j in store.iter_chunks(self.scanned):
+            fields = (chunk.timestamp[i:j], chunk.can_id[i:j], chunk.dlc[i:j], chunk.flags[i:j], chunk.data[i:j])
+            self._append(fields)
+            for trigger in self.triggers:
+                for t in trigger.fired(fields[0], fields[1], fields[2], fields[4]).tolist():
+                    self.trigger(trigger.name, t)
+        self.scanned = store.count
+        if self.pending:
+            now = time.time()
+            latest = self.latest_time()
+            done = [capture for capture in self.pending if latest >= capture.stop or now >= capture.deadline]
+            for capture in done:
+                self.pending.remove(capture)
+                self._submit(capture)
+
+    def latest_time(self):
+        """링에 마지막으로 넣은 프레임의 시각 (프레임이 없으면 지금 시각)."""
+        if not self.count:
+            return time.time()
+        return float(self.timestamp[(self.count - 1) % self.capacity])
+
+    def _append(self, fields):
+        n = len(fields[0])
+        if n > self.capacity:
+            fields = tuple(column[-self.capacity:] for column in fields)
+            self.count += n - self.capacity
+            n = self.capacity
+        start = self.count % self.capacity
+        first = min(n, self.capacity - start)
+        for ring, column in zip((self.timestamp, self.can_id, self.dlc, self.flags, self.data), fields):
+            ring[start:start + first] = column[:first]
+            ring[:n - first] = column[first:]
+        self.count += n
+
+    def _submit(self, capture):
+        """링에서 캡처 구간의 프레임을 복사해 저장 스레드로 넘깁니다."""
+        held = min(self.count, self.capacity)
+        timestamp = self.timestamp[:held]
+        rows = np.flatnonzero((timestamp >= capture.start) & (timestamp <= capture.stop))
+        if self.count > self.capacity and timestamp.min() > capture.start:
+            self.truncated += 1 # 앞 구간 일부가 이미 덮어써짐
+        fields = tuple(column[rows] for column in (self.timestamp, self.can_id, self.dlc, self.flags, self.data))
+        self.captures += 1
+        self.writer.submit(capture, fields)
+
+    def take_saved(self):
+        """저장을 마친 캡처 (경로, 프레임 수, 트리거 이름 목록)와 저장 오류 목록을 반환합니다."""
+        saved = []
+        while self.writer.saved:
+            saved.append(self.writer.saved.popleft())
+        errors = []
+        while self.writer.errors:
+            errors.append(self.writer.errors.popleft())
+        return saved, errors
+
+    def status_text(self):
+        text = f"Captures {self.captures}"
+        if self.pending:
+            text += f" (recording {len(self.pending)})"
+        if self.truncated:
+            text += f", truncated {self.truncated}"
+        return text
@@ -0,0 +1,638 @@
+"""
+DBC 파일로부터 CAN 신호 정의를 읽어 CAN ID별 디코더로 컴파일하는 모듈.
+
+신호 정의는 patrolcar.dbc 한 곳에만 존재하며, 각 GUI 스크립트는 CANParser를
+import 하여 사용합니다. 각 메시지는 신호 표를 순회하는 대신 메시지 전용의
+직선형 파이썬 함수(페이로드를 정수 하나로 읽은 뒤 미리 계산된 시프트/마스크와
+인라인 scale/offset 식)로 코드 생성되어 시작 시 한 번 compile() 됩니다.
+Intel/Motorola 바이트 순서와 멀티플렉스 신호를 지원합니다.
+
+같은 신호 정의로 송신 프레임 인코더도 생성합니다. 인코더는 물리값 범위 제한,
+raw 변환, 비트 배치를 한 함수에 펼친 뒤 재사용 버퍼에 struct.pack_into로
+기록하므로 디코더와 비트 단위로 정확히 왕복합니다. DBC 파싱 결과와 생성된 소스는
+파일 해시를 키로 디스크에 캐시되므로 메시지가 수백 개인 DBC도 두 번째
+실행부터는 파싱 없이 바로 로드됩니다.
+"""
+import hashlib
+import os
+import pickle
+import re
+import struct
+
+import numpy as np
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DBC_FILE = os.path.join(_BASE_DIR, "patrolcar.dbc")
+CACHE_DIR = os.path.join(_BASE_DIR, ".can_cache")
+CACHE_VERSION = 6 # 캐시 내용 형식이 바뀌면 증가시켜 이전 캐시를 무효화
+
+_BO_RE = re.compile(r'BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)\s+(\w+)')
+_SG_RE = re.compile(
+    r'SG_\s+(\w+)\s*(M|m\d+M?)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*'
+    r'\(\s*([^,]+?)\s*,\s*([^)]+?)\s*\)\s*\[\s*([^|]+?)\s*\|\s*([^\]]+?)\s*\]\s*"([^"]*)"\s*(.*)')
+_VAL_RE = re.compile(r'^VAL_\s+(\d+)\s+(\w+)\s+(.*?);', re.M | re.S)
+_VAL_PAIR_RE = re.compile(r'(-?\d+)\s+"([^"]*)"')
+_CM_SG_RE = re.compile(r'^CM_\s+SG_\s+(\d+)\s+(\w+)\s+"(.*?)"\s*;', re.M | re.S)
+_BA_SG_RE = re.compile(r'^BA_\s+"(\w+)"\s+SG_\s+(\d+)\s+(\w+)\s+(.*?)\s*;', re.M)
+
+
+class Signal:
+    """
+    DBC의 SG_ 정의 하나에 해당하는 신호 정보.
+    """
+    def __init__(self, name, start, length, byte_order="little", signed=False,
+                 scale=1, offset=0, minimum=None, maximum=None, unit="", receivers=()):
+        self.name = name
+        self.start = start
+        self.length = length
+        self.byte_order = byte_order # 'little' (Intel, @1) / 'big' (Motorola, @0)
+        self.signed = signed
+        self.scale = scale
+        self.offset = offset
+        self.minimum = minimum
+        self.maximum = maximum
+        self.unit = unit
+        self.receivers = tuple(receivers)
+        self.is_multiplexer = False
+        self.multiplexer_id = None # mN 신호일 때 N
+        self.choices = None # VAL_ 테이블 {raw: 문자열}
+        self.comment = None
+        self.display_name = None # BA_ "DisplayName"
+        self.display_format = None # BA_ "DisplayFormat" (예: ".2f")
+        self.initial = None # BA_ "GenSigStartValue" (raw 값, 송신 시 기본값)
+
+    @property
+    def label(self):
+        """GUI 테이블에 표시할 신호 이름을 반환합니다."""
+        if self.display_name:
+            return self.display_name
+        return f"{self.name} ({self.unit})" if self.unit else self.name
+
+    @property
+    def byte_span(self):
+        """신호가 걸쳐 있는 바이트 구간 [lo, hi)를 반환합니다."""
+        if self.byte_order == "little":
+            return self.start // 8, (self.start + self.length - 1) // 8 + 1
+        msb = (self.start // 8) * 8 + (7 - self.start % 8) # 바이트0의 MSB를 0으로 하는 순차 비트 번호
+        return self.start // 8, (msb + self.length - 1) // 8 + 1
+
+    def bit_layout(self, nbytes):
+        """
+        nbytes 길이의 페이로드 전체를 정수 하나로 읽었을 때 이 신호의 (shift, mask)를
+        반환합니다. Intel 신호는 little-endian 정수, Motorola 신호는 big-endian 정수 기준입니다.
+        """
+        mask = (1 << self.length) - 1
+        if self.byte_order == "little":
+            return self.start, mask
+        msb = (self.start // 8) * 8 + (7 - self.start % 8)
+        return 8 * nbytes - msb - self.length, mask
+
+    def raw_array(self, data):
+        """
+        8바이트 페이로드를 little-endian uint64로 담은 NumPy 배열(can_trace 저장 형식)에서
+        이 신호의 raw 값 배열을 꺼냅니다. (페이로드가 8바이트 이하인 메시지 전용)
+        """
+        if self.byte_order == "big":
+            data = data.byteswap()
+        shift, mask = self.bit_layout(8)
+        raw = (data >> np.uint64(shift)) & np.uint64(mask)
+        if self.signed:
+            sign_bit = 1 << (self.length - 1)
+            raw = (raw.astype(np.int64) ^ sign_bit) - sign_bit
+        return raw
+
+    def physical_array(self, data):
+        """raw_array()에 scale/offset을 적용한 물리값(float64) 배열을 반환합니다."""
+        return self.raw_array(data) * float(self.scale) + float(self.offset)
+
+    @property
+    def format_spec(self):
+        """물리값 표시 형식을 반환합니다. 지정이 없으면 scale의 소수 자릿수를 따릅니다."""
+        if self.display_format:
+            return self.display_format
+        if isinstance(self.scale, float) or isinstance(self.offset, float):
+            decimals = repr(float(self.scale)).split(".")[1].rstrip("0")
+            return f".{max(len(decimals), 1)}f"
+        return ""
+
+
+class Message:
+    """
+    DBC의 BO_ 정의 하나에 해당하는 메시지 정보.
+    """
+    def __init__(self, frame_id, name, length, sender, is_extended=False):
+        self.frame_id = frame_id
+        self.name = name
+        self.length = length
+        self.sender = sender
+        self.is_extended = is_extended
+        self.signals = []
+
+    def signal(self, name):
+        """이름으로 신호를 찾습니다."""
+        for sig in self.signals:
+            if sig.name == name:
+                return sig
+        raise KeyError(f"메시지 {self.name}에 신호 '{name}'이(가) 없습니다.")
+
+    @property
+    def min_length(self):
+        """모든 신호를 디코딩하는 데 필요한 최소 데이터 길이(바이트)."""
+        return max((s.byte_span[1] for s in self.signals), default=0)
+
+    @property
+    def payload_length(self):
+        """Motorola 신호의 비트 위치 계산 기준이 되는 페이로드 길이(바이트)."""
+        return max(self.length, self.min_length)
+
+    @property
+    def multiplexer(self):
+        """멀티플렉서(M) 신호를 반환합니다. 없으면 None."""
+        for sig in self.signals:
+            if sig.is_multiplexer:
+                return sig
+        return None
+
+
+def _number(text):
+    """DBC 숫자 문자열을 int 또는 float로 변환합니다."""
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _unquote(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+        return text[1:-1]
+    return _number(text)
+
+
+def parse_dbc(text):
+    """
+    DBC 텍스트를 파싱하여 {CAN ID: Message} 딕셔너리를 반환합니다.
+    cantools가 읽는 DBC 문법 중 BO_, SG_, VAL_, CM_ SG_, BA_ SG_ 를 지원합니다.
+    """
+    messages = {}
+    message = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("BO_ "):
+            m = _BO_RE.match(stripped)
+            if m is None:
+                raise ValueError(f"잘못된 BO_ 정의: {stripped}")
+            frame_id = int(m.group(1))
+            is_extended = bool(frame_id & 0x80000000)
+            frame_id &= 0x1FFFFFFF
+            message = Message(frame_id, m.group(2), int(m.group(3)), m.group(4), is_extended)
+            messages[frame_id] = message
+        elif stripped.startswith("SG_ "):
+            m = _SG_RE.match(stripped)
+            if m is None or message is None:
+                raise ValueError(f"잘못된 SG_ 정의: {stripped}")
+            (name, mux, start, length, order, sign, scale, offset,
+             minimum, maximum, unit, receivers) = m.groups()
+            sig = Signal(name, int(start), int(length),
+                         byte_order="little" if order == "1" else "big",
+                         signed=(sign == "-"),
+                         scale=_number(scale), offset=_number(offset),
+                         minimum=_number(minimum), maximum=_number(maximum), unit=unit,
+                         receivers=[r for r in re.split(r'[\s,]+', receivers) if r])
+            if mux:
+                sig.is_multiplexer = mux.endswith("M")
+                if mux.startswith("m"):
+                    sig.multiplexer_id = int(mux[1:].rstrip("M"))
+            message.signals.append(sig)
+        elif stripped:
+            message = None
+
+    def find(frame_id, sig_name):
+        msg = messages.get(int(frame_id) & 0x1FFFFFFF)
+        return msg.signal(sig_name) if msg else None
+
+    for frame_id, sig_name, body in _VAL_RE.findall(text):
+        sig = find(frame_id, sig_name)
+        if sig is not None:
+            sig.choices = {int(raw): desc for raw, desc in _VAL_PAIR_RE.findall(body)}
+    for frame_id, sig_name, comment in _CM_SG_RE.findall(text):
+        sig = find(frame_id, sig_name)
+        if sig is not None:
+            sig.comment = comment
+    for attr, frame_id, sig_name, value in _BA_SG_RE.findall(text):
+        sig = find(frame_id, sig_name)
+        if sig is None:
+            continue
+        if attr == "DisplayName":
+            sig.display_name = _unquote(value)
+        elif attr == "DisplayFormat":
+            sig.display_format = _unquote(value)
+        elif attr == "GenSigStartValue":
+            sig.initial = int(_number(value))
+    return messages
+
+
+def _raw_expr(sig, nbytes):
+    """신호 raw 값을 페이로드 정수(raw/rb)에서 꺼내는 시프트/마스크 식을 만듭니다."""
+    shift, mask = sig.bit_layout(nbytes)
+    src = "raw" if sig.byte_order == "little" else "rb"
+    expr = f"({src} >> {shift}) & {mask:#x}" if shift else f"{src} & {mask:#x}"
+    if sig.signed:
+        sign_bit = 1 << (sig.length - 1)
+        expr = f"(({expr}) ^ {sign_bit:#x}) - {sign_bit:#x}"
+    return expr
+
+
+def _signal_item(message, index, sig, raw, lines, bound):
+    """
+    신호 하나의 표시 문자열 식을 만듭니다.
+    (식 계산 전에 필요한 문장 목록, 표시 문자열 식)을 반환합니다.
+    """
+    prefix = f"_{message.frame_id:X}"
+    if sig.choices is not None:
+        table = f"{prefix}_CHOICES_{index}"
+        local = f"_c{index}"
+        full = not sig.signed and set(sig.choices) == set(range(1 << sig.length))
+        if full and sig.length == 1 and raw is None:
+            # 1비트 열거형은 시프트 없이 비트 검사 조건식으로 선택
+            shift, _ = sig.bit_layout(message.payload_length)
+            src = "raw" if sig.byte_order == "little" else "rb"
+            return [], f"{sig.choices[1]!r} if {src} & {1 << shift:#x} else {sig.choices[0]!r}"
+        raw = raw or _raw_expr(sig, message.payload_length)
+        bound.append((local, table))
+        if full:
+            # 모든 raw 값이 정의된 열거형은 튜플 인덱싱으로 조회
+            lines.append(f"{table} = {tuple(sig.choices[k] for k in range(1 << sig.length))!r}")
+            return [], f"{local}[{raw}]"
+        lines.append(f"{table} = {sig.choices!r}")
+        return [f"r{index} = {raw}"], f"{local}[r{index}] if r{index} in {local} else str(r{index})"
+
+    value = _value_item(message, sig, raw)
+    spec = sig.format_spec
+    return [], (f"f'{{{value}:{spec}}}'" if spec else f"str({value})")
+
+
+def _value_item(message, sig, raw):
+    """신호 하나의 물리값(숫자) 식을 만듭니다. VAL_ 테이블이 있는 신호도 숫자를 반환합니다."""
+    raw = raw or _raw_expr(sig, message.payload_length)
+    value = f"({raw})" if " " in raw else raw
+    if not (isinstance(sig.scale, int) and sig.scale == 1):
+        value = f"{value} * {sig.scale!r}"
+    if not (isinstance(sig.offset, int) and sig.offset == 0):
+        if sig.offset < 0:
+            value = f"{value} - {-sig.offset!r}"
+        else:
+            value = f"{value} + {sig.offset!r}"
+    return value
+
+
+def _generate_message_decoder(message, func_name, lines, values=False):
+    """
+    메시지 하나에 대한 디코더 함수 소스를 lines에 추가합니다.
+    values=False이면 {표시 이름: 표시 문자열}, values=True이면 {신호 이름: 물리값}을 반환합니다.
+    페이로드 전체를 int.from_bytes로 정수 하나(Motorola 신호가 있으면 big-endian
+    정수 하나 추가)로 읽은 뒤, 각 신호는 미리 계산된 시프트/마스크로 꺼내므로
+    신호가 바이트 경계에 걸치거나 바이트 중간에서 시작해도 비용이 같습니다.
+    멀티플렉스 메시지는 멀티플렉서 값에 따라 해당 신호 그룹만 디코딩합니다.
+    """
+    mux_sig = message.multiplexer
+    for sig in message.signals:
+        if sig.is_multiplexer and sig.multiplexer_id is not None:
+            raise ValueError(f"{message.name}.{sig.name}: 확장(다단계) 멀티플렉싱은 지원하지 않습니다.")
+        if sig.multiplexer_id is not None and mux_sig is None:
+            raise ValueError(f"{message.name}.{sig.name}: 멀티플렉서(M) 신호가 없습니다.")
+
+    nbytes = message.payload_length
+    bound = []
+    common = []
+    groups = {}
+    for i, sig in enumerate(message.signals):
+        raw = "mux" if sig is mux_sig else None
+        if values:
+            item = (sig.name, [], _value_item(message, sig, raw))
+        else:
+            item = (sig.label, *_signal_item(message, i, sig, raw, lines, bound))
+        if sig.multiplexer_id is None:
+            common.append(item)
+        else:
+            groups.setdefault(sig.multiplexer_id, []).append(item)
+
+    has_little = any(sig.byte_order == "little" for sig in message.signals)
+    has_big = any(sig.byte_order == "big" for sig in message.signals)
+    if has_little and nbytes <= 8:
+        bound.append(("_q", "_UNPACK_LE"))
+    if has_big and nbytes == 8:
+        bound.append(("_qb", "_UNPACK_BE"))
+    defaults = "".join(f", {local}={table}" for local, table in bound) # 전역 대신 지역 변수로 조회
+    lines.append(f"def {func_name}(data, offset=0{defaults}):")
+    lines.append("    n = len(data) - offset")
+    lines.append(f"    if n < {message.min_length}:")
+    lines.append("        return {}")
+    # 8바이트 이상 남아 있으면 슬라이스 없이 unpack_from(offset)으로 바로 읽음
+    whole = "data[offset:] if offset else data"
+    if has_little and nbytes <= 8:
+        lines.append("    if n >= 8:")
+        lines.append("        raw, = _q(data, offset)")
+        lines.append("    else:")
+        lines.append(f"        raw = int.from_bytes({whole}, 'little')")
+    elif has_little:
+        lines.append(f"    raw = int.from_bytes(data[offset:offset + {nbytes}] if offset or n > {nbytes} "
+                     f"else data, 'little')")
+    if has_big and nbytes == 8:
+        lines.append("    if n >= 8:")
+        lines.append("        rb, = _qb(data, offset)")
+        lines.append("    else:")
+        lines.append(f"        rb = int.from_bytes({whole}, 'big') << (8 - n) * 8")
+    elif has_big:
+        lines.append(f"    rb = int.from_bytes(data[offset:offset + {nbytes}] if offset or n > {nbytes} "
+                     f"else data, 'big')")
+        lines.append(f"    if n < {nbytes}:")
+        lines.append(f"        rb <<= ({nbytes} - n) * 8")
+    if mux_sig is not None:
+        lines.append(f"    mux = {_raw_expr(mux_sig, nbytes)}")
+    for key, pre, item in common:
+        lines.extend(f"    {stmt}" for stmt in pre)
+
+    if not groups:
+        lines.append("    return {")
+        for key, pre, item in common:
+            lines.append(f"        {key!r}: {item},")
+        lines.append("    }")
+    else:
+        lines.append("    parsed = {")
+        for key, pre, item in common:
+            lines.append(f"        {key!r}: {item},")
+        lines.append("    }")
+        for n, (mux_id, items) in enumerate(sorted(groups.items())):
+            lines.append(f"    {'if' if n == 0 else 'elif'} mux == {mux_id}:")
+            for key, pre, item in items:
+                lines.extend(f"        {stmt}" for stmt in pre)
+                lines.append(f"        parsed[{key!r}] = {item}")
+        lines.append("    return parsed")
+    lines.append("")
+
+
+def generate_decoder_source(messages):
+    """
+    {CAN ID: Message}로부터 CAN ID별 디코더 함수들의 파이썬 소스를 생성합니다.
+    소스 끝의 DECODERS 딕셔너리가 {CAN ID: 디코더 함수}를 담습니다.
+    디코더는 decode(data, offset=0) 형태로, data는 bytes/bytearray/memoryview 어느 것이든
+    되며 offset을 주면 녹화 버퍼처럼 큰 버퍼 안의 프레임을 복사 없이 디코딩합니다.
+    """
+    lines = [
+        "# can_codec.generate_decoder_source() 로 자동 생성된 코드",
+        "",
+        "_UNPACK_LE = _Struct('<Q').unpack_from",
+        "_UNPACK_BE = _Struct('>Q').unpack_from",
+        "",
+    ]
+    table = []
+    for frame_id, message in messages.items():
+        func_name = f"decode_{frame_id:X}_{message.name}"
+        _generate_message_decoder(message, func_name, lines)
+        table.append(f"    {frame_id:#x}: {func_name},")
+    lines.append("DECODERS = {")
+    lines.extend(table)
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def compile_decoders(source, filename="<can_codec>"):
+    """generate_decoder_source()가 만든 소스를 compile()하여 {CAN ID: 함수}를 반환합니다."""
+    namespace = {"_Struct": struct.Struct}
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace["DECODERS"]
+
+
+def generate_value_decoder_source(messages):
+    """
+    {CAN ID: Message}로부터 CAN ID별 물리값 디코더 함수들의 파이썬 소스를 생성합니다.
+    디코더는 decode(data, offset=0) 형태로 {신호 이름: 물리값}을 반환하며, 표시용
+    디코더와 달리 문자열 변환이 없어 대시보드/분석/알람처럼 숫자가 필요한 곳에 사용합니다.
+    소스 끝의 VALUE_DECODERS 딕셔너리가 {CAN ID: 디코더 함수}를 담습니다.
+    """
+    lines = [
+        "# can_codec.generate_value_decoder_source() 로 자동 생성된 코드",
+        "",
+        "_UNPACK_LE = _Struct('<Q').unpack_from",
+        "_UNPACK_BE = _Struct('>Q').unpack_from",
+        "",
+    ]
+    table = []
+    for frame_id, message in messages.items():
+        func_name = f"values_{frame_id:X}_{message.name}"
+        _generate_message_decoder(message, func_name, lines, values=True)
+        table.append(f"    {frame_id:#x}: {func_name},")
+    lines.append("VALUE_DECODERS = {")
+    lines.extend(table)
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def compile_value_decoders(source, filename="<can_codec>"):
+    """generate_value_decoder_source()가 만든 소스를 compile()하여 {CAN ID: 함수}를 반환합니다."""
+    namespace = {"_Struct": struct.Struct}
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace["VALUE_DECODERS"]
+
+
+def _generate_message_encoder(message, func_name, lines):
+    """
+    메시지 하나에 대한 인코더 함수 소스를 lines에 추가합니다.
+    생성된 함수는 encode(buf, 신호이름=물리값, ...) 형태이며, 생략한 신호는
+    GenSigStartValue(없으면 raw 0)로 채웁니다. 물리값은 DBC [min|max]로,
+    raw 값은 신호 비트 폭으로 제한한 뒤 buf에 기록하고 buf를 반환합니다.
+    멀티플렉스 메시지는 인코더를 만들지 않으며 False를 반환합니다.
+    """
+    if message.multiplexer is not None:
+        return False
+
+    nbytes = message.payload_length
+    prefix = f"_{message.frame_id:X}"
+    params = []
+    body = []
+    terms = {"little": [], "big": []}
+    for i, sig in enumerate(message.signals):
+        name = sig.name
+        params.append(f"{name}=None")
+        body.append(f"    if {name} is None:")
+        body.append(f"        r{i} = {sig.initial or 0}")
+        body.append("    else:")
+        if sig.minimum is not None and sig.minimum < sig.maximum:
+            body.append(f"        {name} = {sig.minimum!r} if {name} < {sig.minimum!r} "
+                        f"else {sig.maximum!r} if {name} > {sig.maximum!r} else {name}")
+        value = name
+        if not (isinstance(sig.offset, int) and sig.offset == 0):
+            value = f"{value} + {-sig.offset!r}" if sig.offset < 0 else f"{value} - {sig.offset!r}"
+        if not (isinstance(sig.scale, int) and sig.scale == 1):
+            value = f"({value}) / {sig.scale!r}" if " " in value else f"{value} / {sig.scale!r}"
+        body.append(f"        r{i} = round({value})")
+        if sig.signed:
+            lo, hi = -(1 << (sig.length - 1)), (1 << (sig.length - 1)) - 1
+        else:
+            lo, hi = 0, (1 << sig.length) - 1
+        body.append(f"        r{i} = {lo} if r{i} < {lo} else {hi} if r{i} > {hi} else r{i}")
+
+        shift, mask = sig.bit_layout(nbytes)
+        term = f"(r{i} & {mask:#x})" if sig.signed else f"r{i}"
+        terms[sig.byte_order].append(f"{term} << {shift}" if shift else term)
+
+    lines.append(f"{prefix}_PACK = _Struct('<Q').pack_into" if nbytes == 8 else "")
+    defaults = ", _pack=" + f"{prefix}_PACK" if nbytes == 8 else ""
+    lines.append(f"def {func_name}(buf, {', '.join(params)}{defaults}):")
+    lines.extend(body)
+    lines.append(f"    raw = {' | '.join(terms['little']) or '0'}")
+    if terms["big"]:
+        lines.append(f"    rb = {' | '.join(terms['big'])}")
+        lines.append(f"    raw |= int.from_bytes(rb.to_bytes({nbytes}, 'big'), 'little')")
+    if nbytes == 8:
+        lines.append("    _pack(buf, 0, raw)")
+    else:
+        lines.append(f"    buf[:{nbytes}] = raw.to_bytes({nbytes}, 'little')")
+    lines.append("    return buf")
+    lines.append("")
+    return True
+
+
+def generate_encoder_source(messages):
+    """
+    {CAN ID: Message}로부터 CAN ID별 인코더 함수들의 파이썬 소스를 생성합니다.
+    소스 끝의 ENCODERS 딕셔너리가 {CAN ID: 인코더 함수}를 담습니다.
+    """
+    lines = ["# can_codec.generate_encoder_source() 로 자동 생성된 코드", ""]
+    table = []
+    for frame_id, message in messages.items():
+        func_name = f"encode_{frame_id:X}_{message.name}"
+        if _generate_message_encoder(message, func_name, lines):
+            table.append(f"    {frame_id:#x}: {func_name},")
+    lines.append("ENCODERS = {")
+    lines.extend(table)
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def compile_encoders(source, filename="<can_codec>"):
+    """generate_encoder_source()가 만든 소스를 compile()하여 {CAN ID: 함수}를 반환합니다."""
+    namespace = {"_Struct": struct.Struct}
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace["ENCODERS"]
+
+
+class CANDatabase:
+    """
+    DBC에서 읽은 메시지 정의와 코드 생성된 디코더/인코더 소스를 묶는 클래스.
+    디코더/인코더 함수는 처음 접근할 때 한 번만 compile 됩니다.
+    """
+    def __init__(self, messages, source_name="<can_codec>"):
+        self.messages = messages
+        self.source_name = source_name
+        self.decoder_source = generate_decoder_source(messages)
+        self.value_decoder_source = generate_value_decoder_source(messages)
+        self.encoder_source = generate_encoder_source(messages)
+        self._decoders = None
+        self._value_decoders = None
+        self._encoders = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_decoders"] = None # 함수 객체는 캐시에 저장하지 않음
+        state["_value_decoders"] = None
+        state["_encoders"] = None
+        return state
+
+    @property
+    def decoders(self):
+        if self._decoders is None:
+            self._decoders = compile_decoders(self.decoder_source, self.source_name)
+        return self._decoders
+
+    @property
+    def value_decoders(self):
+        if self._value_decoders is None:
+            self._value_decoders = compile_value_decoders(self.value_decoder_source, self.source_name)
+        return self._value_decoders
+
+    @property
+    def encoders(self):
+        if self._encoders is None:
+            self._encoders = compile_encoders(self.encoder_source, self.source_name)
+        return self._encoders
+
+    def encode(self, frame_id, buf=None, **signals):
+        """
+        frame_id 메시지를 인코딩합니다. buf를 생략하면 새 bytearray를 만듭니다.
+        주기 송신처럼 반복 호출하는 경우 encoders[frame_id]에 재사용 버퍼를 넘기는 편이 빠릅니다.
+        """
+        if buf is None:
+            buf = bytearray(self.messages[frame_id].payload_length)
+        return self.encoders[frame_id](buf, **signals)
+
+
+def load_dbc(path=DEFAULT_DBC_FILE, cache_dir=CACHE_DIR):
+    """
+    DBC 파일을 로드하여 CANDatabase를 반환합니다. 파일 내용의 SHA-256 해시를
+    키로 파싱 결과와 생성된 디코더 소스를 cache_dir에 저장해 두고, 같은 파일이면
+    캐시에서 바로 읽습니다. cache_dir이 None이면 캐시를 사용하지 않습니다.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    cache_file = None
+    if cache_dir is not None:
+        key = hashlib.sha256(raw).hexdigest()
+        cache_file = os.path.join(cache_dir, f"{key}.v{CACHE_VERSION}.pickle")
+        try:
+            with open(cache_file, "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            pass # 캐시가 없거나 손상된 경우 다시 파싱
+
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        text = raw.decode("cp1252") # Vector 툴이 저장한 DBC 기본 인코딩
+    database = CANDatabase(parse_dbc(text), f"<dbc:{os.path.basename(path)}>")
+
+    if cache_file is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                pickle.dump(database, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file) # 동시에 실행된 다른 프로세스와 충돌 방지
+        except OSError:
+            pass # 캐시 저장 실패는 동작에 영향 없음
+    return database
+
+
+class CANParser:
+    """
+    CAN 메시지를 파싱하여 사람이 읽을 수 있는 형태로 변환하는 클래스.
+    신호 정의는 DBC 파일에서 읽어 CAN ID별로 코드 생성된 디코더를 사용합니다.
+    """
+    def __init__(self, dbc_path=DEFAULT_DBC_FILE):
+        self.database = load_dbc(dbc_path)
+        self.messages = self.database.messages
+        self.decoders = self.database.decoders
+        self.value_decoders = self.database.value_decoders
+        self.encoders = self.database.encoders
+
+    def parse(self, can_id, data):
+        """
+        주어진 CAN ID와 데이터에 따라 메시지를 파싱합니다.
+        """
+        decoder = self.decoders.get(can_id)
+        if decoder is None:
+            return {}
+        return decoder(data)
+
+    def decode_values(self, can_id, data):
+        """
+        주어진 CAN ID와 데이터를 {신호 이름: 물리값}으로 디코딩합니다.
+        정의되지 않은 ID이거나 데이터가 짧으면 빈 딕셔너리를 반환합니다.
+        """
+        decoder = self.value_decoders.get(can_id)
+        if decoder is None:
+            return {}
+        return decoder(data)
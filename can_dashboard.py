@@ -0,0 +1,385 @@
+"""
+차량 상태 대시보드 (속도계, 조향각, 배터리, 등화/스위치 표시등).
+
+눈금/숫자/테두리처럼 변하지 않는 배경은 위젯 크기가 바뀔 때만 QPixmap으로 한 번
+그려 두고, 값이 바뀌면 바늘/막대/표시등이 차지하는 영역만 update(rect)로 다시
+그립니다. 표시등은 켜짐/꺼짐 두 상태를 모두 미리 그려 두어 상태가 바뀔 때만 복사합니다.
+값은 CANParser.decode_values()의 물리값(숫자)을 그대로 사용합니다.
+"""
+import math
+
+from PyQt6.QtCore import Qt, QPointF, QRect, QRectF
+from PyQt6.QtGui import QColor, QFont, QPainter, QPen, QPixmap
+from PyQt6.QtWidgets import QWidget, QGridLayout, QHBoxLayout, QVBoxLayout, QLabel, QGroupBox
+
+
+class CachedGauge(QWidget):
+    """
+    배경을 QPixmap으로 캐시하는 게이지 기본 클래스.
+    하위 클래스는 paint_background()와 paint_value()를 구현합니다.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._background = None
+
+    def resizeEvent(self, event):
+        self._background = None # 크기가 바뀌면 배경을 다시 그림
+        super().resizeEvent(event)
+
+    def _cached_background(self):
+        ratio = self.devicePixelRatioF()
+        if self._background is None or self._background.devicePixelRatio() != ratio:
+            pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self.paint_background(painter)
+            painter.end()
+            self._background = pixmap
+        return self._background
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._cached_background())
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.paint_value(painter)
+        painter.end()
+
+    def paint_background(self, painter):
+        raise NotImplementedError
+
+    def paint_value(self, painter):
+        raise NotImplementedError
+
+
+class DialGauge(CachedGauge):
+    """
+    원형 바늘 게이지. start_angle에서 시계 방향으로 span도 만큼 minimum~maximum을 표시합니다.
+    set_target()으로 명령값 같은 두 번째 표시(삼각형)를 함께 그릴 수 있습니다.
+    """
+    def __init__(self, title, unit, minimum, maximum, major_step, start_angle=225, span=270,
+                 absolute=False, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.unit = unit
+        self.minimum = minimum
+        self.maximum = maximum
+        self.major_step = major_step
+        self.start_angle = start_angle
+        self.span = span
+        self.absolute = absolute # True이면 바늘은 절댓값, 숫자는 부호 포함 (후진 속도)
+        self.value = None
+        self.target = None
+        self.setMinimumSize(180, 180)
+
+    def _geometry(self):
+        side = min(self.width(), self.height())
+        radius = side / 2 - 6
+        return QPointF(self.width() / 2, self.height() / 2), radius
+
+    def _angle(self, value):
+        ratio = (min(max(value, self.minimum), self.maximum) - self.minimum) / (self.maximum - self.minimum)
+        return math.radians(self.start_angle - ratio * self.span)
+
+    def _point(self, center, radius, angle):
+        return QPointF(center.x() + radius * math.cos(angle), center.y() - radius * math.sin(angle))
+
+    def paint_background(self, painter):
+        center, radius = self._geometry()
+        painter.setPen(QPen(QColor(90, 90, 90), 2))
+        painter.setBrush(QColor(245, 245, 245))
+        painter.drawEllipse(center, radius, radius)
+        font = QFont(self.font())
+        font.setPointSizeF(max(radius / 11, 6))
+        painter.setFont(font)
+        count = int(round((self.maximum - self.minimum) / self.major_step))
+        for i in range(count * 5 + 1):
+            value = self.minimum + i * self.major_step / 5
+            angle = self._angle(value)
+            major = i % 5 == 0
+            painter.setPen(QPen(QColor(40, 40, 40), 2 if major else 1))
+            painter.drawLine(self._point(center, radius * (0.82 if major else 0.88), angle),
+                             self._point(center, radius * 0.95, angle))
+            if major:
+                label_pos = self._point(center, radius * 0.68, angle)
+                painter.drawText(QRectF(label_pos.x() - 20, label_pos.y() - 10, 40, 20),
+                                 Qt.AlignmentFlag.AlignCenter, f"{value:g}")
+        painter.drawText(QRectF(center.x() - radius, center.y() - radius * 0.45, 2 * radius, radius * 0.2),
+                         Qt.AlignmentFlag.AlignCenter, self.title)
+        painter.drawText(QRectF(center.x() - radius, center.y() + radius * 0.55, 2 * radius, radius * 0.2),
+                         Qt.AlignmentFlag.AlignCenter, self.unit)
+
+    def _needle_rect(self, value):
+        """value 위치의 바늘이 차지하는 영역."""
+        center, radius = self._geometry()
+        tip = self._point(center, radius * 0.8, self._angle(value))
+        return QRectF(center, tip).normalized().adjusted(-6, -6, 6, 6).toAlignedRect()
+
+    def _text_rect(self):
+        center, radius = self._geometry()
+        return QRectF(center.x() - radius * 0.5, center.y() + radius * 0.25,
+                      radius, radius * 0.3).toAlignedRect()
+
+    def _marker_rect(self, value):
+        center, radius = self._geometry()
+        tip = self._point(center, radius * 0.95, self._angle(value))
+        return QRect(int(tip.x()) - 10, int(tip.y()) - 10, 20, 20)
+
+    def _needle_value(self, value):
+        return abs(value) if self.absolute else value
+
+    def set_value(self, value):
+        """값이 바뀌어 바늘이나 숫자가 달라질 때만 해당 영역을 다시 그립니다."""
+        old = self.value
+        if old is not None and f"{old:.1f}" == f"{value:.1f}" and \
+                abs(self._angle(self._needle_value(old)) - self._angle(self._needle_value(value))) < 0.004:
+            return
+        self.value = value
+        region = self._needle_rect(self._needle_value(value)).united(self._text_rect())
+        if old is not None:
+            region = region.united(self._needle_rect(self._needle_value(old)))
+        self.update(region)
+
+    def set_target(self, value):
+        """명령값 표시 위치를 바꿉니다. None이면 표시하지 않습니다."""
+        if value == self.target:
+            return
+        old = self.target
+        self.target = value
+        for marked in (old, value):
+            if marked is not None:
+                self.update(self._marker_rect(marked))
+
+    def paint_value(self, painter):
+        center, radius = self._geometry()
+        if self.target is not None:
+            angle = self._angle(self.target)
+            tip = self._point(center, radius * 0.93, angle)
+            left = self._point(center, radius * 0.99, angle + 0.05)
+            right = self._point(center, radius * 0.99, angle - 0.05)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(30, 110, 220))
+            painter.drawPolygon([tip, left, right])
+        if self.value is None:
+            return
+        painter.setPen(QPen(QColor(200, 30, 30), 3, cap=Qt.PenCapStyle.RoundCap))
+        painter.drawLine(center, self._point(center, radius * 0.8, self._angle(self._needle_value(self.value))))
+        painter.setBrush(QColor(60, 60, 60))
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.drawEllipse(center, 5, 5)
+        painter.setPen(QColor(20, 20, 20))
+        font = QFont(self.font())
+        font.setPointSizeF(max(radius / 8, 7))
+        font.setBold(True)
+        painter.setFont(font)
+        painter.drawText(QRectF(self._text_rect()), Qt.AlignmentFlag.AlignCenter, f"{self.value:.1f}")
+
+
+class BarGauge(CachedGauge):
+    """가로 막대 게이지 (배터리 SOC 등)."""
+    def __init__(self, title, unit, minimum, maximum, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.unit = unit
+        self.minimum = minimum
+        self.maximum = maximum
+        self.value = None
+        self.setMinimumSize(180, 48)
+
+    def _bar_rect(self):
+        return QRect(6, 22, self.width() - 12, self.height() - 28)
+
+    def _fill_width(self, value):
+        ratio = (min(max(value, self.minimum), self.maximum) - self.minimum) / (self.maximum - self.minimum)
+        return int(round(ratio * (self._bar_rect().width() - 2)))
+
+    def paint_background(self, painter):
+        bar = self._bar_rect()
+        painter.setPen(QColor(40, 40, 40))
+        painter.drawText(QRect(6, 2, self.width() - 12, 18), Qt.AlignmentFlag.AlignLeft, self.title)
+        painter.setPen(QPen(QColor(90, 90, 90), 1))
+        painter.setBrush(QColor(235, 235, 235))
+        painter.drawRect(bar)
+        for i in range(1, 4):
+            x = bar.left() + bar.width() * i // 4
+            painter.drawLine(x, bar.bottom() - 4, x, bar.bottom())
+
+    def set_value(self, value):
+        old = self.value
+        if old is not None and self._fill_width(old) == self._fill_width(value) and \
+                f"{old:.1f}" == f"{value:.1f}":
+            return
+        self.value = value
+        self.update(self._bar_rect().adjusted(0, -20, 0, 0))
+
+    def paint_value(self, painter):
+        if self.value is None:
+            return
+        bar = self._bar_rect()
+        ratio = self._fill_width(self.value) / max(bar.width() - 2, 1)
+        color = QColor(200, 40, 40) if ratio < 0.2 else QColor(230, 160, 0) if ratio < 0.4 else QColor(40, 170, 60)
+        painter.fillRect(bar.left() + 1, bar.top() + 1, self._fill_width(self.value), bar.height() - 1, color)
+        painter.setPen(QColor(20, 20, 20))
+        painter.drawText(QRect(6, 2, self.width() - 12, 18), Qt.AlignmentFlag.AlignRight,
+                         f"{self.value:.1f} {self.unit}")
+
+
+class IndicatorLamp(QWidget):
+    """
+    켜짐/꺼짐 표시등. 두 상태의 그림을 미리 만들어 두고 상태가 바뀔 때만 다시 그립니다.
+    """
+    def __init__(self, title, on_color=QColor(40, 200, 60), parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.on_color = on_color
+        self.state = None
+        self._pixmaps = {}
+        self.setMinimumSize(120, 28)
+
+    def resizeEvent(self, event):
+        self._pixmaps = {}
+        super().resizeEvent(event)
+
+    def _pixmap(self, state):
+        pixmap = self._pixmaps.get(state)
+        if pixmap is None:
+            ratio = self.devicePixelRatioF()
+            pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            diameter = self.height() - 8
+            painter.setPen(QPen(QColor(80, 80, 80), 1))
+            painter.setBrush(self.on_color if state else QColor(200, 200, 200))
+            painter.drawEllipse(4, 4, diameter, diameter)
+            painter.setPen(QColor(20, 20, 20) if state else QColor(120, 120, 120))
+            painter.drawText(QRect(diameter + 10, 0, self.width() - diameter - 10, self.height()),
+                             Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, self.title)
+            painter.end()
+            self._pixmaps[state] = pixmap
+        return pixmap
+
+    def set_state(self, state):
+        state = bool(state)
+        if state != self.state:
+            self.state = state
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap(bool(self.state)))
+        painter.end()
+
+
+class Readout(QLabel):
+    """숫자/문자 값 표시 라벨. 표시 문자열이 바뀔 때만 setText 합니다."""
+    def __init__(self, title, formatter, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.formatter = formatter
+        self.setText(f"{title}: -")
+
+    def set_value(self, value):
+        text = f"{self.title}: {self.formatter(value)}"
+        if text != self.text():
+            self.setText(text)
+
+
+class Dashboard(QWidget):
+    """
+    차량 상태 대시보드.
+    update_messages()에 {CAN ID: can.Message}를 넘기면 대시보드가 쓰는 ID만 물리값으로 디코딩합니다.
+    """
+    def __init__(self, parser, parent=None):
+        super().__init__(parent)
+        self.parser = parser
+
+        self.speed = DialGauge("Speed", "km/h", 0, 40, 10, absolute=True)
+        self.steering = DialGauge("Wheel Angle", "deg", -35, 35, 10, start_angle=180, span=180)
+        self.soc = BarGauge("Battery SOC", "%", 0, 100)
+        gear_names = self._choices("Vehicle_Gear")
+        mode_names = self._choices("Drive_State_Mode")
+        self.gear = Readout("Gear", lambda v: gear_names.get(int(v), str(int(v))))
+        self.drive_mode = Readout("Mode", lambda v: mode_names.get(int(v), str(int(v))))
+        self.bus_voltage = Readout("BUS Voltage", lambda v: f"{v:.1f} V")
+        self.bus_current = Readout("BUS Current", lambda v: f"{v:.1f} A")
+        self.bms_voltage = Readout("BMS Voltage", lambda v: f"{v:.1f} V")
+        self.eps_temperature = Readout("EPS Temp", lambda v: f"{v:.0f} ℃")
+        self.lamps = {
+            "Head_Light": IndicatorLamp("Head Light", QColor(250, 220, 60)),
+            "Brake_Light": IndicatorLamp("Brake Light", QColor(230, 50, 50)),
+            "Front_Touch_Switch": IndicatorLamp("Front Touch", QColor(250, 140, 0)),
+            "Back_Touch_Switch": IndicatorLamp("Back Touch", QColor(250, 140, 0)),
+            "Emergency_Button": IndicatorLamp("Emergency", QColor(230, 0, 0)),
+            "EPS_Control": IndicatorLamp("EPS Works"),
+        }
+
+        # 신호 이름 -> 표시 위젯 갱신 함수
+        self.setters = {
+            "Vehicle_Speed": self.speed.set_value,
+            "Vehicle_Wheel_End_Angle": self.steering.set_value,
+            "BMS_SOC": self.soc.set_value,
+            "Vehicle_Gear": self.gear.set_value,
+            "Drive_State_Mode": self.drive_mode.set_value,
+            "BUS_Voltage": self.bus_voltage.set_value,
+            "BUS_Current": self.bus_current.set_value,
+            "BMS_Voltage": self.bms_voltage.set_value,
+            "EPS_ECU_Temperature": self.eps_temperature.set_value,
+        }
+        for name, lamp in self.lamps.items():
+            self.setters[name] = lamp.set_state
+        # 대시보드 신호가 들어 있는 수신 메시지 ID만 디코딩
+        self.frame_ids = {
+            frame_id for frame_id, message in parser.messages.items()
+            if any(sig.name in self.setters for sig in message.signals)
+        }
+
+        layout = QHBoxLayout(self)
+        dial_layout = QHBoxLayout()
+        dial_layout.addWidget(self.speed)
+        dial_layout.addWidget(self.steering)
+        layout.addLayout(dial_layout, 3)
+
+        side_layout = QVBoxLayout()
+        battery_box = QGroupBox("Battery / Power")
+        battery_layout = QVBoxLayout(battery_box)
+        battery_layout.addWidget(self.soc)
+        for readout in (self.bms_voltage, self.bus_voltage, self.bus_current):
+            battery_layout.addWidget(readout)
+        side_layout.addWidget(battery_box)
+
+        state_box = QGroupBox("State / Switches")
+        state_layout = QGridLayout(state_box)
+        state_layout.addWidget(self.gear, 0, 0)
+        state_layout.addWidget(self.drive_mode, 0, 1)
+        state_layout.addWidget(self.eps_temperature, 1, 0)
+        for i, lamp in enumerate(self.lamps.values()):
+            state_layout.addWidget(lamp, 2 + i // 2, i % 2)
+        side_layout.addWidget(state_box)
+        side_layout.addStretch()
+        layout.addLayout(side_layout, 2)
+
+    def _choices(self, name):
+        for message in self.parser.messages.values():
+            for sig in message.signals:
+                if sig.name == name:
+                    return sig.choices or {}
+        return {}
+
+    def update_messages(self, messages):
+        """{CAN ID: can.Message} 중 대시보드 신호가 있는 메시지만 반영합니다."""
+        decode_values = self.parser.decode_values
+        setters = self.setters
+        for can_id, message in messages.items():
+            if can_id not in self.frame_ids:
+                continue
+            for name, value in decode_values(can_id, message.data).items():
+                setter = setters.get(name)
+                if setter is not None:
+                    setter(value)
+
+    def set_steering_target(self, angle):
+        """조향 명령값(deg)을 조향 게이지에 표시합니다."""
+        self.steering.set_target(angle)
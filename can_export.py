@@ -0,0 +1,287 @@
+"""
+디코딩한 신호를 Parquet/HDF5 컬럼 파일로 내보내기.
+
+트레이스(TraceStore), 기록 파일(.pclog) 또는 로그 파일(.asc/.blf/.log/.csv/.trc)을
+CHUNK_SIZE 프레임 단위의 NumPy 배열 블록으로 읽어, 블록마다 Signal.physical_array()로 한 번에
+디코딩한 뒤 바로 파일에 덧붙입니다. 한 번에 한 블록만 메모리에 있으므로 로그 크기와 관계없이
+메모리 사용량이 일정합니다.
+
+파일은 DBC에 정의된 ID의 프레임 한 개가 한 행이며, 열은 timestamp, can_id, tx와 신호마다
+하나씩(CANParser.parse()와 같은 표시 이름, float64)입니다. 그 프레임에 없는 신호는 NaN입니다.
+    pandas.read_parquet("out.parquet")
+    with h5py.File("out.h5") as f: pandas.DataFrame({name: f[key][:] for name, key in ...})
+HDF5 데이터셋 이름은 '/'를 '_'로 바꾼 이름이며, 원래 이름은 루트의 columns 속성에 순서대로 있습니다.
+
+pyarrow/h5py는 해당 형식으로 내보낼 때만 import 합니다.
+
+사용법: python can_export.py 입력로그 출력.parquet|출력.h5
+"""
+import argparse
+import sys
+import time
+
+import can
+import numpy as np
+from PyQt6.QtCore import QThread
+
+from can_codec import CANParser
+from can_import import IMPORTERS
+from can_log import RecordingReader, RecordingWriter, RECORDING_EXTENSION
+from can_trace import CHUNK_SIZE, FLAG_EXTENDED, FLAG_TX, FLAG_REMOTE, FLAG_ERROR
+
+FRAME_COLUMNS = ("timestamp", "can_id", "tx")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+HDF5_EXTENSIONS = (".h5", ".hdf5")
+
+
+def store_blocks(store):
+    """TraceStore(snapshot)의 프레임을 청크 단위 (timestamp, can_id, dlc, flags, data) 배열로 돌려줍니다."""
+    for _, chunk, i, j in store.iter_chunks():
+        yield chunk.timestamp[i:j], chunk.can_id[i:j], chunk.dlc[i:j], chunk.flags[i:j], chunk.data[i:j]
+
+
+def log_blocks(path, block_size=CHUNK_SIZE):
+    """
+    로그 파일의 프레임을 (timestamp, can_id, dlc, flags, data) 배열 묶음으로 돌려줍니다.
+    기록 파일과 can_import가 읽는 형식은 블록 단위로 바로 읽고, 그 밖의 형식(.csv/.trc)은
+    python-can으로 읽어 block_size개씩 묶습니다.
+    """
+    lower = path.lower()
+    if lower.endswith(RECORDING_EXTENSION):
+        with RecordingReader(path) as reader:
+            yield from reader.iter_blocks()
+        return
+    for extension, importer in IMPORTERS.items():
+        if lower.endswith(extension):
+            yield from importer(path).blocks()
+            return
+    timestamps, can_ids, dlcs, flags, data = [], [], [], [], []
+    for msg in can.LogReader(path):
+        timestamps.append(msg.timestamp)
+        can_ids.append(msg.arbitration_id)
+        dlcs.append(msg.dlc)
+        flags.append((FLAG_EXTENDED if msg.is_extended_id else 0) | (FLAG_REMOTE if msg.is_remote_frame else 0)
+                     | (FLAG_ERROR if msg.is_error_frame else 0) | (0 if msg.is_rx else FLAG_TX))
+        data.append(int.from_bytes(msg.data[:8], "little"))
+        if len(timestamps) >= block_size:
+            yield _block(timestamps, can_ids, dlcs, flags, data)
+            timestamps, can_ids, dlcs, flags, data = [], [], [], [], []
+    if timestamps:
+        yield _block(timestamps, can_ids, dlcs, flags, data)
+
+
+def _block(timestamps, can_ids, dlcs, flags, data):
+    return (np.array(timestamps, np.float64), np.array(can_ids, np.uint32), np.array(dlcs, np.uint8),
+            np.array(flags, np.uint8), np.array(data, np.uint64))
+
+
+class SignalColumns:
+    """
+    DBC 메시지 정의로 프레임 블록을 신호별 열로 디코딩합니다.
+    표시 이름이 겹치는 신호는 '메시지이름.신호이름'을 열 이름으로 씁니다.
+    """
+    def __init__(self, messages):
+        # 트레이스는 8바이트까지만 보관하므로 더 긴 메시지는 제외
+        self.messages = [m for m in messages.values() if m.signals and m.payload_length <= 8]
+        self.frame_ids = np.array(sorted({m.frame_id for m in self.messages}), np.uint32)
+        labels = [sig.label for m in self.messages for sig in m.signals]
+        self.signals = [] # (열 이름, 메시지, 신호)
+        for message in self.messages:
+            for sig in message.signals:
+                name = sig.label if labels.count(sig.label) == 1 else f"{message.name}.{sig.name}"
+                self.signals.append((name, message, sig))
+
+    @property
+    def names(self):
+        return list(FRAME_COLUMNS) + [name for name, _, _ in self.signals]
+
+    def decode(self, timestamp, can_id, dlc, flags, data):
+        """프레임 블록을 {열 이름: 배열}로 디코딩합니다. DBC에 없는 ID, 에러/RTR 프레임은 제외합니다."""
+        rows = np.flatnonzero(np.isin(can_id, self.frame_ids) & ((flags & (FLAG_ERROR | FLAG_REMOTE)) == 0))
+        ids = can_id[rows]
+        extended = (flags[rows] & FLAG_EXTENDED) != 0
+        dlc = dlc[rows]
+        data = data[rows]
+        columns = {"timestamp": timestamp[rows], "can_id": ids, "tx": (flags[rows] & FLAG_TX) != 0}
+        selected = {}
+        for message in self.messages:
+            sel = np.flatnonzero((ids == message.frame_id) & (extended == message.is_extended)
+                                 & (dlc >= max(message.min_length, 1)))
+            selected[message] = sel, data[sel]
+        for name, message, sig in self.signals:
+            column = np.full(len(rows), np.nan)
+            sel, payload = selected[message]
+            mux = message.multiplexer
+            if sig.multiplexer_id is not None and mux is not None:
+                hit = mux.raw_array(payload) == sig.multiplexer_id
+                sel, payload = sel[hit], payload[hit]
+            column[sel] = sig.physical_array(payload)
+            columns[name] = column
+        return columns
+
+
+class ParquetSink:
+    """블록마다 row group 하나씩 덧붙이는 Parquet 파일."""
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet로 내보내려면 pyarrow가 필요합니다 (pip install pyarrow).")
+        self.pa = pa
+        fields = [pa.field("timestamp", pa.float64()), pa.field("can_id", pa.uint32()), pa.field("tx", pa.bool_())]
+        fields += [pa.field(name, pa.float64()) for name, _, _ in columns.signals]
+        self.schema = pa.schema(fields)
+        # 신호 열은 대부분 NaN이라 사전 인코딩/통계는 느리기만 하므로 can_id/timestamp에만 사용
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd", use_dictionary=["can_id"],
+                                       write_statistics=["timestamp", "can_id"])
+
+    def write(self, columns):
+        arrays = [self.pa.array(columns[field.name], type=field.type) for field in self.schema]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class HDF5Sink:
+    """
+    열마다 크기를 늘려 가며 덧붙이는 1차원 HDF5 데이터셋.
+    압축 청크를 다시 읽고 쓰지 않도록 CHUNK_SIZE 행이 모일 때마다 청크 경계에 맞추어 씁니다.
+    """
+    def __init__(self, path, columns):
+        try:
+            import h5py
+        except ImportError:
+            raise ValueError("HDF5로 내보내려면 h5py가 필요합니다 (pip install h5py).")
+        self.file = h5py.File(path, "w")
+        self.file.attrs["columns"] = columns.names
+        dtypes = {"timestamp": np.float64, "can_id": np.uint32, "tx": np.bool_}
+        units = {name: sig.unit for name, _, sig in columns.signals}
+        self.datasets = {}
+        for name in columns.names:
+            dataset = self.file.create_dataset(name.replace("/", "_"), shape=(0,), maxshape=(None,),
+                                               dtype=dtypes.get(name, np.float64), chunks=(CHUNK_SIZE,),
+                                               compression="lzf")
+            if units.get(name):
+                dataset.attrs["unit"] = units[name]
+            self.datasets[name] = dataset
+        self.rows = 0 # 파일에 쓴 행 수
+        self.pending = {name: [] for name in self.datasets} # 아직 쓰지 않은 열 배열들
+        self.pending_rows = 0
+
+    def write(self, columns):
+        for name, arrays in self.pending.items():
+            arrays.append(columns[name])
+        self.pending_rows += len(columns["timestamp"])
+        if self.pending_rows >= CHUNK_SIZE:
+            self._flush(self.pending_rows - self.pending_rows % CHUNK_SIZE)
+
+    def _flush(self, n):
+        """대기 중인 행 중 앞의 n행을 쓰고 나머지는 남겨 둡니다."""
+        for name, dataset in self.datasets.items():
+            values = np.concatenate(self.pending[name])
+            dataset.resize((self.rows + n,))
+            dataset[self.rows:] = values[:n]
+            self.pending[name] = [values[n:]]
+        self.rows += n
+        self.pending_rows -= n
+
+    def close(self):
+        try:
+            if self.pending_rows:
+                self._flush(self.pending_rows)
+        finally:
+            self.file.close()
+
+
+def open_sink(path, columns):
+    """확장자에 맞는 출력 파일을 엽니다. 지원하지 않는 확장자는 ValueError."""
+    lower = path.lower()
+    if lower.endswith(PARQUET_EXTENSIONS):
+        return ParquetSink(path, columns)
+    if lower.endswith(HDF5_EXTENSIONS):
+        return HDF5Sink(path, columns)
+    raise ValueError(f"지원하지 않는 출력 형식입니다: {path} (.parquet 또는 .h5)")
+
+
+def export_signals(blocks, path, messages, progress=None):
+    """
+    프레임 블록들을 디코딩하여 path에 씁니다. 쓴 행 수를 반환합니다.
+    progress(읽은 프레임 수)는 블록마다 호출됩니다.
+    """
+    columns = SignalColumns(messages)
+    sink = open_sink(path, columns)
+    rows = frames = 0
+    try:
+        for block in blocks:
+            decoded = columns.decode(*block)
+            if len(decoded["timestamp"]):
+                sink.write(decoded)
+                rows += len(decoded["timestamp"])
+            frames += len(block[0])
+            if progress is not None:
+                progress(frames)
+    finally:
+        sink.close()
+    return rows
+
+
+def save_recording(blocks, path, progress=None):
+    """프레임 블록들을 디코딩하지 않고 기록 파일로 씁니다. 쓴 프레임 수를 반환합니다."""
+    with RecordingWriter(path) as writer:
+        for block in blocks:
+            writer.write(*block)
+            if progress is not None:
+                progress(writer.frames)
+    return writer.frames
+
+
+class SignalExportThread(QThread):
+    """
+    GUI에서 트레이스를 내보내는 스레드. 끝나면 rows/elapsed 또는 error를 확인합니다.
+    path가 기록 파일(.pclog)이면 신호 대신 원본 프레임을 저장합니다.
+    """
+    def __init__(self, store, path, messages, parent=None):
+        super().__init__(parent)
+        self.store = store.snapshot()
+        self.path = path
+        self.messages = messages
+        self.frames = 0 # 지금까지 읽은 프레임 수
+        self.rows = 0
+        self.elapsed = 0.0
+        self.error = None
+
+    def _progress(self, frames):
+        self.frames = frames
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            if self.path.lower().endswith(RECORDING_EXTENSION):
+                self.rows = save_recording(store_blocks(self.store), self.path, self._progress)
+            else:
+                self.rows = export_signals(store_blocks(self.store), self.path, self.messages, self._progress)
+        except Exception as e:
+            self.error = e
+        self.elapsed = time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="CAN 로그의 신호를 Parquet/HDF5로 내보내기")
+    arg_parser.add_argument("log", help="입력 로그 (.pclog/.asc/.blf/.log/.csv/.trc)")
+    arg_parser.add_argument("output", help="출력 파일 (.parquet 또는 .h5)")
+    args = arg_parser.parse_args()
+
+    parser = CANParser()
+    start = time.perf_counter()
+    try:
+        rows = export_signals(log_blocks(args.log), args.output, parser.messages)
+    except (OSError, ValueError) as e:
+        print(f"내보내기 실패: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"{rows}행을 {args.output}에 저장했습니다 ({time.perf_counter() - start:.2f}초).")
+
+
+if __name__ == "__main__":
+    main()
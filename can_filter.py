@@ -0,0 +1,365 @@
+"""
+CAN 프레임 필터 식 파서.
+
+필터 식은 한 번만 컴파일되어 트레이스 저장소의 NumPy 컬럼에 벡터 연산으로(mask),
+Raw 테이블의 최신 메시지에는 프레임 하나씩(match) 적용됩니다.
+
+문법 (대소문자 구분 없음, ID와 데이터는 16진수):
+    18F, 314                 ID 목록 ("id 18F,314" 와 같음)
+    500-50F                  ID 범위
+    data "01 ?? ?? F1"       바이트 패턴 (?? 는 아무 값, F? 처럼 니블 단위도 가능)
+    Vehicle_Speed > 10       디코딩된 신호 물리값 비교 (==, !=, <, <=, >, >=)
+    "Vehicle Speed (km/h)" > 10   신호는 Monitor 표의 표시 이름으로도 지정 가능
+    Gear_Req == "D Gear"     VAL_ 테이블 문자열 비교
+    IPC_Drive_Cmd.Ctrl_Flag == 241   같은 이름의 신호가 여러 메시지에 있으면 메시지 이름으로 한정
+    조건은 and(&), or(|), not(!), 괄호로 조합합니다.
+
+같은 문법으로 다른 조건 트리를 만들려면 FilterParser를 상속해 or_node/and_node/not_node/signal_node를
+바꿉니다 (can_query, can_alarm). signal_node는 SignalFilter처럼 (targets, op, value)를 받으며,
+비교 연산자는 COMPARISONS, 프레임 하나의 raw 값은 SignalFilter.extract_raw()로 얻습니다.
+"""
+import operator
+import re
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"""\s*(?:
+    (?P<str>"[^"]*"|'[^']*')
+  | (?P<op>==|!=|<=|>=|&&|\|\||[<>=()&|!,])
+  | (?P<word>[^\s()&|!=<>,"']+)
+)""", re.X)
+_ID_RE = re.compile(r"^(?:0x)?([0-9a-f]+)(?:-(?:0x)?([0-9a-f]+))?$", re.I)
+COMPARISONS = { # 신호 비교 연산자 -> 함수
+    "==": operator.eq, "=": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+_MASK64 = (1 << 64) - 1
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"필터 식을 해석할 수 없습니다: '{text[pos:].strip()}'")
+        kind = m.lastgroup
+        value = m.group(kind)
+        tokens.append((kind, value[1:-1] if kind == "str" else value))
+        pos = m.end()
+    return tokens
+
+
+class IdFilter:
+    """ID 목록/범위 조건."""
+    def __init__(self, ids, ranges):
+        self.ids = np.array(sorted(ids), np.uint32)
+        self.id_set = frozenset(ids)
+        self.ranges = ranges
+
+    def mask(self, can_id, dlc, data):
+        result = np.isin(can_id, self.ids)
+        for lo, hi in self.ranges:
+            result |= (can_id >= lo) & (can_id <= hi)
+        return result
+
+    def match(self, can_id, dlc, data):
+        return can_id in self.id_set or any(lo <= can_id <= hi for lo, hi in self.ranges)
+
+
+class DataFilter:
+    """바이트 패턴 조건. 패턴 길이보다 짧은 프레임은 일치하지 않습니다."""
+    def __init__(self, pattern):
+        parts = pattern.split()
+        if len(parts) == 1 and len(parts[0]) > 2:
+            parts = [parts[0][i:i + 2] for i in range(0, len(parts[0]), 2)]
+        if not parts or len(parts) > 8:
+            raise ValueError(f"데이터 패턴은 1~8 바이트여야 합니다: '{pattern}'")
+        mask = value = 0
+        for i, part in enumerate(parts):
+            if not re.fullmatch(r"[0-9a-fA-F?]{2}", part):
+                raise ValueError(f"데이터 패턴의 바이트가 잘못되었습니다: '{part}'")
+            for j, nibble in enumerate(part):
+                if nibble != "?":
+                    bit = 8 * i + (4 if j == 0 else 0) # 첫 글자가 상위 니블
+                    mask |= 0xF << bit
+                    value |= int(nibble, 16) << bit
+        self.length = len(parts)
+        self.mask_value = mask
+        self.value = value
+        self._mask = np.uint64(mask)
+        self._value = np.uint64(value)
+
+    def mask(self, can_id, dlc, data):
+        return (dlc >= self.length) & ((data & self._mask) == self._value)
+
+    def match(self, can_id, dlc, data):
+        return dlc >= self.length and data & self.mask_value == self.value
+
+
+class SignalFilter:
+    """디코딩된 신호 값 비교 조건. 신호가 여러 메시지에 있으면 그중 하나라도 만족하면 일치."""
+    def __init__(self, targets, op, value):
+        self.targets = targets # [(message, signal)]
+        self.compare = COMPARISONS[op]
+        self.value = value # 물리값(float) 또는 raw 값(int, VAL_ 문자열 비교 시)
+        self.by_raw = isinstance(value, str)
+        self.raw_values = {}
+        if self.by_raw:
+            if op not in ("==", "=", "!="):
+                raise ValueError(f"문자열 값은 == 또는 != 로만 비교할 수 있습니다: '{value}'")
+            for message, sig in targets:
+                raw = {text.lower(): raw for raw, text in (sig.choices or {}).items()}.get(value.lower())
+                if raw is None:
+                    raise ValueError(f"{message.name}.{sig.name}에 '{value}' 값이 정의되어 있지 않습니다.")
+                self.raw_values[sig] = raw
+
+    def _selected(self, message, sig, can_id, dlc, data):
+        """이 메시지이고 신호를 디코딩할 수 있는 프레임 위치와 raw 값."""
+        need = max(message.min_length, 1)
+        selected = (can_id == message.frame_id) & (dlc >= need)
+        mux = message.multiplexer
+        if sig.multiplexer_id is not None and mux is not None:
+            rows = np.flatnonzero(selected)
+            rows = rows[mux.raw_array(data[rows]) == sig.multiplexer_id]
+        else:
+            rows = np.flatnonzero(selected)
+        return rows, sig.raw_array(data[rows])
+
+    def mask(self, can_id, dlc, data):
+        result = np.zeros(len(can_id), bool)
+        for message, sig in self.targets:
+            if message.payload_length > 8:
+                continue # 트레이스는 8바이트까지만 보관
+            rows, raw = self._selected(message, sig, can_id, dlc, data)
+            if self.by_raw:
+                result[rows] = self.compare(raw, self.raw_values[sig])
+            else: # uint64 raw에 음수 정수 offset을 더하면 넘치므로 float으로 계산 (physical_array와 같음)
+                result[rows] = self.compare(raw * float(sig.scale) + float(sig.offset), self.value)
+        return result
+
+    def match(self, can_id, dlc, data):
+        for message, sig in self.targets:
+            if can_id != message.frame_id or dlc < max(message.min_length, 1) or message.payload_length > 8:
+                continue
+            mux = message.multiplexer
+            if sig.multiplexer_id is not None and mux is not None:
+                if self.extract_raw(mux, data) != sig.multiplexer_id:
+                    continue
+            raw = self.extract_raw(sig, data)
+            if self.by_raw:
+                if self.compare(raw, self.raw_values[sig]):
+                    return True
+            elif self.compare(raw * sig.scale + sig.offset, self.value):
+                return True
+        return False
+
+    @staticmethod
+    def extract_raw(sig, data):
+        """little-endian 정수 하나로 읽은 8바이트 페이로드에서 신호의 raw 값을 꺼냅니다."""
+        if sig.byte_order == "big":
+            data = int.from_bytes(data.to_bytes(8, "little"), "big")
+        shift, mask = sig.bit_layout(8)
+        raw = (data >> shift) & mask
+        if sig.signed:
+            sign_bit = 1 << (sig.length - 1)
+            raw = (raw ^ sign_bit) - sign_bit
+        return raw
+
+
+class NotFilter:
+    def __init__(self, node):
+        self.node = node
+
+    def mask(self, can_id, dlc, data):
+        return ~self.node.mask(can_id, dlc, data)
+
+    def match(self, can_id, dlc, data):
+        return not self.node.match(can_id, dlc, data)
+
+
+class AndFilter:
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def mask(self, can_id, dlc, data):
+        result = self.nodes[0].mask(can_id, dlc, data)
+        for node in self.nodes[1:]:
+            result &= node.mask(can_id, dlc, data)
+        return result
+
+    def match(self, can_id, dlc, data):
+        return all(node.match(can_id, dlc, data) for node in self.nodes)
+
+
+class OrFilter:
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def mask(self, can_id, dlc, data):
+        result = self.nodes[0].mask(can_id, dlc, data)
+        for node in self.nodes[1:]:
+            result |= node.mask(can_id, dlc, data)
+        return result
+
+    def match(self, can_id, dlc, data):
+        return any(node.match(can_id, dlc, data) for node in self.nodes)
+
+
+def find_signal(messages, name):
+    """
+    신호 이름("Vehicle_Speed", "IPC_Drive_Cmd.Ctrl_Flag") 또는 표시 이름으로 [(message, signal)]을 찾습니다.
+    없으면 ValueError를 발생시킵니다.
+    """
+    msg_name, _, sig_name = name.rpartition(".")
+    targets = []
+    for message in (messages or {}).values():
+        for sig in message.signals:
+            if sig.label == name or (sig.name == sig_name and msg_name in ("", message.name)):
+                targets.append((message, sig))
+    if not targets:
+        raise ValueError(f"DBC에 '{name}' 신호가 없습니다.")
+    return targets
+
+
+class FilterParser:
+    """
+    재귀 하강 방식으로 필터 식을 조건 트리로 변환합니다.
+    하위 클래스는 아래 노드 클래스를 바꾸거나 parse_atom()을 재정의해 허용하는 조건을 좁힙니다.
+    """
+    or_node = OrFilter # or_node(nodes), and_node(nodes), not_node(node)
+    and_node = AndFilter
+    not_node = NotFilter
+    signal_node = SignalFilter
+
+    def __init__(self, text, messages):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.messages = messages or {}
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("필터 식이 중간에 끝났습니다.")
+        self.pos += 1
+        return token
+
+    def at_keyword(self, *words):
+        kind, value = self.peek()
+        return value is not None and kind != "str" and value.lower() in words
+
+    def parse(self):
+        node = self.parse_or()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"필터 식에 해석할 수 없는 부분이 있습니다: '{self.tokens[self.pos][1]}'")
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.at_keyword("|", "||", "or"):
+            self.take()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else self.or_node(nodes)
+
+    def parse_and(self):
+        nodes = [self.parse_unary()]
+        while self.at_keyword("&", "&&", "and"):
+            self.take()
+            nodes.append(self.parse_unary())
+        return nodes[0] if len(nodes) == 1 else self.and_node(nodes)
+
+    def parse_unary(self):
+        if self.at_keyword("!", "not"):
+            self.take()
+            return self.not_node(self.parse_unary())
+        if self.at_keyword("("):
+            self.take()
+            node = self.parse_or()
+            if not self.at_keyword(")"):
+                raise ValueError("닫는 괄호가 없습니다.")
+            self.take()
+            return node
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind, value = self.take()
+        if kind == "word" and value.lower() == "id":
+            if self.at_keyword("=", "=="):
+                self.take()
+            return self.parse_ids(self.take()[1])
+        if kind == "word" and value.lower() == "data":
+            if self.at_keyword("=", "=="):
+                self.take()
+            return DataFilter(self.take()[1])
+        if kind in ("word", "str") and self.peek()[0] == "op" and self.peek()[1] in COMPARISONS:
+            op = self.take()[1]
+            return self.parse_signal(value, op, self.take())
+        if kind == "word" and _ID_RE.match(value):
+            return self.parse_ids(value)
+        raise ValueError(f"알 수 없는 조건입니다: '{value}'")
+
+    def parse_ids(self, first):
+        ids = set()
+        ranges = []
+        items = [first]
+        while self.at_keyword(","):
+            self.take()
+            items.append(self.take()[1])
+        for item in items:
+            m = _ID_RE.match(item)
+            if m is None:
+                raise ValueError(f"잘못된 CAN ID입니다: '{item}'")
+            lo = int(m.group(1), 16)
+            if m.group(2) is None:
+                ids.add(lo)
+            else:
+                hi = int(m.group(2), 16)
+                ranges.append((min(lo, hi), max(lo, hi)))
+        return IdFilter(ids, ranges)
+
+    def parse_signal(self, name, op, token):
+        kind, text = token
+        if kind == "str":
+            value = text
+        else:
+            try:
+                value = float(int(text, 16)) if text.lower().startswith("0x") else float(text)
+            except ValueError:
+                raise ValueError(f"신호 비교 값이 숫자가 아닙니다: '{text}'")
+        return self.signal_node(find_signal(self.messages, name), op, value)
+
+
+class FrameFilter:
+    """
+    컴파일된 필터 식.
+    mask(can_id, dlc, data)는 NumPy 컬럼 배열을 받아 bool 배열을,
+    match(can_id, dlc, data)는 프레임 하나(data는 little-endian 정수)에 대해 bool을 반환합니다.
+    """
+    def __init__(self, text, root):
+        self.text = text
+        self.root = root
+
+    def mask(self, can_id, dlc, data):
+        return self.root.mask(can_id, dlc, data)
+
+    def match(self, can_id, dlc, data):
+        return self.root.match(can_id, dlc, data & _MASK64)
+
+    def match_message(self, message):
+        """can.Message 하나가 필터를 만족하는지 검사합니다."""
+        return self.root.match(message.arbitration_id, message.dlc,
+                               int.from_bytes(message.data[:8], "little"))
+
+
+def compile_filter(text, messages=None):
+    """
+    필터 식을 컴파일합니다. 신호 조건을 쓰려면 DBC 메시지 정의 {id: Message}를 넘겨야 합니다.
+    빈 식이면 None을 반환하고, 식이 잘못되면 ValueError를 발생시킵니다.
+    """
+    if not text or not text.strip():
+        return None
+    return FrameFilter(text.strip(), FilterParser(text, messages).parse())
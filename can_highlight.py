@@ -0,0 +1,94 @@
+"""
+Raw 테이블의 바이트 변경 강조 표시.
+
+ByteChangeTracker는 CAN ID별 직전 페이로드를 정수로 보관하고, 프레임마다 XOR 한 번으로
+바뀐 바이트가 있는지 확인합니다. 바뀐 바이트에 대해서만 마지막 변경 시각을 기록하므로
+페이로드가 고정된 ID는 정수 변환과 비교 외에 비용이 없습니다.
+ByteChangeDelegate는 그릴 때의 시각을 기준으로 바이트 배경색을 점점 흐리게 칠합니다.
+"""
+import time
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+
+FADE_SECONDS = 3.0 # 변경 후 강조가 완전히 사라질 때까지의 시간
+HIGHLIGHT_COLOR = (255, 140, 0) # 방금 바뀐 바이트 배경색 (RGB)
+_NEVER = float("-inf")
+
+
+class ByteChangeTracker:
+    """
+    CAN ID별 직전 페이로드와 바이트별 마지막 변경 시각(time.monotonic 기준)을 관리합니다.
+    """
+    def __init__(self):
+        self.previous = {} # CAN ID -> 직전 페이로드 (little-endian 정수)
+        self.changed_at = {} # CAN ID -> 바이트별 마지막 변경 시각 목록 (8개)
+        self.last_change = {} # CAN ID -> 어느 바이트든 마지막으로 바뀐 시각
+        self.latest = _NEVER # 전체 ID 중 마지막 변경 시각
+
+    def update(self, can_id, data, now):
+        """수신 프레임 하나를 반영합니다. data는 bytes/bytearray."""
+        value = int.from_bytes(data, "little")
+        diff = value ^ self.previous.get(can_id, value)
+        if not diff:
+            if can_id not in self.previous:
+                self.previous[can_id] = value
+                self.changed_at[can_id] = [_NEVER] * 8
+                self.last_change[can_id] = _NEVER
+            return
+        self.previous[can_id] = value
+        times = self.changed_at[can_id]
+        i = 0
+        while diff:
+            if diff & 0xFF:
+                times[i] = now
+            diff >>= 8
+            i += 1
+        self.last_change[can_id] = now
+        self.latest = now
+
+    def fading(self, now):
+        """아직 강조가 남아 있는 바이트가 있는지 (다시 그려야 하는지) 여부."""
+        return now - self.latest < FADE_SECONDS
+
+    def clear(self):
+        self.previous.clear()
+        self.changed_at.clear()
+        self.last_change.clear()
+        self.latest = _NEVER
+
+
+class ByteChangeDelegate(QStyledItemDelegate):
+    """
+    hex 문자열로 표시된 페이로드 셀에서 최근에 바뀐 바이트의 배경을 칠하는 델리게이트.
+    셀 아이템의 UserRole에 CAN ID가 들어 있어야 합니다.
+    """
+    def __init__(self, tracker, parent=None):
+        super().__init__(parent)
+        self.tracker = tracker
+
+    def paint(self, painter, option, index):
+        can_id = index.data(Qt.ItemDataRole.UserRole)
+        now = time.monotonic()
+        if now - self.tracker.last_change.get(can_id, _NEVER) < FADE_SECONDS:
+            text = index.data(Qt.ItemDataRole.DisplayRole) or ""
+            metrics = option.fontMetrics
+            style = option.widget.style() if option.widget else None
+            margin = (style.pixelMetric(QStyle.PixelMetric.PM_FocusFrameHMargin, None, option.widget) + 1
+                      if style else 3)
+            left = option.rect.left() + margin
+            top = option.rect.top() + 1
+            height = option.rect.height() - 2
+            painter.save()
+            for i, changed in enumerate(self.tracker.changed_at[can_id]):
+                age = now - changed
+                if age >= FADE_SECONDS or 2 * i + 2 > len(text):
+                    continue
+                x0 = left + metrics.horizontalAdvance(text[:2 * i])
+                x1 = left + metrics.horizontalAdvance(text[:2 * i + 2])
+                color = QColor(*HIGHLIGHT_COLOR)
+                color.setAlpha(int(255 * (1.0 - age / FADE_SECONDS)))
+                painter.fillRect(x0, top, x1 - x0, height, color)
+            painter.restore()
+        super().paint(painter, option, index)
@@ -0,0 +1,447 @@
+"""
+candump / Vector ASC / BLF 로그를 기록 파일(.pclog)로 변환하는 스트리밍 변환기.
+
+각 importer의 blocks()는 파일을 처음부터 한 번만 읽으며 (timestamp, can_id, dlc, flags, data)
+NumPy 배열 묶음(can_export/can_log와 같은 블록 형식)을 차례로 돌려주므로, 파일 크기와 관계없이
+메모리 사용량이 일정합니다. 텍스트 로그는 READ_SIZE 단위로 읽어 줄을 한꺼번에 나누고, 줄마다
+정규식 없이 split()으로 필드를 자릅니다. 해석할 수 없는 줄/객체는 건너뛰고 skipped에 셉니다.
+
+    candump   candump -L 로그 "(1690000000.123456) can0 123#DEADBEEF [R|T]"
+              candump -ta 출력 "(1690000000.123456)  can0  123   [4]  DE AD BE EF"
+    ASC       Vector ASCII 로그 (CAN 프레임, ErrorFrame. CAN FD 줄은 건너뜀)
+    BLF       Vector 바이너리 로그 (CAN_MESSAGE/CAN_MESSAGE2/CAN_ERROR_EXT. CAN FD는 건너뜀)
+
+사용법: python can_import.py 입력로그 [출력.pclog]
+"""
+import argparse
+import struct
+import sys
+import time
+import zlib
+from binascii import unhexlify
+from datetime import datetime, timezone
+
+import numpy as np
+
+from can_log import RecordingWriter, RECORDING_EXTENSION, CODECS, CODEC_ZLIB
+from can_trace import CHUNK_SIZE, FLAG_EXTENDED, FLAG_TX, FLAG_REMOTE, FLAG_ERROR
+
+READ_SIZE = 4 << 20 # 텍스트 로그를 한 번에 읽는 크기 (바이트)
+CAN_ERR_FLAG = 0x20000000 # candump 에러 프레임 ID 표시 비트
+MONTHS = {b"Jan": 1, b"Feb": 2, b"Mar": 3, b"Apr": 4, b"May": 5, b"Jun": 6, b"Jul": 7, b"Aug": 8,
+          b"Sep": 9, b"Oct": 10, b"Nov": 11, b"Dec": 12, b"M\xc3\xa4r": 3, b"Mai": 5, b"Okt": 10, b"Dez": 12}
+
+# BLF 구조 (Vector binlog)
+BLF_FILE_HEADER = struct.Struct("<4sL8BQQLL8H8H")
+BLF_OBJ_HEADER = struct.Struct("<4sHHLL") # signature, header 크기, header 버전, 객체 크기, 객체 종류
+BLF_OBJ_HEADER_V1 = struct.Struct("<LHHQ") # flags, client index, object version, timestamp
+BLF_OBJ_HEADER_V2 = struct.Struct("<LBxHQ8x")
+BLF_CONTAINER = struct.Struct("<H6xL4x") # 압축 방식, 압축 해제 크기
+BLF_CAN_MSG = struct.Struct("<HBBLQ") # channel, flags, dlc, id, data (little-endian 정수로 읽음)
+BLF_CAN_ERROR_EXT = struct.Struct("<HHLBBBxLLH2xQ")
+BLF_LOG_CONTAINER = 10
+BLF_CAN_MESSAGE = 1
+BLF_CAN_MESSAGE2 = 86
+BLF_CAN_ERROR_EXT_TYPE = 73
+BLF_CAN_MSG_EXT = 0x80000000
+BLF_REMOTE_FLAG = 0x80
+BLF_DIR_TX = 0x01
+BLF_TIME_TEN_MICS = 0x01
+
+
+class _Columns:
+    """블록 하나를 만들 필드별 파이썬 리스트."""
+    __slots__ = ("timestamp", "can_id", "dlc", "flags", "data")
+
+    def __init__(self):
+        self.timestamp = []
+        self.can_id = []
+        self.dlc = []
+        self.flags = []
+        self.data = []
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def arrays(self):
+        return (np.array(self.timestamp, np.float64), np.array(self.can_id, np.uint32),
+                np.array(self.dlc, np.uint8), np.array(self.flags, np.uint8), np.array(self.data, np.uint64))
+
+
+def _line_chunks(f, importer):
+    """파일을 READ_SIZE씩 읽어 완성된 줄 목록을 돌려줍니다. 마지막 줄 조각은 다음 읽기로 넘깁니다."""
+    tail = b""
+    while True:
+        buf = f.read(READ_SIZE)
+        if not buf:
+            break
+        importer.bytes_read += len(buf)
+        lines = (tail + buf).split(b"\n")
+        tail = lines.pop()
+        yield lines
+    if tail:
+        yield [tail]
+
+
+class LogImporter:
+    """importer 공통 속성. blocks()가 배열 묶음을 돌려주는 동안 통계가 갱신됩니다."""
+    def __init__(self, path):
+        self.path = path
+        self.frames = 0 # 변환한 프레임 수
+        self.skipped = 0 # 해석하지 못했거나 지원하지 않는 줄/객체 수
+        self.bytes_read = 0
+
+    def blocks(self):
+        raise NotImplementedError
+
+
+class CandumpImporter(LogImporter):
+    """candump -L 로그와 candump -ta 출력."""
+    def blocks(self):
+        with open(self.path, "rb") as f:
+            for lines in _line_chunks(f, self):
+                columns = self._parse(lines)
+                if len(columns):
+                    self.frames += len(columns)
+                    yield columns.arrays()
+
+    def _parse(self, lines):
+        columns = _Columns()
+        timestamps, can_ids, dlcs, flags, data = (columns.timestamp, columns.can_id, columns.dlc,
+                                                  columns.flags, columns.data)
+        skipped = 0
+        for line in lines:
+            fields = line.split()
+            if len(fields) < 3 or fields[0][:1] != b"(":
+                if fields:
+                    skipped += 1
+                continue
+            try:
+                timestamp = float(fields[0][1:-1])
+                can_id_text, sep, payload = fields[2].partition(b"#")
+                if sep:
+                    # candump -L: ID#DATA, ID#R, ID##FDATA (CAN FD)
+                    if payload[:1] == b"#":
+                        skipped += 1
+                        continue
+                    flag = FLAG_TX if len(fields) > 3 and fields[3] == b"T" else 0
+                    if payload[:1] in (b"R", b"r"):
+                        flag |= FLAG_REMOTE
+                        dlc = int(payload[1:]) if len(payload) > 1 else 0
+                        value = 0
+                    else:
+                        raw = unhexlify(payload)
+                        dlc = len(raw)
+                        value = int.from_bytes(raw[:8], "little")
+                else:
+                    # candump -ta: ID [DLC] 바이트들 (또는 remote request)
+                    dlc = int(fields[3][1:-1])
+                    flag = 0
+                    if fields[4:5] == [b"remote"]:
+                        flag = FLAG_REMOTE
+                        value = 0
+                    else:
+                        value = int.from_bytes(unhexlify(b"".join(fields[4:4 + dlc]))[:8], "little")
+                can_id = int(can_id_text, 16)
+            except (ValueError, IndexError):
+                skipped += 1
+                continue
+            if len(can_id_text) > 3:
+                flag |= FLAG_EXTENDED
+                if can_id & CAN_ERR_FLAG:
+                    flag |= FLAG_ERROR
+                    can_id = 0 # 하위 비트는 에러 종류이므로 python-can처럼 ID 0으로 기록
+                can_id &= 0x1FFFFFFF
+            timestamps.append(timestamp)
+            can_ids.append(can_id)
+            dlcs.append(dlc)
+            flags.append(flag)
+            data.append(value)
+        self.skipped += skipped
+        return columns
+
+
+def _asc_datetime(text):
+    """ASC 'date'/'Begin Triggerblock' 뒤의 날짜('Mon Oct 19 04:30:00.000 pm 2026')를 epoch 초로."""
+    fields = text.split()
+    if len(fields) < 4:
+        return None
+    fields = fields[1:] # 요일
+    month = MONTHS.get(fields[0])
+    if month is None:
+        return None
+    rest = b" ".join(fields[1:]).decode("ascii", "replace")
+    for fmt in ("%d %I:%M:%S.%f %p %Y", "%d %I:%M:%S %p %Y", "%d %H:%M:%S.%f %Y", "%d %H:%M:%S %Y"):
+        try:
+            return datetime.strptime(rest, fmt).replace(month=month).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+class ASCImporter(LogImporter):
+    """
+    Vector ASC 로그. 'Begin Triggerblock'(없으면 'date') 날짜를 측정 시작 시각으로 하여 절대 시각으로
+    바꾸며, 날짜가 없으면 파일의 상대 시각을 그대로 씁니다.
+    """
+    def blocks(self):
+        self.base = 16
+        self.relative = False # 'timestamps relative': 직전 이벤트 기준 시각
+        self.start = None
+        self.last = 0.0
+        with open(self.path, "rb") as f:
+            for lines in _line_chunks(f, self):
+                columns = self._parse(lines)
+                if len(columns):
+                    self.frames += len(columns)
+                    yield columns.arrays()
+
+    def _header(self, fields, line):
+        keyword = fields[0].lower()
+        if keyword == b"date":
+            if self.start is None:
+                self.start = _asc_datetime(line.split(None, 1)[1])
+        elif keyword == b"base":
+            self.base = 10 if fields[1].lower() == b"dec" else 16
+            self.relative = len(fields) > 3 and fields[3].lower() == b"relative"
+        elif keyword == b"begin" and len(fields) > 2:
+            start = _asc_datetime(line.split(None, 2)[2])
+            if start is not None:
+                self.start = start
+
+    def _parse(self, lines):
+        columns = _Columns()
+        timestamps, can_ids, dlcs, flags, data = (columns.timestamp, columns.can_id, columns.dlc,
+                                                  columns.flags, columns.data)
+        base = self.base
+        skipped = 0
+        for line in lines:
+            fields = line.split()
+            if len(fields) < 3:
+                continue
+            try:
+                t = float(fields[0])
+            except ValueError:
+                self._header(fields, line)
+                base = self.base
+                continue
+            if self.relative:
+                self.last += t
+                t = self.last
+            if not fields[1].isdigit():
+                if fields[1] != b"Start":
+                    skipped += 1 # CANFD 등 지원하지 않는 이벤트
+                continue
+            if fields[2] == b"ErrorFrame":
+                timestamps.append(t if self.start is None else self.start + t)
+                can_ids.append(0)
+                dlcs.append(0)
+                flags.append(FLAG_ERROR)
+                data.append(0)
+                continue
+            try:
+                can_id_text = fields[2]
+                flag = 0
+                if can_id_text[-1:] in (b"x", b"X"):
+                    flag = FLAG_EXTENDED
+                    can_id_text = can_id_text[:-1]
+                can_id = int(can_id_text, base)
+                if fields[3] == b"Tx":
+                    flag |= FLAG_TX
+                elif fields[3] != b"Rx":
+                    skipped += 1 # 신호/통계 등 프레임이 아닌 줄
+                    continue
+                dlc = int(fields[5], 16) if len(fields) > 5 else 0
+                if fields[4] == b"r":
+                    flag |= FLAG_REMOTE
+                    value = 0
+                else:
+                    raw = bytes(int(b, base) for b in fields[6:6 + dlc]) if base == 10 \
+                        else unhexlify(b"".join(fields[6:6 + dlc]))
+                    value = int.from_bytes(raw[:8], "little")
+            except (ValueError, IndexError):
+                skipped += 1
+                continue
+            timestamps.append(t if self.start is None else self.start + t)
+            can_ids.append(can_id)
+            dlcs.append(dlc)
+            flags.append(flag)
+            data.append(value)
+        self.skipped += skipped
+        return columns
+
+
+def _systemtime(fields):
+    """BLF SYSTEMTIME (연, 월, 요일, 일, 시, 분, 초, 밀리초, UTC)을 epoch 초로. 잘못된 값은 0."""
+    year, month, _, day, hour, minute, second, millisecond = fields
+    try:
+        return datetime(year, month, day, hour, minute, second, millisecond * 1000, tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class BLFImporter(LogImporter):
+    """Vector BLF 로그. LOG_CONTAINER를 하나씩 읽어(zlib 압축 해제) 안의 CAN 객체를 꺼냅니다."""
+    def blocks(self):
+        columns = _Columns()
+        with open(self.path, "rb") as f:
+            header = f.read(BLF_FILE_HEADER.size)
+            if len(header) < BLF_FILE_HEADER.size or header[:4] != b"LOGG":
+                raise ValueError(f"BLF 파일이 아닙니다: {self.path}")
+            fields = BLF_FILE_HEADER.unpack(header)
+            self.start = _systemtime(fields[14:22])
+            f.seek(fields[1]) # header 크기
+            self.bytes_read = fields[1]
+            tail = b""
+            while True:
+                raw = f.read(BLF_OBJ_HEADER.size)
+                if len(raw) < BLF_OBJ_HEADER.size:
+                    break
+                signature, _, _, obj_size, obj_type = BLF_OBJ_HEADER.unpack(raw)
+                if signature != b"LOBJ":
+                    raise ValueError(f"{self.path}: {f.tell() - len(raw)} 위치에 BLF 객체가 없습니다.")
+                body = f.read(obj_size - BLF_OBJ_HEADER.size)
+                f.read(obj_size % 4) # 패딩
+                self.bytes_read += obj_size + obj_size % 4
+                if obj_type != BLF_LOG_CONTAINER:
+                    continue
+                method, _ = BLF_CONTAINER.unpack_from(body)
+                payload = body[BLF_CONTAINER.size:]
+                if method == 2:
+                    payload = zlib.decompress(payload)
+                elif method != 0:
+                    self.skipped += 1
+                    continue
+                tail = self._parse(tail + payload if tail else payload, columns)
+                if len(columns) >= CHUNK_SIZE:
+                    self.frames += len(columns)
+                    yield columns.arrays()
+                    columns = _Columns()
+        if len(columns):
+            self.frames += len(columns)
+            yield columns.arrays()
+
+    def _parse(self, buf, columns):
+        """buf 안의 완전한 객체들을 columns에 추가하고, 다음 컨테이너로 이어지는 나머지를 반환합니다."""
+        timestamps, can_ids, dlcs, flags, data = (columns.timestamp, columns.can_id, columns.dlc,
+                                                  columns.flags, columns.data)
+        unpack_header = BLF_OBJ_HEADER.unpack_from
+        unpack_v1 = BLF_OBJ_HEADER_V1.unpack_from
+        unpack_v2 = BLF_OBJ_HEADER_V2.unpack_from
+        unpack_msg = BLF_CAN_MSG.unpack_from
+        start = self.start
+        end = len(buf)
+        pos = 0
+        while pos + BLF_OBJ_HEADER.size <= end:
+            if buf[pos:pos + 4] != b"LOBJ":
+                found = buf.find(b"LOBJ", pos, pos + 8) # 객체 사이 패딩
+                if found < 0:
+                    if pos + 8 > end:
+                        break
+                    raise ValueError(f"{self.path}: BLF 객체를 찾을 수 없습니다.")
+                pos = found
+                continue
+            _, header_size, header_version, obj_size, obj_type = unpack_header(buf, pos)
+            if pos + obj_size > end:
+                break # 다음 컨테이너로 이어짐
+            at = pos + BLF_OBJ_HEADER.size
+            if header_version == 1:
+                time_flags, _, _, t = unpack_v1(buf, at)
+            elif header_version == 2:
+                time_flags, _, t = unpack_v2(buf, at)
+            else:
+                self.skipped += 1
+                pos += obj_size
+                continue
+            at = pos + header_size
+            t = t * (1e-5 if time_flags == BLF_TIME_TEN_MICS else 1e-9) + start
+            if obj_type == BLF_CAN_MESSAGE or obj_type == BLF_CAN_MESSAGE2:
+                _, msg_flags, dlc, can_id, value = unpack_msg(buf, at)
+                flag = FLAG_EXTENDED if can_id & BLF_CAN_MSG_EXT else 0
+                if msg_flags & BLF_DIR_TX:
+                    flag |= FLAG_TX
+                if msg_flags & BLF_REMOTE_FLAG:
+                    flag |= FLAG_REMOTE
+                    value = 0
+                elif dlc < 8:
+                    value &= (1 << (8 * dlc)) - 1
+                timestamps.append(t)
+                can_ids.append(can_id & 0x1FFFFFFF)
+                dlcs.append(dlc)
+                flags.append(flag)
+                data.append(value)
+            elif obj_type == BLF_CAN_ERROR_EXT_TYPE:
+                fields = BLF_CAN_ERROR_EXT.unpack_from(buf, at)
+                dlc, can_id, value = fields[5], fields[7], fields[9]
+                timestamps.append(t)
+                can_ids.append(can_id & 0x1FFFFFFF)
+                dlcs.append(dlc)
+                flags.append(FLAG_ERROR | (FLAG_EXTENDED if can_id & BLF_CAN_MSG_EXT else 0))
+                data.append(value & ((1 << (8 * dlc)) - 1) if dlc < 8 else value)
+            else:
+                self.skipped += 1 # CAN FD, 마커 등
+            pos += obj_size
+        return buf[pos:]
+
+
+IMPORTERS = {
+    ".log": CandumpImporter,
+    ".txt": CandumpImporter,
+    ".candump": CandumpImporter,
+    ".asc": ASCImporter,
+    ".blf": BLFImporter,
+}
+
+
+def open_importer(path):
+    """확장자에 맞는 importer를 만듭니다. 지원하지 않는 확장자는 ValueError."""
+    for extension, importer in IMPORTERS.items():
+        if path.lower().endswith(extension):
+            return importer(path)
+    raise ValueError(f"지원하지 않는 로그 형식입니다: {path} ({', '.join(IMPORTERS)})")
+
+
+def import_log(path, output, progress=None, codec=CODEC_ZLIB):
+    """
+    로그를 기록 파일로 변환하고 importer(frames/skipped/bytes_read 통계)와 걸린 시간(초)을 반환합니다.
+    progress(importer)는 블록마다 호출됩니다. codec은 기록 파일의 블록 압축 방식입니다.
+    """
+    importer = open_importer(path)
+    start = time.perf_counter()
+    with RecordingWriter(output, codec=codec) as writer:
+        for block in importer.blocks():
+            writer.write(*block)
+            if progress is not None:
+                progress(importer)
+    return importer, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="candump/ASC/BLF 로그를 기록 파일(.pclog)로 변환")
+    arg_parser.add_argument("log", help="입력 로그 (.log/.txt: candump, .asc, .blf)")
+    arg_parser.add_argument("output", nargs="?", help="출력 파일 (기본: 입력 이름 + .pclog)")
+    arg_parser.add_argument("--codec", choices=list(CODECS), default="zlib",
+                            help="블록 압축 (raw: 압축 안 함, zlib: 기본, lzma: 느리지만 더 작음)")
+    args = arg_parser.parse_args()
+    output = args.output or args.log.rsplit(".", 1)[0] + RECORDING_EXTENSION
+
+    def report(importer):
+        elapsed = time.perf_counter() - start
+        print(f"\r{importer.frames} frames, {importer.bytes_read / 1e6:.1f} MB, "
+              f"{importer.frames / elapsed:,.0f} frames/s, {importer.bytes_read / 1e6 / elapsed:.1f} MB/s",
+              end="", file=sys.stderr)
+
+    start = time.perf_counter()
+    try:
+        importer, elapsed = import_log(args.log, output, report, args.codec)
+    except (OSError, ValueError) as e:
+        print(f"\n변환 실패: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(file=sys.stderr)
+    rate = importer.frames / elapsed if elapsed > 0 else 0.0
+    print(f"{output}: {importer.frames} frames, 건너뜀 {importer.skipped}, {elapsed:.2f}초 "
+          f"({rate:,.0f} frames/s, {importer.bytes_read / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
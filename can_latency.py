@@ -0,0 +1,347 @@
+"""
+명령 -> 응답 지연 분석.
+
+송신한 설정값(0x504 Speed_Req, 0x502 Steer_Angle_Req)이 바뀔 때마다 디코딩된 수신
+스트림에서 그 변화에 대한 첫 응답을 찾아 다음 값을 누적합니다.
+- echo 지연: 명령 값이 바뀐 뒤 echo 신호(0x303 VCU_Speed_Req)가 같은 값을 처음 보일 때까지
+- 90% 도달 시간: 실제 값(0x304 Vehicle_Speed, 0x18F EPS_Current_Angle)이 시작 값에서
+  목표까지의 90%에 처음 도달할 때까지
+- overshoot: 다음 명령 변화 또는 SETTLE_SECONDS까지 목표를 넘어선 최대 정도 (변화량 대비 %)
+주행 제어 루프는 설정값을 조금씩 바꾸므로(slew) STEP_GAP보다 가깝게 이어진 변화는 하나의
+step으로 묶어 첫 변화 시각부터 잽니다. 송신 프레임은 수신 프레임보다 늦게 트레이스에
+기록될 수 있어 REORDER_SECONDS만큼 늦게 시간순으로 처리합니다.
+분석은 can_analysis.AnalysisWorker에서 실행됩니다.
+"""
+import numpy as np
+from PyQt6.QtCore import Qt, QThread, QTimer, QRectF
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import (
+    QWidget, QHBoxLayout, QVBoxLayout, QTableWidget, QTableWidgetItem, QLabel, QAbstractItemView
+)
+
+from can_trace import FLAG_ERROR
+from can_analysis import AnalysisWorker
+
+STEP_GAP = 0.1 # 이 간격(초)보다 가깝게 이어진 명령 변화는 하나의 step
+RESPONSE_TIMEOUT = 5.0 # 이 시간(초) 안에 응답이 없으면 timeout
+SETTLE_SECONDS = 2.0 # 90%에 도달한 step은 마지막 명령 변화 후 이 시간 동안 overshoot를 봄
+REORDER_SECONDS = 0.5 # 송신/수신 기록 순서가 뒤바뀔 수 있는 최대 시간
+HISTOGRAM_BINS = 20
+ANALYSIS_INTERVAL_MS = 1000 # 패널이 보일 때 분석 주기
+
+# (이름, 명령 (ID, 신호), echo (ID, 신호) 또는 None, 실제 값 (ID, 신호), 크기만 비교 여부, 최소 step 크기)
+# 속도 명령은 크기(방향은 기어)이므로 응답도 절댓값으로 비교
+RESPONSE_CHANNELS = (
+    ("Speed", (0x504, "Speed_Req"), (0x303, "VCU_Speed_Req"), (0x304, "Vehicle_Speed"), True, 0.5),
+    ("Steering", (0x502, "Steer_Angle_Req"), None, (0x18F, "EPS_Current_Angle"), False, 1.0),
+)
+
+_COMMAND, _ECHO, _FOLLOW = 0, 1, 2
+
+
+class ResponseChannel:
+    """명령 신호 하나와 그 응답 신호들의 지연 통계."""
+    def __init__(self, name, command, echo, follow, magnitude, min_step):
+        self.name = name
+        self.command = command # Signal
+        self.echo = echo # Signal 또는 None
+        self.follow = follow # Signal
+        self.magnitude = magnitude
+        self.min_step = min_step
+        self.echo_tolerance = max(command.scale, echo.scale) / 2 if echo else 0
+        self.echo_latency = [] # 초
+        self.rise_time = [] # 초 (90% 도달)
+        self.overshoot = [] # %
+        self.steps = 0
+        self.timeouts = 0 # RESPONSE_TIMEOUT 안에 90%에 도달하지 못한 step
+        self.echo_missed = 0 # echo 전에 다음 값으로 바뀐 명령 변화
+        self.value = None # 마지막 명령 값
+        self.actual = None # 마지막 실제 값
+        self.echo_waits = [] # echo를 기다리는 (변화 시각, 값)
+        self.step = None # 진행 중인 step [시작 시각, 시작 값, 목표, 마지막 변화 시각, 90% 시간, 최대 진행률]
+
+    def on_command(self, t, value):
+        if self.value is not None and value == self.value:
+            return
+        first = self.value is None
+        self.value = value
+        if first:
+            return # 처음 보는 명령은 변화 시각을 알 수 없음
+        if self.echo is not None:
+            self.echo_waits.append((t, value))
+        step = self.step
+        if step is not None and t - step[3] <= STEP_GAP:
+            step[2] = value # slew 중인 변화는 같은 step의 목표를 갱신
+            step[3] = t
+            step[4] = None
+            step[5] = 0.0
+            return
+        self._finish_step()
+        if self.actual is not None:
+            self.step = [t, self.actual, value, t, None, 0.0]
+
+    def on_echo(self, t, value):
+        waits = self.echo_waits
+        for k, (t0, expected) in enumerate(waits):
+            if abs(value - expected) <= self.echo_tolerance:
+                self.echo_latency.append(t - t0)
+                self.echo_missed += k # 앞선 변화는 echo 없이 지나감
+                del waits[:k + 1]
+                return
+        while waits and t - waits[0][0] > RESPONSE_TIMEOUT:
+            waits.pop(0)
+            self.echo_missed += 1
+
+    def on_follow(self, t, value):
+        self.actual = value
+        step = self.step
+        if step is None:
+            return
+        start, target = step[1], step[2]
+        amplitude = target - start
+        if amplitude:
+            progress = (value - start) / amplitude
+            if step[4] is None and progress >= 0.9:
+                step[4] = t - step[0]
+            if progress > step[5]:
+                step[5] = progress
+        if t - step[3] > (RESPONSE_TIMEOUT if step[4] is None else SETTLE_SECONDS):
+            self._finish_step()
+
+    def _finish_step(self):
+        step, self.step = self.step, None
+        if step is None or abs(step[2] - step[1]) < self.min_step:
+            return
+        self.steps += 1
+        if step[4] is None:
+            self.timeouts += 1
+            return
+        self.rise_time.append(step[4])
+        self.overshoot.append(max(step[5] - 1.0, 0.0) * 100)
+
+
+class LatencyMetric:
+    """보고용 지표 하나의 값 배열과 요약 통계."""
+    def __init__(self, channel, name, unit, values, scale=1.0):
+        self.channel = channel
+        self.name = name
+        self.unit = unit
+        self.values = np.asarray(values, dtype=np.float64) * scale
+
+    @property
+    def label(self):
+        return f"{self.channel} {self.name} ({self.unit})"
+
+    def summary(self):
+        """(count, mean, p50, p90, max). 값이 없으면 count 외에는 None."""
+        values = self.values
+        if not len(values):
+            return 0, None, None, None, None
+        p50, p90 = np.percentile(values, [50, 90])
+        return len(values), float(values.mean()), float(p50), float(p90), float(values.max())
+
+
+class LatencyAnalyzer:
+    """
+    트레이스 저장소의 새 프레임에서 명령 변화와 응답을 찾아 ResponseChannel에 누적합니다.
+    update()/report()는 한 스레드(AnalysisWorker)에서만 호출합니다.
+    """
+    def __init__(self, messages, channels=RESPONSE_CHANNELS):
+        def find(spec):
+            if spec is None:
+                return None
+            frame_id, name = spec
+            message = messages.get(frame_id)
+            for sig in message.signals if message else ():
+                if sig.name == name:
+                    return sig
+            return None
+
+        self.channels = []
+        self.sources = {} # CAN ID -> [(종류, ResponseChannel, Signal)]
+        for name, command, echo, follow, magnitude, min_step in channels:
+            signals = (find(command), find(echo), find(follow))
+            if signals[0] is None or signals[2] is None:
+                continue # DBC에 없는 채널은 건너뜀
+            channel = ResponseChannel(name, *signals, magnitude, min_step)
+            self.channels.append(channel)
+            for kind, spec, sig in zip((_COMMAND, _ECHO, _FOLLOW), (command, echo, follow), signals):
+                if sig is not None:
+                    self.sources.setdefault(spec[0], []).append((kind, channel, sig))
+        self.ids = np.array(sorted(self.sources), dtype=np.uint32)
+        self.scanned = 0 # 처리를 마친 전역 프레임 번호
+        self.latest = float("-inf") # 지금까지 본 가장 늦은 타임스탬프
+        self.pending = [] # 아직 처리하지 않은 (시각 배열, 종류, 채널 번호, 값 배열) 묶음
+
+    def update(self, store):
+        """store(TraceStore.snapshot())의 새 프레임을 모으고, 순서가 확정된 구간을 처리합니다."""
+        index = {channel: k for k, channel in enumerate(self.channels)}
+        for start, chunk, i, j in store.iter_chunks(max(self.scanned, store.base), store.count):
+            if j > i:
+                self.latest = max(self.latest, float(chunk.timestamp[i:j].max()))
+            rows = np.flatnonzero(np.isin(chunk.can_id[i:j], self.ids)
+                                  & ((chunk.flags[i:j] & FLAG_ERROR) == 0)) + i
+            if not len(rows):
+                continue
+            ids = chunk.can_id[rows]
+            for can_id, sources in self.sources.items():
+                sel = rows[ids == can_id]
+                if not len(sel):
+                    continue
+                for kind, channel, sig in sources:
+                    values = sig.physical_array(chunk.data[sel])
+                    if channel.magnitude:
+                        values = np.abs(values)
+                    self.pending.append((chunk.timestamp[sel], np.full(len(sel), kind, np.int8),
+                                         np.full(len(sel), index[channel], np.int16), values))
+        self.scanned = store.count
+        if not self.pending:
+            return
+        times, kinds, channels, values = (np.concatenate(column) for column in zip(*self.pending))
+        order = np.argsort(times, kind="stable")
+        ready = int(np.searchsorted(times[order], self.latest - REORDER_SECONDS, side="right"))
+        done, rest = order[:ready], order[ready:]
+        self.pending = [(times[rest], kinds[rest], channels[rest], values[rest])] if len(rest) else []
+        handlers = [(channel.on_command, channel.on_echo, channel.on_follow) for channel in self.channels]
+        for t, kind, k, value in zip(times[done].tolist(), kinds[done].tolist(),
+                                     channels[done].tolist(), values[done].tolist()):
+            handlers[k][kind](t, value)
+
+    def report(self):
+        """LatencyMetric 목록과 채널별 (이름, step 수, timeout 수, echo 누락 수)를 반환합니다."""
+        metrics = []
+        for channel in self.channels:
+            if channel.echo is not None:
+                metrics.append(LatencyMetric(channel.name, "echo latency", "ms", channel.echo_latency, 1000))
+            metrics.append(LatencyMetric(channel.name, "time to 90%", "ms", channel.rise_time, 1000))
+            metrics.append(LatencyMetric(channel.name, "overshoot", "%", channel.overshoot))
+        counts = [(channel.name, channel.steps, channel.timeouts, channel.echo_missed)
+                  for channel in self.channels]
+        return metrics, counts
+
+
+class Histogram(QWidget):
+    """LatencyMetric 값의 막대 히스토그램."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.metric = None
+        self.setMinimumSize(300, 200)
+
+    def set_metric(self, metric):
+        self.metric = metric
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setPen(self.palette().text().color())
+        metric = self.metric
+        if metric is None or not len(metric.values):
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "데이터 없음")
+            painter.end()
+            return
+        counts, edges = np.histogram(metric.values, bins=HISTOGRAM_BINS)
+        margin = 20
+        width = (self.width() - 2 * margin) / len(counts)
+        height = self.height() - 2 * margin
+        top = counts.max()
+        for k, count in enumerate(counts.tolist()):
+            bar = height * count / top
+            rect = QRectF(margin + k * width, margin + height - bar, width - 1, bar)
+            painter.fillRect(rect, QColor(70, 130, 200))
+            if count:
+                painter.drawText(QRectF(rect.left(), rect.top() - 16, width, 16),
+                                 Qt.AlignmentFlag.AlignCenter, str(count))
+        bottom = QRectF(margin, margin + height, self.width() - 2 * margin, margin)
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignLeft, f"{edges[0]:.1f}")
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignRight, f"{edges[-1]:.1f} {metric.unit}")
+        painter.end()
+
+
+class LatencyPanel(QWidget):
+    """
+    채널/지표별 요약 표와 선택한 지표의 히스토그램을 보여주는 패널.
+    패널이 보일 때만 ANALYSIS_INTERVAL_MS 주기로 백그라운드 분석을 요청합니다.
+    """
+    HEADERS = ["Metric", "Count", "Mean", "P50", "P90", "Max"]
+
+    def __init__(self, store, messages, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.messages = messages
+        self.analyzer = LatencyAnalyzer(messages)
+        self.metrics = []
+        self.selected = 0
+
+        self.worker = AnalysisWorker(self)
+        self.worker.report_ready.connect(self._on_report)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.request_analysis)
+        self.timer.start(ANALYSIS_INTERVAL_MS)
+
+        layout = QHBoxLayout(self)
+        left_layout = QVBoxLayout()
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setColumnWidth(0, 240)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        left_layout.addWidget(self.table)
+        self.count_label = QLabel("명령 변화를 기다리는 중...")
+        left_layout.addWidget(self.count_label)
+        layout.addLayout(left_layout, 3)
+        self.histogram = Histogram()
+        layout.addWidget(self.histogram, 2)
+
+        self.table.itemSelectionChanged.connect(self._on_selection_changed)
+
+    def request_analysis(self):
+        """보이는 상태이고 이전 분석이 끝났으면 새 프레임에 대한 분석을 시작합니다."""
+        if not self.isVisible() or self.worker.isRunning():
+            return
+        self.worker.discovery = self.analyzer
+        self.worker.snapshot = self.store.snapshot()
+        self.worker.start(QThread.Priority.LowPriority)
+
+    def clear(self):
+        """누적 통계를 초기화합니다."""
+        self.analyzer = LatencyAnalyzer(self.messages)
+        self.metrics = []
+        self.table.setRowCount(0)
+        self.histogram.set_metric(None)
+        self.count_label.setText("명령 변화를 기다리는 중...")
+
+    def shutdown(self):
+        """창을 닫을 때 실행 중인 분석이 끝날 때까지 기다립니다."""
+        self.timer.stop()
+        self.worker.wait()
+
+    def _on_report(self, analyzer, report):
+        if analyzer is not self.analyzer:
+            return # clear() 이전에 시작된 분석 결과
+        self.metrics, counts = report
+        self.table.blockSignals(True)
+        self.table.setRowCount(len(self.metrics))
+        for row, metric in enumerate(self.metrics):
+            count, *stats = metric.summary()
+            values = [metric.label, str(count)] + ["-" if v is None else f"{v:.1f}" for v in stats]
+            for column, text in enumerate(values):
+                item = self.table.item(row, column)
+                if item is None:
+                    self.table.setItem(row, column, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
+        self.table.selectRow(min(self.selected, len(self.metrics) - 1))
+        self.table.blockSignals(False)
+        self.count_label.setText(", ".join(
+            f"{name}: {steps} steps, {timeouts} timeout" + (f", echo 누락 {missed}" if missed else "")
+            for name, steps, timeouts, missed in counts))
+        self.histogram.set_metric(self.metrics[self.selected] if self.selected < len(self.metrics) else None)
+
+    def _on_selection_changed(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return
+        self.selected = rows[0].row()
+        self.histogram.set_metric(self.metrics[self.selected])
@@ -0,0 +1,416 @@
+"""
+모니터 기록 파일 형식 (.pclog).
+
+프레임을 block_size개씩 블록으로 묶어 저장하고, 블록 안에서는 CAN ID별 구간(segment)으로
+나누어 필드별 배열을 연속으로 둡니다. 파일 끝의 색인에 블록마다 위치, 시간 범위, ID별 프레임
+수가 있으므로, 필요한 시간 범위의 블록과 필요한 ID의 구간만 읽을 수 있습니다.
+
+    파일 헤더  MAGIC, 버전
+    블록 *     블록 헤더, ID 표(can_id, 개수, 구간 위치, 구간 크기) * id_count, 구간 *
+    색인       INDEX_MAGIC, 블록 수, 블록마다 (위치, 프레임 수, 시작/끝 시각, ID 표)
+    트레일러   색인 위치, END_MAGIC
+
+구간은 블록 내 순서(seq, uint32), timestamp(float64), dlc(uint8), flags(uint8, can_trace의
+FLAG_*), data(uint64, 8바이트 little-endian) 배열을 차례로 담습니다. 블록을 읽을 때 seq로
+원래 순서를 복원합니다. 기록 중 종료되어 색인이 없으면 블록 헤더를 차례로 읽어 색인을 다시 만듭니다.
+
+블록 헤더의 codec이 CODEC_ZLIB/CODEC_LZMA이면 구간마다 다음과 같이 변환한 뒤 압축합니다.
+ID별로 나뉘어 있어 같은 ID의 주기 프레임끼리 모이므로 변환 결과가 잘 압축되며, 구간 단위로
+압축하므로 필요한 ID만 풀 수 있습니다.
+    seq, timestamp    직전 값과의 차이 (timestamp는 float64 비트를 int64로 보고 빼므로 손실 없음)
+    data              구간 안의 서로 다른 페이로드 표 + 프레임마다 표 번호(1/2/4바이트 back-reference)
+    모든 배열은 바이트 자리별로 모아(shuffle) 같은 자리의 바이트가 이어지도록 둡니다.
+압축 codec의 구간은 1바이트 표시로 시작하며, 프레임이 MIN_PACKED_FRAMES개보다 적은 구간은 압축해도
+줄지 않고 시간만 들므로 RAW 구간 그대로 둡니다 (SEGMENT_STORED).
+"""
+import lzma
+import struct
+import zlib
+
+import can
+import numpy as np
+
+from can_trace import CHUNK_SIZE, FLAG_EXTENDED, FLAG_TX, FLAG_REMOTE, FLAG_ERROR
+
+RECORDING_EXTENSION = ".pclog"
+MAGIC = b"PCANLOG\0"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sH6x")
+BLOCK_MAGIC = b"BLK\0"
+BLOCK_HEADER = struct.Struct("<4sIIHBxdd") # magic, 본문 크기, 프레임 수, ID 수, codec, 시작/끝 시각
+SEGMENT_ENTRY = struct.Struct("<IIII") # can_id, 프레임 수, 구간 위치(본문 기준), 구간 크기
+INDEX_MAGIC = b"IDX\0"
+INDEX_HEADER = struct.Struct("<4sI")
+INDEX_ENTRY = struct.Struct("<QIddH") # 블록 위치, 프레임 수, 시작/끝 시각, ID 수
+INDEX_ID = struct.Struct("<II") # can_id, 프레임 수
+TRAILER = struct.Struct("<Q8s")
+END_MAGIC = b"PCANIDX\0"
+CODEC_RAW = 0
+CODEC_ZLIB = 1 # 구간 변환 + zlib
+CODEC_LZMA = 2 # 구간 변환 + lzma (느리지만 더 작음)
+CODECS = {"raw": CODEC_RAW, "zlib": CODEC_ZLIB, "lzma": CODEC_LZMA}
+ZLIB_LEVEL = 6
+LZMA_PRESET = 6
+PACKED_HEADER = struct.Struct("<IB3x") # 서로 다른 페이로드 수, back-reference 바이트 수
+SEGMENT_STORED = b"\0" # 압축 codec 블록 안의 RAW 구간
+SEGMENT_PACKED = b"\1"
+MIN_PACKED_FRAMES = 32
+
+# 구간 안의 필드 순서와 자료형
+SEGMENT_FIELDS = (("seq", np.uint32), ("timestamp", np.float64), ("dlc", np.uint8),
+                  ("flags", np.uint8), ("data", np.uint64))
+
+
+def message_flags(msg):
+    """can.Message의 속성을 can_trace FLAG_* 비트로 변환합니다."""
+    return ((FLAG_EXTENDED if msg.is_extended_id else 0) | (FLAG_REMOTE if msg.is_remote_frame else 0)
+            | (FLAG_ERROR if msg.is_error_frame else 0) | (0 if msg.is_rx else FLAG_TX))
+
+
+def _shuffle(array):
+    """배열을 바이트 자리별로 모읍니다 (모든 원소의 0번째 바이트, 1번째 바이트, ...)."""
+    return np.ascontiguousarray(array).view(np.uint8).reshape(-1, array.itemsize).T.tobytes()
+
+
+def _unshuffle(raw, offset, dtype, n):
+    size = np.dtype(dtype).itemsize
+    planes = np.frombuffer(raw, np.uint8, n * size, offset).reshape(size, n)
+    return np.ascontiguousarray(planes.T).view(dtype).reshape(n)
+
+
+def _delta(values):
+    result = values.copy()
+    result[1:] -= values[:-1]
+    return result
+
+
+def _pack_segment(codec, seq, timestamp, dlc, flags, data):
+    """ID 하나의 구간을 codec 형식의 바이트로 만듭니다."""
+    if codec == CODEC_RAW or len(seq) < MIN_PACKED_FRAMES:
+        raw = b"".join(np.ascontiguousarray(column, dtype).tobytes()
+                       for column, (_, dtype) in zip((seq, timestamp, dlc, flags, data), SEGMENT_FIELDS))
+        return raw if codec == CODEC_RAW else SEGMENT_STORED + raw
+    payloads, refs = np.unique(data, return_inverse=True)
+    width = 1 if len(payloads) <= 0x100 else 2 if len(payloads) <= 0x10000 else 4
+    packed = b"".join((
+        PACKED_HEADER.pack(len(payloads), width),
+        _shuffle(_delta(np.ascontiguousarray(seq, np.uint32))),
+        _shuffle(_delta(np.ascontiguousarray(timestamp, np.float64).view(np.int64))),
+        np.ascontiguousarray(dlc, np.uint8).tobytes(),
+        np.ascontiguousarray(flags, np.uint8).tobytes(),
+        _shuffle(payloads),
+        _shuffle(refs.astype(f"<u{width}")),
+    ))
+    if codec == CODEC_ZLIB:
+        return SEGMENT_PACKED + zlib.compress(packed, ZLIB_LEVEL)
+    return SEGMENT_PACKED + lzma.compress(packed, preset=LZMA_PRESET)
+
+
+def _unpack_segment(codec, raw, n):
+    """_pack_segment()의 역. {필드 이름: 배열}을 반환합니다."""
+    if codec not in (CODEC_RAW, CODEC_ZLIB, CODEC_LZMA):
+        raise ValueError(f"지원하지 않는 블록 codec입니다: {codec}")
+    if codec != CODEC_RAW:
+        stored = raw[:1] == SEGMENT_STORED
+        raw = raw[1:]
+    if codec == CODEC_RAW or stored:
+        fields = {}
+        pos = 0
+        for name, dtype in SEGMENT_FIELDS:
+            fields[name] = np.frombuffer(raw, dtype, n, pos)
+            pos += n * np.dtype(dtype).itemsize
+        return fields
+    packed = zlib.decompress(raw) if codec == CODEC_ZLIB else lzma.decompress(raw)
+    unique, width = PACKED_HEADER.unpack_from(packed)
+    pos = PACKED_HEADER.size
+    seq = np.cumsum(_unshuffle(packed, pos, np.uint32, n), dtype=np.uint32)
+    pos += 4 * n
+    timestamp = np.cumsum(_unshuffle(packed, pos, np.int64, n)).view(np.float64)
+    pos += 8 * n
+    dlc = np.frombuffer(packed, np.uint8, n, pos)
+    flags = np.frombuffer(packed, np.uint8, n, pos + n)
+    pos += 2 * n
+    payloads = _unshuffle(packed, pos, np.uint64, unique)
+    refs = _unshuffle(packed, pos + 8 * unique, f"<u{width}", n)
+    return {"seq": seq, "timestamp": timestamp, "dlc": dlc, "flags": flags, "data": payloads[refs]}
+
+
+class BlockInfo:
+    """색인의 블록 하나. ids는 {CAN ID: 프레임 수}."""
+    __slots__ = ("offset", "count", "t_first", "t_last", "ids")
+
+    def __init__(self, offset, count, t_first, t_last, ids):
+        self.offset = offset
+        self.count = count
+        self.t_first = t_first
+        self.t_last = t_last
+        self.ids = ids
+
+
+class RecordingWriter:
+    """
+    프레임 배열을 받아 block_size개씩 블록으로 기록합니다. close()에서 남은 프레임과 색인을 씁니다.
+    codec은 CODEC_RAW/CODEC_ZLIB/CODEC_LZMA 또는 CODECS의 이름입니다. with 문으로 사용할 수 있습니다.
+    """
+    def __init__(self, path, block_size=CHUNK_SIZE, codec=CODEC_ZLIB):
+        codec = CODECS.get(codec, codec)
+        if codec not in CODECS.values():
+            raise ValueError(f"지원하지 않는 codec입니다: {codec} ({', '.join(CODECS)})")
+        self.codec = codec
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self.block_size = block_size
+        self.blocks = []
+        self.frames = 0 # 기록한 프레임 수
+        self._pending = [] # 아직 블록으로 쓰지 않은 (timestamp, can_id, dlc, flags, data) 배열 묶음
+        self._pending_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, timestamp, can_id, dlc, flags, data):
+        """같은 길이의 필드 배열로 프레임들을 추가합니다 (can_export 블록과 같은 순서)."""
+        n = len(timestamp)
+        if n == 0:
+            return
+        self._pending.append((timestamp, can_id, dlc, flags, data))
+        self._pending_count += n
+        if self._pending_count >= self.block_size:
+            fields = [np.concatenate(column) for column in zip(*self._pending)]
+            full = self._pending_count - self._pending_count % self.block_size
+            for start in range(0, full, self.block_size):
+                self._write_block([column[start:start + self.block_size] for column in fields])
+            self._pending = [tuple(column[full:] for column in fields)]
+            self._pending_count -= full
+
+    def write_messages(self, messages):
+        """can.Message 목록을 추가합니다."""
+        self.write(np.array([m.timestamp for m in messages], np.float64),
+                   np.array([m.arbitration_id for m in messages], np.uint32),
+                   np.array([m.dlc for m in messages], np.uint8),
+                   np.array([message_flags(m) for m in messages], np.uint8),
+                   np.array([int.from_bytes(m.data[:8], "little") for m in messages], np.uint64))
+
+    def _write_block(self, fields):
+        timestamp, can_id, dlc, flags, data = fields
+        n = len(timestamp)
+        order = np.argsort(can_id, kind="stable")
+        ids, starts, counts = np.unique(can_id[order], return_index=True, return_counts=True)
+        columns = {"seq": order.astype(np.uint32), "timestamp": timestamp[order], "dlc": dlc[order],
+                   "flags": flags[order], "data": data[order]}
+        table = []
+        segments = []
+        position = 0
+        for can_id_value, start, count in zip(ids.tolist(), starts.tolist(), counts.tolist()):
+            segment = _pack_segment(self.codec, *(columns[name][start:start + count] for name, _ in SEGMENT_FIELDS))
+            table.append(SEGMENT_ENTRY.pack(can_id_value, count, position, len(segment)))
+            segments.append(segment)
+            position += len(segment)
+        t_first, t_last = float(timestamp.min()), float(timestamp.max())
+        offset = self.file.tell()
+        body = b"".join(table) + b"".join(segments)
+        self.file.write(BLOCK_HEADER.pack(BLOCK_MAGIC, len(body), n, len(ids), self.codec, t_first, t_last))
+        self.file.write(body)
+        self.blocks.append(BlockInfo(offset, n, t_first, t_last, dict(zip(ids.tolist(), counts.tolist()))))
+        self.frames += n
+
+    def close(self):
+        if self.file.closed:
+            return
+        try:
+            if self._pending_count:
+                self._write_block([np.concatenate(column) for column in zip(*self._pending)])
+                self._pending = []
+                self._pending_count = 0
+            index_offset = self.file.tell()
+            parts = [INDEX_HEADER.pack(INDEX_MAGIC, len(self.blocks))]
+            for block in self.blocks:
+                parts.append(INDEX_ENTRY.pack(block.offset, block.count, block.t_first, block.t_last,
+                                              len(block.ids)))
+                parts.extend(INDEX_ID.pack(can_id, count) for can_id, count in block.ids.items())
+            parts.append(TRAILER.pack(index_offset, END_MAGIC))
+            self.file.write(b"".join(parts))
+        finally:
+            self.file.close()
+
+
+class RecordingReader:
+    """
+    .pclog 파일을 읽습니다. blocks는 색인(BlockInfo 목록)이며, 필요한 블록과 ID 구간만 읽습니다.
+    형식이 맞지 않으면 ValueError를 발생시킵니다.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            magic, version = FILE_HEADER.unpack(self.file.read(FILE_HEADER.size).ljust(FILE_HEADER.size, b"\0"))
+            if magic != MAGIC:
+                raise ValueError(f"기록 파일(.pclog)이 아닙니다: {path}")
+            if version > VERSION:
+                raise ValueError(f"지원하지 않는 기록 파일 버전입니다: {version}")
+            self.blocks = self._read_index()
+            if self.blocks is None:
+                self.blocks = self._scan_blocks() # 색인 없이 끝난 파일
+        except Exception:
+            self.file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    @property
+    def frame_count(self):
+        return sum(block.count for block in self.blocks)
+
+    @property
+    def time_range(self):
+        """(첫 시각, 마지막 시각). 프레임이 없으면 None."""
+        if not self.blocks:
+            return None
+        return min(b.t_first for b in self.blocks), max(b.t_last for b in self.blocks)
+
+    def id_counts(self):
+        """{CAN ID: 전체 프레임 수}."""
+        counts = {}
+        for block in self.blocks:
+            for can_id, count in block.ids.items():
+                counts[can_id] = counts.get(can_id, 0) + count
+        return counts
+
+    def _read_index(self):
+        f = self.file
+        f.seek(0, 2)
+        size = f.tell()
+        if size < FILE_HEADER.size + TRAILER.size:
+            return None
+        f.seek(size - TRAILER.size)
+        index_offset, end_magic = TRAILER.unpack(f.read(TRAILER.size))
+        if end_magic != END_MAGIC or index_offset >= size:
+            return None
+        f.seek(index_offset)
+        raw = f.read(size - TRAILER.size - index_offset)
+        magic, block_count = INDEX_HEADER.unpack_from(raw)
+        if magic != INDEX_MAGIC:
+            return None
+        pos = INDEX_HEADER.size
+        blocks = []
+        for _ in range(block_count):
+            offset, count, t_first, t_last, id_count = INDEX_ENTRY.unpack_from(raw, pos)
+            pos += INDEX_ENTRY.size
+            ids = dict(INDEX_ID.iter_unpack(raw[pos:pos + id_count * INDEX_ID.size]))
+            pos += id_count * INDEX_ID.size
+            blocks.append(BlockInfo(offset, count, t_first, t_last, ids))
+        return blocks
+
+    def _scan_blocks(self):
+        f = self.file
+        size = f.seek(0, 2)
+        f.seek(FILE_HEADER.size)
+        blocks = []
+        while True:
+            offset = f.tell()
+            header = f.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                break
+            magic, body_size, count, id_count, _, t_first, t_last = BLOCK_HEADER.unpack(header)
+            if magic != BLOCK_MAGIC:
+                break
+            table = f.read(id_count * SEGMENT_ENTRY.size)
+            if len(table) < id_count * SEGMENT_ENTRY.size:
+                break
+            end = offset + BLOCK_HEADER.size + body_size
+            if end > size:
+                break # 쓰다 만 마지막 블록
+            f.seek(end)
+            ids = {can_id: n for can_id, n, _, _ in SEGMENT_ENTRY.iter_unpack(table)}
+            blocks.append(BlockInfo(offset, count, t_first, t_last, ids))
+        return blocks
+
+    def read_block(self, block, ids=None):
+        """
+        블록의 프레임을 원래 순서의 (timestamp, can_id, dlc, flags, data) 배열로 읽습니다.
+        ids(CAN ID 집합)를 주면 그 ID의 구간만 읽습니다.
+        """
+        f = self.file
+        f.seek(block.offset)
+        magic, body_size, count, id_count, codec, _, _ = BLOCK_HEADER.unpack(f.read(BLOCK_HEADER.size))
+        if magic != BLOCK_MAGIC:
+            raise ValueError(f"{self.path}: {block.offset} 위치에 블록이 없습니다.")
+        table_size = id_count * SEGMENT_ENTRY.size
+        entries = list(SEGMENT_ENTRY.iter_unpack(f.read(table_size)))
+        if ids is None:
+            # 블록 전체는 한 번에 읽어 구간별로 잘라 씀
+            segments = memoryview(f.read(body_size - table_size))
+            parts = [(can_id, n, _unpack_segment(codec, segments[position:position + size], n))
+                     for can_id, n, position, size in entries]
+            return _assemble(parts, count)
+        segments_start = block.offset + BLOCK_HEADER.size + table_size
+        parts = []
+        for can_id, n, position, size in entries:
+            if can_id in ids:
+                f.seek(segments_start + position)
+                parts.append((can_id, n, _unpack_segment(codec, f.read(size), n)))
+        return _assemble(parts, None)
+
+    def iter_blocks(self, ids=None, start=None, stop=None):
+        """
+        [start, stop] 시간 범위와 겹치는 블록을 차례로 읽어 배열 묶음으로 돌려줍니다.
+        ids를 주면 그 ID가 있는 블록의 해당 구간만 읽습니다. 범위 밖 프레임은 잘라냅니다.
+        """
+        for block in self.blocks:
+            if start is not None and block.t_last < start:
+                continue
+            if stop is not None and block.t_first > stop:
+                continue
+            if ids is not None and not any(can_id in block.ids for can_id in ids):
+                continue
+            fields = self.read_block(block, ids)
+            if start is not None or stop is not None:
+                keep = np.ones(len(fields[0]), bool)
+                if start is not None:
+                    keep &= fields[0] >= start
+                if stop is not None:
+                    keep &= fields[0] <= stop
+                fields = tuple(column[keep] for column in fields)
+            yield fields
+
+    def messages(self, ids=None, start=None, stop=None):
+        """프레임을 can.Message로 하나씩 돌려줍니다 (재생용)."""
+        for timestamp, can_id, dlc, flags, data in self.iter_blocks(ids, start, stop):
+            for t, i, n, fl, d in zip(timestamp.tolist(), can_id.tolist(), dlc.tolist(), flags.tolist(),
+                                       data.tolist()):
+                yield can.Message(timestamp=t, arbitration_id=i, dlc=n, data=d.to_bytes(8, "little")[:n],
+                                  is_extended_id=bool(fl & FLAG_EXTENDED), is_remote_frame=bool(fl & FLAG_REMOTE),
+                                  is_error_frame=bool(fl & FLAG_ERROR), is_rx=not fl & FLAG_TX)
+
+
+def _assemble(parts, count):
+    """ID별 구간을 seq 순서로 합칩니다. count가 None이면 일부 ID만 읽은 경우입니다."""
+    if not parts:
+        return (np.empty(0, np.float64), np.empty(0, np.uint32), np.empty(0, np.uint8),
+                np.empty(0, np.uint8), np.empty(0, np.uint64))
+    seq = np.concatenate([fields["seq"] for _, _, fields in parts])
+    columns = (np.concatenate([fields["timestamp"] for _, _, fields in parts]),
+               np.concatenate([np.full(n, can_id, np.uint32) for can_id, n, _ in parts]),
+               np.concatenate([fields["dlc"] for _, _, fields in parts]),
+               np.concatenate([fields["flags"] for _, _, fields in parts]),
+               np.concatenate([fields["data"] for _, _, fields in parts]))
+    if count is not None:
+        # 블록 전체를 읽으면 seq가 0..count-1의 순열이므로 정렬 없이 제자리에 넣음
+        out = []
+        for column in columns:
+            result = np.empty(count, column.dtype)
+            result[seq] = column
+            out.append(result)
+        return tuple(out)
+    order = np.argsort(seq, kind="stable")
+    return tuple(column[order] for column in columns)
@@ -8,62 +8,9 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import QTimer
 import json
 
-CONFIG_FILE = "can_config.json"
+from can_codec import CANParser
 
-class CANParser:
-    def __init__(self):
-        pass
-
-    def parse(self, can_id, data):
-        parsed = {}
-        if can_id == 0x303:
-            vehicle_Gear = data[0] & 0x03
-            parsed['Vehicle Gear'] = ["P Gear", "D Gear", "N Gear", "R Gear"][vehicle_Gear]
-            Drive_State_Mode = data[1] & 0x03
-            parsed['Drive_State_Mode'] = ["Remote Control Mode", "Represents the AD Mode",
-                                          "Indicates parallel Mode", "Indicates semi-autonomous"][Drive_State_Mode]
-            VCU_Speed_Req = int.from_bytes(data[2:4], byteorder='little') * 0.1 - 80
-            parsed['Vehicle Speed Request (km/h)'] = f"{VCU_Speed_Req:.1f}"
-
-        elif can_id == 0x314:
-            directionalAngle = int.from_bytes(data[1:3], byteorder='little')
-            parsed['Direction Angle (deg)'] = f"{directionalAngle}"
-            parsed['eps Control'] = "Works" if data[0] & 0x01 else "Stops"
-
-        elif can_id == 0x304:
-            speed = int.from_bytes(data[0:2], byteorder='little') * 0.1 - 80
-            parsed['Vehicle Speed (km/h)'] = f"{speed:.1f}"
-            parsed['Vehicle Wheel End Angle (deg)'] = f"{int.from_bytes(data[4:6], 'little') * 0.1 - 35:.1f}"
-            parsed['Vehicle Break Pressure (Mps)'] = f"{int.from_bytes(data[2:4], 'little') * 0.01:.2f}"
-
-        elif can_id == 0x301:
-            parsed['Brake Light'] = "ON" if data[5] & 0x01 else "OFF"
-            parsed['Head Light'] = "ON" if data[1] & 0x80 else "OFF"
-            parsed['Emergency Button'] = "Pressed" if data[0] & 0x01 else "Not Pressed"
-            parsed['Back Touch Switch State'] = "trigger" if data[1] & 0x20 else "Not trigger"
-            parsed['Front Touch Switch State'] = "trigger" if data[1] & 0x10 else "Not trigger"
-
-        elif can_id == 0x18F:
-            parsed['EPS_Current_Angle (deg)'] = str(int.from_bytes(data[1:3], 'little', signed=True))
-            parsed['EPS_ECU_Temperature (℃)'] = str(int.from_bytes(data[6:7], 'little', signed=True))
-
-        elif can_id == 0x060:
-            parsed['BUS Voltage (V)'] = f"{int.from_bytes(data[0:2], 'little') * 0.1:.2f}"
-            parsed['BUS Current (A)'] = f"{int.from_bytes(data[2:4], 'little') * 0.1 - 1000:.2f}"
-
-        elif can_id == 0x160:
-            mode = (data[0] & 0x06) >> 1
-            parsed['Drive Mode'] = ["Torque", "Speed", "Torque ring", "Speed loop"][mode]
-            parsed['MCU_Brake_Request'] = "Hold brake" if data[0] & 0x08 else "Release"
-            parsed['MCU Speed Request (RPM)'] = str(int.from_bytes(data[3:6], 'little') - 7000)
-            parsed['MCU Torque Request (Nm)'] = f"{int.from_bytes(data[1:3], 'little') * 0.1 - 1000:.1f}"
-
-        elif can_id == 0x0A0:
-            parsed['BMS Battery SOH (%)'] = str(data[7])
-            parsed['BMS Battery SOC (%)'] = f"{data[4] * 0.4:.2f}"
-            parsed['BMS Battery Voltage (V)'] = f"{int.from_bytes(data[2:4], 'little') * 0.1:.2f}"
-
-        return parsed
+CONFIG_FILE = "can_config.json"
 
 class MainWindow(QMainWindow):
     def __init__(self):
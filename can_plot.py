@@ -0,0 +1,447 @@
+"""
+긴 기록 파일(.pclog)의 신호 그래프.
+
+기록의 신호마다 샘플 LOD_FACTORS(10, 100, 1000)개씩 묶은 구간의 최소/최대/평균 피라미드를 만들어
+기록 옆의 .lod.npz 파일에 저장합니다. 그래프는 화면 폭(픽셀)의 2배 이하가 되는 가장 촘촘한 단계만
+읽어 구간마다 최소~최대 세로선과 평균선을 그리므로, 4시간 50Hz 신호(72만 점)도 확대 정도와
+관계없이 수천 점만 그립니다. 10개 구간 단계로도 점이 남을 만큼 확대하면 그 시간 범위의 원래 샘플을
+기록 파일 색인으로 읽어 그립니다.
+
+피라미드는 블록 단위로 디코딩하며 단계마다 묶이지 않은 나머지만 다음 블록으로 넘겨 만듭니다.
+기록이 바뀌면(크기/수정 시각) 다시 만듭니다. 휠로 커서 위치를 중심으로 확대/축소, 끌어서 이동,
+더블클릭으로 전체 보기입니다.
+
+사용법: python can_plot.py 기록.pclog [--build]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PyQt6.QtCore import Qt, QThread, QPointF, QLineF, QRectF
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt6.QtWidgets import QApplication, QWidget, QHBoxLayout, QVBoxLayout, QListWidget, QLabel
+
+from can_codec import CANParser
+from can_export import SignalColumns
+from can_log import RecordingReader, RECORDING_EXTENSION
+from can_trace import FLAG_EXTENDED, FLAG_REMOTE, FLAG_ERROR
+
+LOD_FACTORS = (10, 100, 1000) # 단계별로 한 구간에 묶는 원래 샘플 수
+LOD_EXTENSION = ".lod.npz"
+LEVEL_FIELDS = ("t_first", "t_last", "minimum", "maximum", "mean", "count")
+POINTS_PER_PIXEL = 2 # 화면 폭 대비 최대로 그리는 구간/샘플 수
+ZOOM_STEP = 1.25
+
+
+def pyramid_path(path):
+    """기록 파일의 피라미드 파일 경로."""
+    if path.lower().endswith(RECORDING_EXTENSION):
+        path = path[:-len(RECORDING_EXTENSION)]
+    return path + LOD_EXTENSION
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return np.array([stat.st_size, stat.st_mtime_ns], np.int64)
+
+
+def _reduce(level, factor, final):
+    """
+    구간 배열 묶음(LEVEL_FIELDS 순서)을 factor개씩 합쳐 (합친 구간, 남은 구간)을 반환합니다.
+    final이면 남은 구간도 마지막 구간 하나로 합칩니다.
+    """
+    t_first, t_last, minimum, maximum, mean, count = level
+    n = len(t_first)
+    full = n - n % factor
+    k = full // factor
+    total = count[:full].reshape(k, factor).sum(1)
+    merged = [t_first[:full:factor], t_last[factor - 1:full:factor],
+              minimum[:full].reshape(k, factor).min(1), maximum[:full].reshape(k, factor).max(1),
+              (mean[:full] * count[:full]).reshape(k, factor).sum(1) / total, total]
+    rest = tuple(column[full:] for column in level)
+    if final and full < n:
+        weight = count[full:]
+        tail = [t_first[full:full + 1], t_last[-1:], minimum[full:].min(keepdims=True),
+                maximum[full:].max(keepdims=True), (mean[full:] * weight).sum(keepdims=True) / weight.sum(),
+                weight.sum(keepdims=True)]
+        merged = [np.concatenate((a, b)) for a, b in zip(merged, tail)]
+        rest = tuple(column[:0] for column in level)
+    return tuple(merged), rest
+
+
+class _SignalLevels:
+    """신호 하나의 피라미드를 만드는 중인 상태. 단계마다 완성된 구간 목록과 남은 구간을 가집니다."""
+    def __init__(self):
+        self.done = [[] for _ in LOD_FACTORS]
+        self.pending = [None] * len(LOD_FACTORS) # 단계별 아직 factor개가 안 된 아래 단계 구간
+
+    def add(self, t, values, final=False):
+        level = (t, t, values, values, values, np.ones(len(t), np.uint32))
+        below = 1
+        for k, factor in enumerate(LOD_FACTORS):
+            if self.pending[k] is not None:
+                level = tuple(np.concatenate((a, b)) for a, b in zip(self.pending[k], level))
+            level, self.pending[k] = _reduce(level, factor // below, final)
+            self.done[k].append(level)
+            below = factor
+
+    def levels(self):
+        return [tuple(np.concatenate(column) for column in zip(*done)) for done in self.done]
+
+
+def build_pyramid(path, messages, progress=None):
+    """
+    기록 파일의 신호별 피라미드를 만들어 pyramid_path(path)에 저장하고 그 경로를 반환합니다.
+    progress(읽은 프레임 수)는 블록마다 호출됩니다.
+    """
+    columns = SignalColumns(messages)
+    builders = {name: _SignalLevels() for name, _, _ in columns.signals}
+    frames = 0
+    with RecordingReader(path) as reader:
+        for block in reader.iter_blocks(set(columns.frame_ids.tolist())):
+            decoded = columns.decode(*block)
+            t = decoded["timestamp"]
+            for name, builder in builders.items():
+                values = decoded[name]
+                valid = ~np.isnan(values)
+                if valid.any():
+                    builder.add(t[valid], values[valid])
+            frames += len(block[0])
+            if progress is not None:
+                progress(frames)
+    arrays = {"source": _source_stamp(path), "factors": np.array(LOD_FACTORS)}
+    names = []
+    for name, builder in builders.items():
+        empty = np.empty(0)
+        builder.add(empty, empty, final=True)
+        levels = builder.levels()
+        if not len(levels[0][0]):
+            continue # 기록에 없는 신호
+        index = len(names)
+        names.append(name)
+        for k, level in enumerate(levels):
+            for field, column in zip(LEVEL_FIELDS, level):
+                arrays[f"s{index}_l{k}_{field}"] = column
+    arrays["names"] = np.array(names, dtype=str)
+    out = pyramid_path(path)
+    with open(out, "wb") as f:
+        np.savez(f, **arrays)
+    return out
+
+
+class SignalPyramid:
+    """
+    저장된 피라미드와 원래 기록. window()로 시간 범위에 맞는 단계의 구간(또는 원래 샘플)을 얻습니다.
+    """
+    def __init__(self, path, messages):
+        self.path = path
+        self.file = np.load(pyramid_path(path))
+        self.names = self.file["names"].tolist()
+        self.factors = tuple(self.file["factors"].tolist())
+        self.reader = RecordingReader(path)
+        columns = SignalColumns(messages)
+        self.signals = {name: (message, sig) for name, message, sig in columns.signals}
+        self._levels = {} # (신호 번호, 단계) -> 구간 배열 묶음
+
+    @staticmethod
+    def is_current(path):
+        """피라미드가 있고 지금 기록 파일로 만든 것인지 확인합니다."""
+        try:
+            with np.load(pyramid_path(path)) as f:
+                return (np.array_equal(f["source"], _source_stamp(path))
+                        and tuple(f["factors"].tolist()) == LOD_FACTORS)
+        except (OSError, KeyError, ValueError):
+            return False
+
+    def close(self):
+        self.file.close()
+        self.reader.close()
+
+    def level(self, name, k):
+        key = (self.names.index(name), k)
+        if key not in self._levels:
+            self._levels[key] = tuple(self.file[f"s{key[0]}_l{k}_{field}"] for field in LEVEL_FIELDS)
+        return self._levels[key]
+
+    def time_range(self, name):
+        coarsest = self.level(name, len(self.factors) - 1)
+        return float(coarsest[0][0]), float(coarsest[1][-1])
+
+    def _span(self, level, start, stop):
+        """[start, stop]와 겹치는 구간 위치 범위."""
+        i = int(np.searchsorted(level[1], start, side="left"))
+        j = int(np.searchsorted(level[0], stop, side="right"))
+        return i, max(i, j)
+
+    def window(self, name, start, stop, max_points):
+        """
+        [start, stop]를 max_points 이하로 그릴 수 있는 가장 촘촘한 단계를 고릅니다.
+        (factor, 구간 배열 묶음)을 반환하며 factor가 1이면 원래 샘플입니다.
+        """
+        first = self.level(name, 0)
+        i, j = self._span(first, start, stop)
+        if (j - i) * self.factors[0] <= max_points:
+            return 1, self._raw(name, start, stop, first, i, j)
+        for k in range(len(self.factors)):
+            level = self.level(name, k)
+            i, j = self._span(level, start, stop)
+            if j - i <= max_points or k == len(self.factors) - 1:
+                return self.factors[k], tuple(column[i:j] for column in level)
+
+    def _raw(self, name, start, stop, first, i, j):
+        """원래 샘플을 기록 파일에서 읽습니다 (양끝 구간을 포함하도록 범위를 넓혀 읽음)."""
+        empty = np.empty(0)
+        if i >= j:
+            return empty, empty, empty, empty, empty, np.empty(0, np.uint32)
+        start, stop = float(first[0][i]), float(first[1][j - 1])
+        message, sig = self.signals[name]
+        times, values = [], []
+        for timestamp, can_id, dlc, flags, data in self.reader.iter_blocks({message.frame_id}, start, stop):
+            extended = (flags & FLAG_EXTENDED) != 0
+            rows = np.flatnonzero((extended == message.is_extended) & (dlc >= max(message.min_length, 1))
+                                  & ((flags & (FLAG_ERROR | FLAG_REMOTE)) == 0))
+            mux = message.multiplexer
+            if sig.multiplexer_id is not None and mux is not None:
+                rows = rows[mux.raw_array(data[rows]) == sig.multiplexer_id]
+            times.append(timestamp[rows])
+            values.append(sig.physical_array(data[rows]))
+        t = np.concatenate(times) if times else empty
+        v = np.concatenate(values) if values else empty
+        return t, t, v, v, v, np.ones(len(t), np.uint32)
+
+
+class PyramidBuildThread(QThread):
+    """뷰어에서 피라미드를 만드는 스레드. 끝나면 error를 확인합니다."""
+    def __init__(self, path, messages, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.messages = messages
+        self.frames = 0
+        self.error = None
+
+    def _progress(self, frames):
+        self.frames = frames
+
+    def run(self):
+        try:
+            build_pyramid(self.path, self.messages, self._progress)
+        except Exception as e:
+            self.error = e
+
+
+class LodPlot(QWidget):
+    """피라미드에서 현재 확대 범위에 맞는 단계를 골라 그리는 그래프."""
+    MARGIN = 40
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pyramid = None
+        self.name = None
+        self.full = (0.0, 1.0) # 신호 전체 시간 범위
+        self.view = (0.0, 1.0) # 보이는 시간 범위
+        self.message = "기록을 여는 중..."
+        self._drag = None # 끌기 시작한 (x, view)
+        self._cache = None # ((이름, 범위, 최대 점 수), (factor, 구간), 그린 시간(ms))
+        self.setMinimumSize(500, 300)
+
+    def set_signal(self, pyramid, name):
+        self.pyramid = pyramid
+        self.name = name
+        self.full = pyramid.time_range(name)
+        self.view = self.full
+        self._cache = None
+        self.update()
+
+    def set_message(self, text):
+        self.message = text
+        self.update()
+
+    def _plot_rect(self):
+        m = self.MARGIN
+        return QRectF(m + 20, m / 2, self.width() - m * 1.5 - 20, self.height() - m * 1.5)
+
+    def _time_at(self, x):
+        rect = self._plot_rect()
+        start, stop = self.view
+        return start + (x - rect.left()) / max(rect.width(), 1) * (stop - start)
+
+    def _window(self, width):
+        key = (self.name, self.view, int(width) * POINTS_PER_PIXEL)
+        if self._cache is None or self._cache[0] != key:
+            started = time.perf_counter()
+            data = self.pyramid.window(self.name, self.view[0], self.view[1], key[2])
+            self._cache = (key, data, (time.perf_counter() - started) * 1000)
+        return self._cache[1], self._cache[2]
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setPen(self.palette().text().color())
+        if self.pyramid is None or self.name is None:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self.message)
+            painter.end()
+            return
+        rect = self._plot_rect()
+        (factor, level), fetch_ms = self._window(rect.width())
+        t_first, t_last, minimum, maximum, mean, _ = level
+        painter.drawRect(rect)
+        start, stop = self.view
+        if len(t_first):
+            low, high = float(minimum.min()), float(maximum.max())
+            if high <= low:
+                low, high = low - 1, high + 1
+            sx = rect.width() / max(stop - start, 1e-9)
+            sy = rect.height() / (high - low)
+            x = rect.left() + ((t_first + t_last) / 2 - start) * sx
+            painter.setClipRect(rect)
+            if factor > 1:
+                painter.setPen(QPen(QColor(150, 180, 220)))
+                y_min = rect.bottom() - (minimum - low) * sy
+                y_max = rect.bottom() - (maximum - low) * sy
+                painter.drawLines([QLineF(a, b, a, c) for a, b, c in zip(x.tolist(), y_min.tolist(),
+                                                                          y_max.tolist())])
+            painter.setPen(QPen(QColor(30, 90, 180), 1.5))
+            y_mean = rect.bottom() - (mean - low) * sy
+            painter.drawPolyline(QPolygonF([QPointF(a, b) for a, b in zip(x.tolist(), y_mean.tolist())]))
+            painter.setClipping(False)
+            painter.setPen(self.palette().text().color())
+            left = QRectF(0, rect.top() - 8, rect.left() - 4, 16)
+            painter.drawText(left, Qt.AlignmentFlag.AlignRight, f"{high:g}")
+            left.moveTop(rect.bottom() - 8)
+            painter.drawText(left, Qt.AlignmentFlag.AlignRight, f"{low:g}")
+        bottom = QRectF(rect.left(), rect.bottom() + 2, rect.width(), 16)
+        base = self.full[0]
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignLeft, f"{start - base:.3f} s")
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignRight, f"{stop - base:.3f} s")
+        detail = "원래 샘플" if factor == 1 else f"{factor}x 최소/최대/평균"
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignCenter,
+                         f"{self.name}  |  {detail}, {len(t_first)}점, {fetch_ms:.1f} ms")
+        painter.end()
+
+    def wheelEvent(self, event):
+        if self.pyramid is None:
+            return
+        center = self._time_at(event.position().x())
+        scale = 1 / ZOOM_STEP if event.angleDelta().y() > 0 else ZOOM_STEP
+        start, stop = self.view
+        span = min((stop - start) * scale, self.full[1] - self.full[0])
+        span = max(span, 1e-3)
+        ratio = (center - start) / max(stop - start, 1e-9)
+        self._set_view(center - ratio * span, span)
+
+    def _set_view(self, start, span):
+        """범위를 기록 안으로 맞추어 보이는 범위를 바꿉니다."""
+        start = min(max(start, self.full[0]), max(self.full[1] - span, self.full[0]))
+        self.view = (start, start + span)
+        self.update()
+
+    def mousePressEvent(self, event):
+        self._drag = (event.position().x(), self.view)
+
+    def mouseMoveEvent(self, event):
+        if self._drag is None or self.pyramid is None:
+            return
+        x, (start, stop) = self._drag
+        shift = (x - event.position().x()) / max(self._plot_rect().width(), 1) * (stop - start)
+        self._set_view(start + shift, stop - start)
+
+    def mouseReleaseEvent(self, event):
+        self._drag = None
+
+    def mouseDoubleClickEvent(self, event):
+        if self.pyramid is not None:
+            self.view = self.full
+            self.update()
+
+
+class PlotViewer(QWidget):
+    """기록 파일의 신호 목록과 그래프. 피라미드가 없거나 오래되었으면 먼저 백그라운드에서 만듭니다."""
+    def __init__(self, path, messages, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.messages = messages
+        self.pyramid = None
+        self.build_thread = None
+        self.build_started = 0.0
+        self.setWindowTitle(f"Plot - {os.path.basename(path)}")
+        self.resize(1000, 500)
+
+        layout = QHBoxLayout(self)
+        self.signal_list = QListWidget()
+        self.signal_list.setMaximumWidth(260)
+        layout.addWidget(self.signal_list)
+        right = QVBoxLayout()
+        self.plot = LodPlot()
+        right.addWidget(self.plot)
+        self.status = QLabel("휠: 확대/축소, 끌기: 이동, 더블클릭: 전체")
+        right.addWidget(self.status)
+        layout.addLayout(right, 1)
+        self.signal_list.currentTextChanged.connect(self._on_signal_selected)
+
+        if SignalPyramid.is_current(path):
+            self._open()
+        else:
+            self.plot.set_message("신호 피라미드를 만드는 중...")
+            self.build_thread = PyramidBuildThread(path, messages, self)
+            self.build_thread.finished.connect(self._on_built)
+            self.build_started = time.perf_counter()
+            self.build_thread.start()
+
+    def _on_built(self):
+        thread = self.build_thread
+        if thread.error is not None:
+            self.plot.set_message(f"피라미드를 만들 수 없습니다:\n{thread.error}")
+            return
+        self.status.setText(f"피라미드 생성: {thread.frames} frames, "
+                            f"{time.perf_counter() - self.build_started:.2f}초")
+        self._open()
+
+    def _open(self):
+        try:
+            self.pyramid = SignalPyramid(self.path, self.messages)
+        except (OSError, ValueError, KeyError) as e:
+            self.plot.set_message(f"기록을 열 수 없습니다:\n{e}")
+            return
+        self.signal_list.addItems(self.pyramid.names)
+        if self.pyramid.names:
+            self.signal_list.setCurrentRow(0)
+        else:
+            self.plot.set_message("기록에 DBC 신호가 없습니다.")
+
+    def _on_signal_selected(self, name):
+        if self.pyramid is not None and name:
+            self.plot.set_signal(self.pyramid, name)
+
+    def closeEvent(self, event):
+        if self.build_thread is not None:
+            self.build_thread.wait()
+        if self.pyramid is not None:
+            self.pyramid.close()
+        super().closeEvent(event)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="기록 파일 신호 그래프 (최소/최대 피라미드)")
+    arg_parser.add_argument("recording", help="기록 파일 (.pclog)")
+    arg_parser.add_argument("--build", action="store_true", help="피라미드만 만들고 종료")
+    args = arg_parser.parse_args()
+
+    parser = CANParser()
+    if args.build:
+        start = time.perf_counter()
+        try:
+            out = build_pyramid(args.recording, parser.messages)
+        except (OSError, ValueError) as e:
+            print(f"피라미드 생성 실패: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{out} ({time.perf_counter() - start:.2f}초)")
+        return
+    app = QApplication(sys.argv)
+    viewer = PlotViewer(args.recording, parser.messages)
+    viewer.show()
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+기록된 로그의 신호 조건 조회.
+
+"BMS_SOC < 20 and Vehicle_Speed > 5", 'Emergency_Button == "Pressed" and Vehicle_Gear == "D Gear"'
+처럼 신호 조건을 can_filter와 같은 문법(and/or/not, 괄호, VAL_ 문자열, 표시 이름)으로 적으면,
+조건이 참이었던 시간 구간과 그 횟수를 돌려줍니다.
+
+주기가 다른 메시지의 신호를 함께 비교할 수 있도록, 조건에 쓰인 메시지의 프레임이 올 때마다
+각 신호의 마지막 수신 값(forward fill)으로 식을 다시 평가합니다. 모든 신호가 한 번 이상 수신되기
+전과, max_age를 주었을 때 마지막 값이 그보다 오래된 동안은 거짓으로 봅니다. 구간은 식이 참이
+된 프레임 시각부터 거짓이 된 프레임 시각까지이며, 로그 끝까지 참이면 마지막 프레임 시각에서 끝납니다.
+
+블록(CHUNK_SIZE 프레임) 단위로 NumPy 벡터 연산으로 평가하고 신호 값/구간 상태만 다음 블록으로
+넘기므로 로그 크기와 관계없이 메모리 사용량이 일정합니다. 기록 파일(.pclog)은 색인으로 조건에 쓰인
+ID의 구간만 읽습니다.
+
+사용법: python can_query.py 로그 '조건식' [--start 초] [--stop 초] [--max-age 초] [--min-duration 초]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from can_codec import CANParser
+from can_export import log_blocks
+from can_filter import FilterParser, SignalFilter, COMPARISONS
+from can_log import RecordingReader, RECORDING_EXTENSION
+from can_trace import FLAG_EXTENDED, FLAG_REMOTE, FLAG_ERROR
+
+
+class _Block:
+    """조회 중인 프레임 블록. 신호별 raw 값은 한 번만 꺼내 조건끼리 공유합니다."""
+    def __init__(self, timestamp, can_id, dlc, flags, data):
+        self.timestamp = timestamp
+        self.can_id = can_id
+        self.dlc = dlc
+        self.flags = flags
+        self.data = data
+        self._decoded = {}
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def decoded(self, message, sig):
+        """이 신호를 디코딩할 수 있는 행 위치와 raw 값 배열."""
+        key = (message.frame_id, sig.name)
+        if key not in self._decoded:
+            extended = (self.flags & FLAG_EXTENDED) != 0
+            rows = np.flatnonzero((self.can_id == message.frame_id) & (extended == message.is_extended)
+                                  & (self.dlc >= max(message.min_length, 1))
+                                  & ((self.flags & (FLAG_ERROR | FLAG_REMOTE)) == 0))
+            mux = message.multiplexer
+            if sig.multiplexer_id is not None and mux is not None:
+                rows = rows[mux.raw_array(self.data[rows]) == sig.multiplexer_id]
+            self._decoded[key] = rows, sig.raw_array(self.data[rows])
+        return self._decoded[key]
+
+
+class _Condition(SignalFilter):
+    """
+    신호 비교 조건 하나. 블록마다 update()로 각 프레임 시점의 참/거짓(current)과 값의 유효 여부(known)를
+    계산하며, 마지막 수신 결과와 시각은 다음 블록으로 넘깁니다.
+    """
+    def __init__(self, targets, op, value):
+        super().__init__(targets, op, value)
+        self.targets = [(message, sig) for message, sig in targets if message.payload_length <= 8]
+        if not self.targets:
+            raise ValueError(f"8바이트를 넘는 메시지의 신호는 조회할 수 없습니다: {targets[0][1].name}")
+        self.frame_ids = {message.frame_id for message, _ in self.targets}
+        self.max_age = None
+        self.reset()
+
+    def reset(self):
+        self.last_result = False
+        self.last_time = np.nan # 마지막 수신 시각 (NaN이면 아직 수신 없음)
+        self.current = self.known = None
+
+    def update(self, block):
+        n = len(block)
+        source = np.full(n, -1, np.int64) # 그 행에서 값을 새로 받았으면 행 번호
+        hit = np.zeros(n, bool)
+        for message, sig in self.targets:
+            rows, raw = block.decoded(message, sig)
+            if self.by_raw:
+                hit[rows] = self.compare(raw, self.raw_values[sig])
+            else:
+                hit[rows] = self.compare(raw * float(sig.scale) + float(sig.offset), self.value)
+            source[rows] = rows
+        np.maximum.accumulate(source, out=source) # 각 행 시점의 마지막 수신 행
+        received = source >= 0
+        index = np.maximum(source, 0)
+        self.current = np.where(received, hit[index], self.last_result)
+        sample_time = np.where(received, block.timestamp[index], self.last_time)
+        self.known = ~np.isnan(sample_time)
+        if self.max_age is not None:
+            self.known &= (block.timestamp - sample_time) <= self.max_age
+        if n:
+            self.last_result = bool(self.current[-1])
+            self.last_time = float(sample_time[-1])
+
+    def evaluate(self):
+        return self.current
+
+
+class _All:
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def evaluate(self):
+        result = self.nodes[0].evaluate().copy()
+        for node in self.nodes[1:]:
+            result &= node.evaluate()
+        return result
+
+
+class _Any:
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def evaluate(self):
+        result = self.nodes[0].evaluate().copy()
+        for node in self.nodes[1:]:
+            result |= node.evaluate()
+        return result
+
+
+class _Negate:
+    def __init__(self, node):
+        self.node = node
+
+    def evaluate(self):
+        return ~self.node.evaluate()
+
+
+class _QueryParser(FilterParser):
+    """can_filter 문법에서 신호 비교만 허용하는 조회 식 파서."""
+    or_node = _Any
+    and_node = _All
+    not_node = _Negate
+    signal_node = _Condition
+
+    def parse_atom(self):
+        following = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else (None, None)
+        if following[0] != "op" or following[1] not in COMPARISONS:
+            raise ValueError(f"조회 식에는 신호 비교만 쓸 수 있습니다: '{self.peek()[1]}'")
+        return super().parse_atom()
+
+
+class QueryResult:
+    """조건이 참이었던 구간들. starts/ends는 시각(초) 배열이며 frames는 평가한 프레임 수입니다."""
+    def __init__(self, text, starts, ends, frames, first, last, elapsed):
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.frames = frames
+        self.first = first # 평가한 첫/마지막 프레임 시각 (프레임이 없으면 None)
+        self.last = last
+        self.elapsed = elapsed
+
+    @property
+    def count(self):
+        return len(self.starts)
+
+    @property
+    def durations(self):
+        return self.ends - self.starts
+
+    @property
+    def total_duration(self):
+        return float(self.durations.sum())
+
+    @property
+    def intervals(self):
+        return list(zip(self.starts.tolist(), self.ends.tolist()))
+
+
+class SignalQuery:
+    """
+    컴파일된 조회 식. run(blocks)는 can_export 형식의 프레임 블록들을 시간 순서대로 받아 QueryResult를
+    반환합니다. 블록에 다른 ID의 프레임이 섞여 있어도 되며, 조건에 쓰인 ID(frame_ids)만 평가합니다.
+    max_age(초)를 주면 그보다 오래 수신되지 않은 신호는 알 수 없음(거짓)으로 봅니다.
+    min_duration(초)보다 짧은 구간은 결과에서 뺍니다.
+    """
+    def __init__(self, text, messages, max_age=None, min_duration=0.0):
+        if not text or not text.strip():
+            raise ValueError("조회 식이 비어 있습니다.")
+        self.text = text.strip()
+        parser = _QueryParser(self.text, messages)
+        self.root = parser.parse()
+        self.conditions = []
+        self._collect(self.root)
+        for condition in self.conditions:
+            condition.max_age = max_age
+        self.frame_ids = set().union(*(condition.frame_ids for condition in self.conditions))
+        self.min_duration = min_duration
+
+    def _collect(self, node):
+        if isinstance(node, _Condition):
+            self.conditions.append(node)
+        elif isinstance(node, _Negate):
+            self._collect(node.node)
+        else:
+            for child in node.nodes:
+                self._collect(child)
+
+    def run(self, blocks):
+        start_time = time.perf_counter()
+        for condition in self.conditions:
+            condition.reset()
+        ids = np.array(sorted(self.frame_ids), np.uint32)
+        starts, ends = [], []
+        open_start = None # 이전 블록 끝에서 참이었으면 그 구간의 시작 시각
+        frames = 0
+        first = last = None
+        for fields in blocks:
+            keep = np.isin(fields[1], ids)
+            if not keep.all():
+                fields = tuple(column[keep] for column in fields)
+            block = _Block(*fields)
+            n = len(block)
+            if n == 0:
+                continue
+            for condition in self.conditions:
+                condition.update(block)
+            active = self.root.evaluate()
+            for condition in self.conditions:
+                active &= condition.known
+            t = block.timestamp
+            # 이전 블록의 마지막 상태와 이어서 참/거짓이 바뀌는 행을 찾음
+            previous = np.empty(n, bool)
+            previous[0] = open_start is not None
+            previous[1:] = active[:-1]
+            rises = t[active & ~previous]
+            falls = t[~active & previous]
+            if open_start is not None:
+                rises = np.concatenate(([open_start], rises))
+            if active[-1]:
+                open_start = float(rises[-1])
+                rises = rises[:-1]
+            else:
+                open_start = None
+            starts.append(rises)
+            ends.append(falls)
+            frames += n
+            first = float(t[0]) if first is None else first
+            last = float(t[-1])
+        if open_start is not None:
+            starts.append(np.array([open_start]))
+            ends.append(np.array([last]))
+        starts = np.concatenate(starts) if starts else np.empty(0)
+        ends = np.concatenate(ends) if ends else np.empty(0)
+        if self.min_duration > 0:
+            keep = (ends - starts) >= self.min_duration
+            starts, ends = starts[keep], ends[keep]
+        return QueryResult(self.text, starts, ends, frames, first, last, time.perf_counter() - start_time)
+
+
+def query_blocks(path, ids=None, start=None, stop=None):
+    """
+    로그 파일에서 조회에 쓸 프레임 블록들을 읽습니다. 기록 파일은 색인으로 ids의 구간과
+    [start, stop] 범위의 블록만 읽고, 다른 로그는 전부 읽어 범위 밖 프레임을 버립니다.
+    """
+    if path.lower().endswith(RECORDING_EXTENSION):
+        with RecordingReader(path) as reader:
+            yield from reader.iter_blocks(ids, start, stop)
+        return
+    for fields in log_blocks(path):
+        if start is not None or stop is not None:
+            keep = np.ones(len(fields[0]), bool)
+            if start is not None:
+                keep &= fields[0] >= start
+            if stop is not None:
+                keep &= fields[0] <= stop
+            fields = tuple(column[keep] for column in fields)
+        yield fields
+
+
+def query_log(path, text, messages, start=None, stop=None, max_age=None, min_duration=0.0):
+    """로그 파일에 조회 식을 적용하여 QueryResult를 반환합니다. 식이 잘못되면 ValueError."""
+    query = SignalQuery(text, messages, max_age, min_duration)
+    return query.run(query_blocks(path, query.frame_ids, start, stop))
+
+
+def _format_time(t):
+    return datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="CAN 로그에서 신호 조건이 참인 구간 조회")
+    arg_parser.add_argument("log", help="입력 로그 (.pclog/.asc/.blf/.log/.csv/.trc)")
+    arg_parser.add_argument("query", help='조회 식 (예: "BMS_SOC < 20 and Vehicle_Speed > 5")')
+    arg_parser.add_argument("--start", type=float, help="조회 시작 시각 (epoch 초)")
+    arg_parser.add_argument("--stop", type=float, help="조회 끝 시각 (epoch 초)")
+    arg_parser.add_argument("--max-age", type=float, help="이보다 오래 수신되지 않은 신호는 거짓으로 봄 (초)")
+    arg_parser.add_argument("--min-duration", type=float, default=0.0, help="이보다 짧은 구간은 제외 (초)")
+    arg_parser.add_argument("--limit", type=int, default=50, help="출력할 최대 구간 수 (0이면 모두)")
+    args = arg_parser.parse_args()
+
+    parser = CANParser()
+    try:
+        result = query_log(args.log, args.query, parser.messages, args.start, args.stop, args.max_age,
+                           args.min_duration)
+    except (OSError, ValueError) as e:
+        print(f"조회 실패: {e}", file=sys.stderr)
+        sys.exit(1)
+    shown = result.intervals if args.limit <= 0 else result.intervals[:args.limit]
+    for begin, end in shown:
+        print(f"{_format_time(begin)}  ~  {_format_time(end)}  ({end - begin:.3f}초)")
+    if len(shown) < result.count:
+        print(f"... 외 {result.count - len(shown)}개")
+    span = 0.0 if result.first is None else result.last - result.first
+    print(f"{result.count}개 구간, 합계 {result.total_duration:.3f}초 / 전체 {span:.3f}초, "
+          f"{result.frames} frames를 {result.elapsed:.2f}초에 평가")
+
+
+if __name__ == "__main__":
+    main()
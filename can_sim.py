@@ -0,0 +1,281 @@
+"""
+차량 응답 시뮬레이터 (폐루프 시험용).
+
+주행 명령(0x501~0x506)을 받아 간단한 차량 모델로 속도/조향각/배터리 상태를 계산하고,
+차량 쪽 프레임을 각자의 주기로 보냅니다. 차 없이 vcan/virtual 버스에서 GUI의 주행 경로와
+Latency 탭의 명령-응답 지연을 시험할 수 있습니다.
+
+    0x303 VCU_Drive_State    기어, 주행 모드, 속도 명령 에코
+    0x304 VCU_Vehicle_State  차속, 바퀴 조향각, 브레이크 압력
+    0x18F EPS_Status         EPS 조향각, ECU 온도
+    0x301 VCU_Light_Switch   브레이크등
+    0x060 BUS_Power          버스 전압/전류
+    0x0A0 BMS_Status         SOC, 배터리 전압, SOH
+
+프레임은 DBC 인코더(can_codec)로 만들며, 송신 주기 사이에는 bus.recv()로 명령을 기다리므로
+명령은 도착하는 즉시 반영되고 다음 송신 프레임부터 응답에 나타납니다.
+0x504 명령이 COMMAND_TIMEOUT초 동안 오지 않으면 차량은 N 기어로 바꾸고 정지합니다.
+
+사용법: python can_sim.py [--interface socketcan] [--channel vcan0] [--duration 초]
+"""
+import argparse
+import threading
+import time
+
+import can
+
+from can_codec import CANParser
+
+# 송신 주기 (초). 차량 ECU 설정에 맞추어 periods 인자로 바꿀 수 있음
+PERIODS = {
+    0x18F: 0.01,
+    0x303: 0.02,
+    0x304: 0.02,
+    0x301: 0.1,
+    0x060: 0.1,
+    0x0A0: 0.5,
+}
+COMMAND_TIMEOUT = 0.5 # 이 시간 동안 0x504가 없으면 정지 (초)
+GEAR_P, GEAR_D, GEAR_N, GEAR_R = 0, 1, 2, 3
+
+# 차량 모델 상수
+SPEED_LAG = 0.3 # 속도 1차 지연 시정수 (초)
+ACCEL_LIMIT = 6.0 # 최대 가속 (km/h/s)
+BRAKE_LIMIT = 12.0 # 최대 감속 (km/h/s)
+MAX_BRAKE_PRESSURE = 4.0 # 최대 감속일 때 브레이크 압력 (MPa)
+HOLD_BRAKE_PRESSURE = 0.5 # 정차 유지 브레이크 압력 (MPa)
+STEER_LAG = 0.1 # EPS 조향각 1차 지연 시정수 (초)
+STEER_RATE_LIMIT = 60.0 # EPS 최대 조향 속도 (deg/s)
+PACK_VOLTAGE = (44.0, 54.0) # SOC 0%/100%일 때 개방 전압 (V)
+PACK_RESISTANCE = 0.05 # 내부 저항 (ohm)
+PACK_CAPACITY_AH = 60.0
+IDLE_CURRENT = 3.0 # 정차 중 전류 (A)
+SPEED_CURRENT = 1.5 # 차속 1 km/h당 주행 전류 (A)
+ACCEL_CURRENT = 4.0 # 가속도 1 km/h/s당 전류 (A), 감속 중에는 회생 (음수)
+
+
+def _signed_speed(gear, speed):
+    """기어 방향을 반영한 차속 (D는 양수, R은 음수, 그 외 0)."""
+    if gear == GEAR_D:
+        return speed
+    if gear == GEAR_R:
+        return -speed
+    return 0.0
+
+
+def _approach(current, target, dt, lag, rate_limit):
+    """1차 지연(시정수 lag)으로 target을 따라가되 변화율은 rate_limit로 제한한 값."""
+    step = (target - current) * min(1.0, dt / lag)
+    max_step = rate_limit * dt
+    if step > max_step:
+        step = max_step
+    elif step < -max_step:
+        step = -max_step
+    return current + step
+
+
+class VehicleSimulator:
+    """
+    주행 명령에 반응하는 차량 모델과 송신 스레드.
+    start()/stop()으로 백그라운드 스레드에서 실행합니다. 버스는 호출한 쪽이 만들고 닫습니다.
+    """
+    def __init__(self, bus, parser=None, periods=None, soc=80.0):
+        self.bus = bus
+        self.parser = parser or CANParser()
+        self.periods = dict(PERIODS if periods is None else periods)
+        encoders = self.parser.encoders
+        self._encoders = {frame_id: encoders[frame_id] for frame_id in self.periods}
+        self._msgs = {
+            frame_id: can.Message(arbitration_id=frame_id, data=bytearray(8), is_extended_id=False)
+            for frame_id in self.periods
+        }
+        # 명령 상태
+        self.gear_req = GEAR_N
+        self.speed_req = 0.0 # 속도 명령 크기 (km/h)
+        self.angle_req = 0.0 # 조향각 명령 (deg)
+        self.indicator = 0
+        self.command_time = None # 마지막 0x504 수신 시각 (perf_counter)
+        self.commanded = False # 주행 명령이 COMMAND_TIMEOUT 안에 들어오는 중인지 여부
+        # 차량 상태
+        self.gear = GEAR_N
+        self.speed = 0.0 # 차속 (km/h, 후진은 음수)
+        self.angle = 0.0 # EPS 조향각 (deg)
+        self.brake_pressure = HOLD_BRAKE_PRESSURE
+        self.current = IDLE_CURRENT
+        self.soc = soc
+        self.voltage = self._open_voltage() - PACK_RESISTANCE * self.current
+        self._updated = None # 마지막 모델 갱신 시각
+        self._thread = None
+        self._stop = threading.Event()
+        # 통계
+        self.received = 0 # 처리한 주행 명령 프레임
+        self.sent = 0
+        self.errors = 0 # 송신 실패
+        self.max_lateness = 0.0 # 송신 예정 시각보다 늦은 최대 시간 (초)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="VehicleSimulator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats_text(self):
+        return (f"speed {self.speed:6.1f} km/h, angle {self.angle:6.1f} deg, gear {'PDNR'[self.gear]}, "
+                f"SOC {self.soc:5.1f}%, rx {self.received}, tx {self.sent}, errors {self.errors}, "
+                f"late max {self.max_lateness * 1000:.2f} ms")
+
+    def handle(self, msg, now):
+        """주행 명령 프레임 하나를 명령 상태에 반영합니다. 다른 ID는 무시합니다."""
+        can_id = msg.arbitration_id
+        if can_id == 0x504:
+            values = self.parser.decode_values(can_id, msg.data)
+            if not values:
+                return
+            self.gear_req = int(values["Gear_Req"])
+            self.speed_req = values["Speed_Req"]
+            self.command_time = now
+        elif can_id == 0x502:
+            values = self.parser.decode_values(can_id, msg.data)
+            if not values:
+                return
+            self.angle_req = values["Steer_Angle_Req"]
+        elif can_id == 0x506:
+            values = self.parser.decode_values(can_id, msg.data)
+            if not values:
+                return
+            self.indicator = int(values["Indicator_Req"])
+        elif can_id not in (0x501, 0x503):
+            return
+        self.received += 1
+
+    def advance(self, now):
+        """마지막 갱신 이후 시간만큼 차량 모델을 진행합니다."""
+        if self._updated is None:
+            self._updated = now
+            return
+        dt = now - self._updated
+        if dt <= 0:
+            return
+        self._updated = now
+        self.commanded = self.command_time is not None and now - self.command_time <= COMMAND_TIMEOUT
+        if not self.commanded:
+            self.gear_req = GEAR_N
+            self.speed_req = 0.0
+        # 진행 방향을 바꾸는 기어 변경은 먼저 정차한 뒤에 반영
+        if self.gear_req != self.gear and (abs(self.speed) < 0.1 or self.gear_req in (GEAR_N, GEAR_P)):
+            self.gear = self.gear_req
+        target = _signed_speed(self.gear, self.speed_req) if self.gear == self.gear_req else 0.0
+        previous = self.speed
+        speeding_up = previous * target >= 0 and abs(target) > abs(previous)
+        if speeding_up:
+            self.speed = _approach(previous, target, dt, SPEED_LAG, ACCEL_LIMIT)
+        else:
+            self.speed = _approach(previous, target, dt, SPEED_LAG, BRAKE_LIMIT)
+        accel = (abs(self.speed) - abs(previous)) / dt # 속도 크기 변화율 (km/h/s)
+        if accel < 0:
+            self.brake_pressure = MAX_BRAKE_PRESSURE * min(1.0, -accel / BRAKE_LIMIT)
+        elif abs(self.speed) < 0.1 and target == 0:
+            self.brake_pressure = HOLD_BRAKE_PRESSURE
+        else:
+            self.brake_pressure = 0.0
+        self.angle = _approach(self.angle, self.angle_req, dt, STEER_LAG, STEER_RATE_LIMIT)
+        # 배터리: 정차 전류 + 차속 비례 전류 + 가속 전류 (감속 중에는 회생)
+        self.current = IDLE_CURRENT + SPEED_CURRENT * abs(self.speed) + ACCEL_CURRENT * accel
+        self.soc = max(0.0, self.soc - self.current * dt / 3600 / PACK_CAPACITY_AH * 100)
+        self.voltage = self._open_voltage() - PACK_RESISTANCE * self.current
+
+    def _open_voltage(self):
+        low, high = PACK_VOLTAGE
+        return low + (high - low) * self.soc / 100
+
+    def encode(self, frame_id):
+        """현재 차량 상태로 frame_id 프레임을 만들어 반환합니다."""
+        msg = self._msgs[frame_id]
+        encode = self._encoders[frame_id]
+        if frame_id == 0x303:
+            encode(msg.data, Vehicle_Gear=self.gear, Drive_State_Mode=1 if self.commanded else 0,
+                   VCU_Speed_Req=_signed_speed(self.gear_req, self.speed_req))
+        elif frame_id == 0x304:
+            encode(msg.data, Vehicle_Speed=self.speed, Vehicle_Wheel_End_Angle=self.angle,
+                   Vehicle_Brake_Pressure=self.brake_pressure)
+        elif frame_id == 0x18F:
+            encode(msg.data, EPS_Current_Angle=self.angle, EPS_ECU_Temperature=35)
+        elif frame_id == 0x301:
+            encode(msg.data, Brake_Light=1 if self.brake_pressure > 0 else 0)
+        elif frame_id == 0x060:
+            encode(msg.data, BUS_Voltage=self.voltage, BUS_Current=self.current)
+        elif frame_id == 0x0A0:
+            encode(msg.data, BMS_SOC=self.soc, BMS_Voltage=self.voltage, BMS_SOH=98)
+        else:
+            encode(msg.data)
+        return msg
+
+    def run(self):
+        """stop()이 호출될 때까지 명령을 받고 응답 프레임을 보냅니다."""
+        recv = self.bus.recv
+        start = time.perf_counter()
+        schedule = {frame_id: start for frame_id in self.periods}
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            due = min(schedule.values())
+            msg = recv(timeout=max(0.0, due - now))
+            now = time.perf_counter()
+            if msg is not None:
+                self.handle(msg, now)
+            if now < due:
+                continue
+            self.advance(now)
+            for frame_id, planned in schedule.items():
+                if planned > now:
+                    continue
+                late = now - planned
+                if late > self.max_lateness:
+                    self.max_lateness = late
+                try:
+                    self.bus.send(self.encode(frame_id))
+                    self.sent += 1
+                except can.CanError:
+                    self.errors += 1 # 버퍼가 가득 차면 다음 주기에 다시 보냄
+                period = self.periods[frame_id]
+                # 밀린 주기는 몰아서 보내지 않고 지금부터 다시 맞춤
+                schedule[frame_id] = planned + period if late < period else now + period
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="주행 명령에 반응하는 차량 시뮬레이터")
+    arg_parser.add_argument("--interface", default="socketcan", help="python-can 인터페이스 (기본 socketcan)")
+    arg_parser.add_argument("--channel", default="vcan0", help="CAN 채널 (기본 vcan0)")
+    arg_parser.add_argument("--duration", type=float, default=None, help="실행 시간 (초, 기본 Ctrl+C까지)")
+    args = arg_parser.parse_args()
+
+    bus = can.Bus(interface=args.interface, channel=args.channel)
+    simulator = VehicleSimulator(bus)
+    simulator.start()
+    print(f"{args.interface}:{args.channel} 에서 차량 시뮬레이터 실행 중 (Ctrl+C로 종료)")
+    start = time.perf_counter()
+    try:
+        while simulator.running:
+            time.sleep(1.0)
+            print(simulator.stats_text())
+            if args.duration is not None and time.perf_counter() - start >= args.duration:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+        bus.shutdown()
+
+
+if __name__ == "__main__":
+    main()
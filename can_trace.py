@@ -0,0 +1,393 @@
+"""
+CAN 프레임을 수신/송신 순서대로 보여주는 트레이스 저장소와 가상화 테이블 뷰.
+
+TraceStore는 필드별 NumPy 배열을 고정 크기 청크로 나누어 추가만 하는 컬럼형
+저장소이며, 최대 프레임 수를 넘으면 가장 오래된 청크부터 버려 메모리 사용량이
+일정하게 유지됩니다. TraceTableModel은 화면에 보이는 행의 셀만 요청 시점에
+문자열로 만들고, 새 프레임은 refresh 주기마다 한 번에 뷰에 알립니다.
+"""
+import time
+from collections import deque
+
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView, QCheckBox, QLabel, QHeaderView,
+    QAbstractItemView
+)
+
+CHUNK_SIZE = 65536 # 청크당 프레임 수
+DEFAULT_MAX_FRAMES = 10_000_000 # 프레임당 22바이트 -> 약 220MB 상한
+
+FLAG_EXTENDED = 0x01 # 29비트 확장 ID
+FLAG_TX = 0x02 # 이 프로그램이 송신한 프레임
+FLAG_REMOTE = 0x04 # RTR 프레임
+FLAG_ERROR = 0x08 # 에러 프레임
+
+
+class TraceChunk:
+    """
+    CHUNK_SIZE 프레임을 담는 필드별 NumPy 배열 묶음.
+    """
+    __slots__ = ("timestamp", "can_id", "dlc", "flags", "data")
+
+    def __init__(self):
+        self.timestamp = np.empty(CHUNK_SIZE, np.float64)
+        self.can_id = np.empty(CHUNK_SIZE, np.uint32)
+        self.dlc = np.empty(CHUNK_SIZE, np.uint8)
+        self.flags = np.empty(CHUNK_SIZE, np.uint8)
+        self.data = np.empty(CHUNK_SIZE, np.uint64) # 페이로드 8바이트를 little-endian 정수로 저장
+
+
+class TraceStore:
+    """
+    시간순 CAN 프레임의 추가 전용 컬럼형 저장소.
+    프레임 번호는 세션 시작부터의 전역 번호이며, [base, count) 구간만 보관됩니다.
+    """
+    def __init__(self, max_frames=DEFAULT_MAX_FRAMES):
+        self.max_chunks = max(1, -(-max_frames // CHUNK_SIZE))
+        self.chunks = deque()
+        self.base = 0 # 보관 중인 가장 오래된 프레임의 전역 번호
+        self.count = 0 # 지금까지 추가된 전체 프레임 수
+        self.t0 = None # 첫 프레임 시각 (상대 시간 표시 기준)
+
+    def __len__(self):
+        return self.count - self.base
+
+    def clear(self):
+        """모든 프레임을 지웁니다. 전역 번호는 이어서 증가합니다."""
+        self.chunks.clear()
+        self.base = self.count = self.count + (-self.count % CHUNK_SIZE) # 다음 청크 경계부터 시작
+        self.t0 = None
+
+    def extend(self, messages, tx=False, timestamps=None):
+        """
+        can.Message 목록을 추가합니다. tx=True이면 송신 프레임으로 표시하고, 메시지에
+        타임스탬프가 없으면 지금 시각(time.time())을 송신 시각으로 사용합니다.
+        같은 메시지 객체를 여러 번 보낸 경우처럼 시각을 따로 가지고 있으면 timestamps로 넘깁니다.
+        """
+        n = len(messages)
+        if n == 0:
+            return
+        if timestamps is not None:
+            timestamps = list(timestamps)
+        elif tx:
+            now = time.time()
+            timestamps = [m.timestamp or now for m in messages]
+        else:
+            timestamps = [m.timestamp for m in messages]
+        if self.t0 is None:
+            self.t0 = timestamps[0]
+        base_flags = FLAG_TX if tx else 0
+        can_ids = [m.arbitration_id for m in messages]
+        dlcs = [m.dlc for m in messages]
+        flags = [base_flags | (FLAG_EXTENDED if m.is_extended_id else 0)
+                 | (FLAG_REMOTE if m.is_remote_frame else 0)
+                 | (FLAG_ERROR if m.is_error_frame else 0) for m in messages]
+        data = [int.from_bytes(m.data[:8], "little") for m in messages]
+
+        pos = 0
+        while pos < n:
+            offset = self.count % CHUNK_SIZE
+            if offset == 0:
+                self.chunks.append(TraceChunk())
+                if len(self.chunks) > self.max_chunks:
+                    self.chunks.popleft()
+                    self.base += CHUNK_SIZE
+            chunk = self.chunks[-1]
+            k = min(n - pos, CHUNK_SIZE - offset)
+            end = offset + k
+            chunk.timestamp[offset:end] = timestamps[pos:pos + k]
+            chunk.can_id[offset:end] = can_ids[pos:pos + k]
+            chunk.dlc[offset:end] = dlcs[pos:pos + k]
+            chunk.flags[offset:end] = flags[pos:pos + k]
+            chunk.data[offset:end] = data[pos:pos + k]
+            self.count += k
+            pos += k
+
+    def snapshot(self):
+        """
+        현재 보관 중인 프레임을 읽기 위한 사본을 반환합니다. 청크 배열은 공유하며
+        [base, count) 구간은 추가 전용이므로 다른 스레드에서 읽어도 안전합니다.
+        """
+        snapshot = TraceStore.__new__(TraceStore)
+        snapshot.max_chunks = self.max_chunks
+        snapshot.chunks = deque(self.chunks)
+        snapshot.base = self.base
+        snapshot.count = self.count
+        snapshot.t0 = self.t0
+        return snapshot
+
+    def locate(self, index):
+        """전역 프레임 번호를 (청크, 청크 내 위치)로 변환합니다."""
+        rel = index - (self.base - self.base % CHUNK_SIZE)
+        return self.chunks[rel // CHUNK_SIZE], rel % CHUNK_SIZE
+
+    def frame(self, index):
+        """전역 프레임 번호의 (timestamp, can_id, dlc, flags, data 정수)를 반환합니다."""
+        chunk, i = self.locate(index)
+        return (float(chunk.timestamp[i]), int(chunk.can_id[i]), int(chunk.dlc[i]),
+                int(chunk.flags[i]), int(chunk.data[i]))
+
+    def iter_chunks(self, start=None, stop=None):
+        """
+        [start, stop) 구간을 청크 단위로 나누어 (전역 시작 번호, TraceChunk, 청크 내 시작, 끝)을 돌려줍니다.
+        필터/분석처럼 구간 전체를 NumPy로 처리하는 코드에서 사용합니다.
+        """
+        start = self.base if start is None else max(start, self.base)
+        stop = self.count if stop is None else min(stop, self.count)
+        while start < stop:
+            chunk, i = self.locate(start)
+            k = min(CHUNK_SIZE - i, stop - start)
+            yield start, chunk, i, i + k
+            start += k
+
+
+def format_payload(data, dlc):
+    """정수로 저장된 페이로드를 'AA BB CC' 형식 문자열로 변환합니다."""
+    return data.to_bytes(8, "little")[:dlc].hex(" ").upper()
+
+
+class TraceTableModel(QAbstractTableModel):
+    """
+    TraceStore를 보여주는 가상화 테이블 모델.
+    셀 문자열은 뷰가 그리는 행에 대해서만 data()에서 만들어집니다.
+    """
+    HEADERS = ["No", "Time (s)", "Dir", "CAN ID", "DLC", "Data", "Decoded"]
+
+    def __init__(self, store, parser=None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.parser = parser
+        self._base = store.base # 0번 행에 해당하는 전역 프레임 번호
+        self._rows = 0 # 뷰에 알린 행 수
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def frame_index(self, row):
+        """행 번호를 전역 프레임 번호로 변환합니다."""
+        return self._base + row
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        frame_index = self.frame_index(index.row())
+        if frame_index < self.store.base:
+            return None # sync 이전에 이미 버려진 행
+        timestamp, can_id, dlc, flags, data = self.store.frame(frame_index)
+        column = index.column()
+        if column == 0:
+            return str(frame_index)
+        if column == 1:
+            return f"{timestamp - self.store.t0:.6f}"
+        if column == 2:
+            return "Tx" if flags & FLAG_TX else "Rx"
+        if column == 3:
+            return f"{can_id:08X}" if flags & FLAG_EXTENDED else f"{can_id:03X}"
+        if column == 4:
+            return str(dlc)
+        if column == 5:
+            return format_payload(data, dlc)
+        if column == 6 and self.parser is not None:
+            parsed = self.parser.parse(can_id, data.to_bytes(8, "little")[:dlc])
+            return ", ".join(f"{name}={value}" for name, value in parsed.items())
+        return None
+
+    def sync(self):
+        """
+        저장소에 추가되거나 버려진 프레임을 뷰에 한 번에 반영합니다.
+        새 행이 생겼으면 True를 반환합니다.
+        """
+        store = self.store
+        if store.base < self._base or store.base - self._base > self._rows:
+            # clear() 되었거나 보여준 적 없는 구간까지 버려진 경우 전체 갱신
+            self.beginResetModel()
+            self._base = store.base
+            self._rows = len(store)
+            self.endResetModel()
+            return self._rows > 0
+        dropped = store.base - self._base
+        if dropped:
+            self.beginRemoveRows(QModelIndex(), 0, dropped - 1)
+            self._base = store.base
+            self._rows -= dropped
+            self.endRemoveRows()
+        new_rows = len(store) - self._rows
+        if new_rows > 0:
+            self.beginInsertRows(QModelIndex(), self._rows, self._rows + new_rows - 1)
+            self._rows += new_rows
+            self.endInsertRows()
+            return True
+        return False
+
+
+class FilteredTraceModel(TraceTableModel):
+    """
+    필터를 만족하는 프레임만 보여주는 모델.
+    일치하는 전역 프레임 번호를 배열에 모아 두고, sync()마다 아직 검사하지 않은
+    프레임만 청크 단위 NumPy 연산으로 검사합니다. 한 번에 검사하는 양을 SCAN_BUDGET으로
+    제한하여 큰 트레이스에 새 필터를 걸어도 UI가 멈추지 않습니다.
+    """
+    SCAN_BUDGET = 1_000_000 # sync() 한 번에 검사하는 최대 프레임 수
+
+    def __init__(self, store, frame_filter, parser=None, parent=None):
+        super().__init__(store, parser, parent)
+        self.frame_filter = frame_filter
+        self._hits = np.empty(4096, np.int64) # 일치한 전역 프레임 번호 (오름차순)
+        self._first = 0 # _hits에서 아직 보관 중인 첫 위치
+        self._end = 0 # _hits의 유효 끝 위치
+        self._scanned = store.base # 검사를 마친 전역 프레임 번호
+
+    @property
+    def scanning(self):
+        """아직 검사하지 않은 프레임이 남아 있는지 여부."""
+        return self._scanned < self.store.count
+
+    @property
+    def progress(self):
+        """보관 중인 프레임 중 검사를 마친 비율 (0~1)."""
+        total = len(self.store)
+        return 1.0 if total == 0 else (self._scanned - self.store.base) / total
+
+    def frame_index(self, row):
+        return int(self._hits[self._first + row])
+
+    def _append_hits(self, hits):
+        needed = self._end + len(hits)
+        if needed > len(self._hits):
+            # 앞쪽의 버려진 부분을 당기고, 그래도 부족하면 두 배로 늘림
+            kept = self._hits[self._first:self._end]
+            size = len(self._hits)
+            while size < len(kept) + len(hits):
+                size *= 2
+            buffer = np.empty(size, np.int64)
+            buffer[:len(kept)] = kept
+            self._hits = buffer
+            self._end -= self._first
+            self._first = 0
+        self._hits[self._end:self._end + len(hits)] = hits
+        self._end += len(hits)
+
+    def sync(self):
+        store = self.store
+        # 저장소에서 버려진 프레임에 해당하는 행 제거
+        valid = self._hits[self._first:self._end]
+        dropped = int(np.searchsorted(valid, store.base))
+        if dropped:
+            shown = min(dropped, self._rows)
+            if shown:
+                self.beginRemoveRows(QModelIndex(), 0, shown - 1)
+            self._first += dropped
+            self._rows -= shown
+            if shown:
+                self.endRemoveRows()
+        self._scanned = max(self._scanned, store.base)
+
+        # 새로 들어온 프레임만 검사
+        stop = min(store.count, self._scanned + self.SCAN_BUDGET)
+        for start, chunk, i, j in store.iter_chunks(self._scanned, stop):
+            mask = self.frame_filter.mask(chunk.can_id[i:j], chunk.dlc[i:j], chunk.data[i:j])
+            hits = np.flatnonzero(mask)
+            if len(hits):
+                self._append_hits(hits + start)
+        self._scanned = max(self._scanned, stop)
+
+        new_rows = self._end - self._first - self._rows
+        if new_rows > 0:
+            self.beginInsertRows(QModelIndex(), self._rows, self._rows + new_rows - 1)
+            self._rows += new_rows
+            self.endInsertRows()
+            return True
+        return False
+
+
+class TraceView(QWidget):
+    """
+    트레이스 테이블과 자동 스크롤 옵션을 묶은 위젯.
+    refresh()를 UI 갱신 주기마다 호출하면 새 프레임을 한 번에 반영하고 필요 시 맨 아래로 스크롤합니다.
+    """
+    def __init__(self, store, parser=None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.parser = parser
+        self.model = TraceTableModel(store, parser, self)
+        # 필터 적용 시 남은 프레임을 UI 이벤트 사이사이에 나누어 검사
+        self.scan_timer = QTimer(self)
+        self.scan_timer.setInterval(0)
+        self.scan_timer.timeout.connect(self.refresh)
+
+        layout = QVBoxLayout(self)
+        option_layout = QHBoxLayout()
+        self.auto_scroll = QCheckBox("Auto Scroll")
+        self.auto_scroll.setChecked(True)
+        self.count_label = QLabel("0 frames")
+        option_layout.addWidget(self.auto_scroll)
+        option_layout.addStretch()
+        option_layout.addWidget(self.count_label)
+        layout.addLayout(option_layout)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setWordWrap(False)
+        # 행 높이를 고정하고 세로 헤더를 숨겨 수백만 행에서도 레이아웃 계산이 없도록 함
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(20)
+        self.table.verticalHeader().hide()
+        header = self.table.horizontalHeader()
+        for column, width in enumerate([90, 110, 40, 80, 40, 200]):
+            header.resizeSection(column, width)
+        header.setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+    def set_filter(self, frame_filter):
+        """
+        can_filter.compile_filter()로 만든 필터를 적용합니다. None이면 전체 프레임을 보여줍니다.
+        """
+        if frame_filter is None:
+            self.model = TraceTableModel(self.store, self.parser, self)
+        else:
+            self.model = FilteredTraceModel(self.store, frame_filter, self.parser, self)
+        self.table.setModel(self.model)
+        self.refresh()
+
+    def refresh(self):
+        """
+        새 프레임을 뷰에 반영합니다. (UI 타이머에서 주기적으로 호출)
+        새 행이 생겼으면 True를 반환합니다.
+        """
+        changed = self.model.sync()
+        scanning = getattr(self.model, "scanning", False)
+        if scanning:
+            self.scan_timer.start()
+        else:
+            self.scan_timer.stop()
+        if changed or isinstance(self.model, FilteredTraceModel):
+            self._update_count_label()
+        if changed and self.auto_scroll.isChecked():
+            self.table.scrollToBottom()
+        return changed
+
+    def _update_count_label(self):
+        if isinstance(self.model, FilteredTraceModel):
+            text = f"{self.model.rowCount()} / {len(self.store)} frames"
+            if self.model.scanning:
+                text += f" (filtering {self.model.progress:.0%})"
+            self.count_label.setText(text)
+        else:
+            self.count_label.setText(f"{len(self.store)} frames")
+
+    def clear(self):
+        """트레이스를 비웁니다."""
+        self.store.clear()
+        self.refresh()
+        self._update_count_label()
@@ -0,0 +1,190 @@
+"""
+CAN 송신 큐.
+
+GUI/주행 제어/스크립트 재생 코드는 TransmitQueue.send()로 프레임을 넣기만 하고 실제
+bus.send()는 송신 스레드가 수행하므로, SocketCAN 송신 버퍼가 가득 차도 호출한 쪽이
+멈추거나 예외를 받지 않습니다.
+- 같은 ID의 프레임이 아직 대기 중이면 새 프레임으로 바꿉니다 (coalescing, 순서는 유지).
+- ID별 최대 송신 빈도(Hz)를 넘는 프레임은 다음 허용 시각까지 기다립니다.
+- on_sent를 주면 프레임이 실제로 버스에 나간 시각(perf_counter)으로 송신 스레드에서 부릅니다.
+  대기 중 같은 ID의 새 프레임으로 바뀌면 새 프레임이 나갈 때 부릅니다.
+- ENOBUFS(송신 버퍼 가득 참)는 backoff를 두 배씩 늘리며 max_retries번까지 다시 보내고,
+  그래도 실패하면 버립니다. 그 외 송신 오류와 on_sent에서 난 예외는 take_error()로 알리고
+  송신 스레드는 계속 동작합니다.
+"""
+import errno
+import threading
+import time
+from collections import deque
+
+import can
+
+RETRY_ERRNOS = (errno.ENOBUFS, errno.EAGAIN)
+
+
+def is_buffer_full(error):
+    """송신 버퍼가 가득 차서 난 오류(잠시 후 다시 보내면 되는 오류)인지 여부."""
+    if not isinstance(error, can.CanOperationError):
+        return False
+    return error.error_code in RETRY_ERRNOS or "buffer full" in str(error)
+
+
+class TransmitQueue:
+    """
+    ID별 coalescing, 송신 빈도 제한, ENOBUFS 재시도를 하는 송신 스레드.
+    rate_limits는 {CAN ID: 최대 Hz}. 송신한 프레임은 송신 시각을 timestamp로 담아
+    sent_frames에 쌓이며, GUI 스레드가 꺼내 트레이스에 기록합니다.
+    """
+    def __init__(self, bus, rate_limits=None, max_retries=5, backoff=0.001, max_backoff=0.05):
+        self.bus = bus
+        self.min_interval = {can_id: 1.0 / hz for can_id, hz in (rate_limits or {}).items() if hz > 0}
+        self.max_retries = max_retries
+        self.backoff = backoff # 첫 재시도 대기 시간 (초)
+        self.max_backoff = max_backoff
+        self.sent_frames = deque() # 송신 완료한 can.Message (트레이스 기록용)
+        self._cond = threading.Condition()
+        self._pending = {} # 키 -> (can.Message, 넣은 시각, on_sent 목록). dict 순서가 송신 순서
+        self._last_sent = {} # CAN ID -> 마지막 송신 시각 (perf_counter)
+        self._sequence = 0 # coalescing하지 않는 프레임의 키
+        self._thread = None
+        self._in_flight = False # 송신 스레드가 대기열에서 꺼낸 프레임을 보내는 중
+        self._closing = False
+        self._error = None
+        # 통계
+        self.sent = 0
+        self.dropped = 0 # 재시도 후에도 보내지 못했거나 오류로 버린 프레임
+        self.coalesced = 0 # 대기 중 같은 ID의 새 프레임으로 바뀐 프레임
+        self.retried = 0
+        self.delay_total = 0.0 # 넣은 시각부터 송신 완료까지 시간 합 (초)
+        self.delay_max = 0.0
+
+    def __len__(self):
+        with self._cond:
+            return len(self._pending)
+
+    def send(self, msg, coalesce=True, on_sent=None):
+        """
+        프레임을 송신 대기열에 넣습니다. 호출한 쪽이 data 버퍼를 재사용해도 되도록 복사합니다.
+        coalesce=False이면 같은 ID의 대기 프레임을 바꾸지 않고 뒤에 추가합니다.
+        on_sent(송신 시각)는 송신 스레드에서 불리며, 프레임을 버리면 불리지 않습니다.
+        """
+        frame = can.Message(arbitration_id=msg.arbitration_id, data=bytes(msg.data),
+                            is_extended_id=msg.is_extended_id, is_remote_frame=msg.is_remote_frame,
+                            dlc=msg.dlc)
+        callbacks = []
+        with self._cond:
+            if coalesce:
+                key = msg.arbitration_id
+                replaced = self._pending.get(key)
+                if replaced is not None:
+                    self.coalesced += 1
+                    callbacks = replaced[2] # 바뀐 프레임의 on_sent는 새 프레임이 나갈 때 부름
+            else:
+                self._sequence += 1
+                key = (msg.arbitration_id, self._sequence)
+            if on_sent is not None:
+                callbacks = callbacks + [on_sent]
+            self._pending[key] = (frame, time.perf_counter(), callbacks)
+            self._cond.notify()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="TransmitQueue", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=0.5):
+        """
+        대기 중인 프레임을 timeout초까지 보내고 송신 스레드를 멈춥니다. 남은 프레임은 버립니다.
+        그동안 ENOBUFS로 재시도 중인 프레임도 계속 재시도합니다.
+        """
+        if self._thread is None:
+            return
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while (self._pending or self._in_flight) and time.perf_counter() < deadline:
+                self._cond.wait(0.01)
+            self._closing = True
+            self.dropped += len(self._pending)
+            self._pending.clear()
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
+
+    def take_error(self):
+        """송신 스레드에서 발생한 (재시도 대상이 아닌) 송신 오류나 on_sent 예외를 한 번만 반환합니다."""
+        error, self._error = self._error, None
+        return error
+
+    def stats_text(self):
+        """상태 표시줄용 요약 문자열."""
+        mean = self.delay_total / self.sent if self.sent else 0.0
+        return (f"TX sent {self.sent}, dropped {self.dropped}, coalesced {self.coalesced}, "
+                f"retried {self.retried}, delay {mean * 1000:.2f}/{self.delay_max * 1000:.2f} ms")
+
+    def _next(self, now):
+        """지금 보낼 수 있는 첫 프레임의 키와, 없으면 다음에 확인할 시각을 반환합니다."""
+        wake = None
+        for key, (frame, _, _) in self._pending.items():
+            interval = self.min_interval.get(frame.arbitration_id)
+            if interval:
+                ready = self._last_sent.get(frame.arbitration_id, float("-inf")) + interval
+                if ready > now:
+                    wake = ready if wake is None else min(wake, ready)
+                    continue
+            return key, None
+        return None, wake
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closing:
+                        return
+                    now = time.perf_counter()
+                    key, wake = self._next(now)
+                    if key is not None:
+                        frame, queued, callbacks = self._pending.pop(key)
+                        self._in_flight = True
+                        break
+                    self._cond.wait(None if wake is None else wake - now)
+            self._transmit(frame, queued, callbacks)
+            with self._cond:
+                self._in_flight = False
+                self._cond.notify_all() # stop()이 대기열이 비기를 기다리는 중일 수 있음
+
+    def _transmit(self, frame, queued, callbacks):
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.bus.send(frame)
+                break
+            except can.CanError as e:
+                if is_buffer_full(e) and attempt < self.max_retries and not self._closing:
+                    self.retried += 1
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_backoff)
+                    continue
+                self.dropped += 1
+                if not is_buffer_full(e):
+                    self._error = e
+                return
+            except Exception as e: # 인터페이스 드라이버의 예기치 않은 예외도 스레드를 멈추지 않게 함
+                self.dropped += 1
+                self._error = e
+                return
+        now = time.perf_counter()
+        self._last_sent[frame.arbitration_id] = now
+        self.sent += 1
+        waited = now - queued
+        self.delay_total += waited
+        if waited > self.delay_max:
+            self.delay_max = waited
+        frame.timestamp = time.time()
+        self.sent_frames.append(frame)
+        for callback in callbacks:
+            try:
+                callback(now)
+            except Exception as e:
+                self._error = e
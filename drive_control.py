@@ -0,0 +1,185 @@
+"""
+고정 주기 주행 제어 루프.
+
+UI(슬라이더 등)는 set_target()으로 목표 속도/조향각만 바꾸고, 실제 송신은 별도 스레드가
+rate_hz 주기로 한 번씩 수행합니다. 주기 사이에 목표가 여러 번 바뀌어도 마지막 값만
+반영되므로 버스 부하는 rate_hz x 프레임 수로 고정됩니다.
+송신 값은 가속/감속 한계(km/h/s)와 조향 속도 한계(deg/s)를 넘지 않도록 목표를 향해
+조금씩 움직입니다 (slew rate limit).
+
+워치독: GUI는 타이머마다 heartbeat()를 호출합니다. 마지막 heartbeat 후 gui_deadline초가
+지나거나(GUI 스레드 멈춤) 제어 루프 자신이 loop_deadline초 넘게 늦게 깨어나면, 목표를
+속도 0(조향각 유지)으로 바꾸고 감속 한계 없이 바로 속도 0 프레임을 보냅니다. 이 판단과
+송신은 Qt 이벤트 루프와 무관한 제어 스레드에서 하므로 GUI가 멈춰 있어도 동작합니다.
+정지 후에는 운전자가 다시 목표를 바꿀 때까지 속도 0을 유지하며, 멈춘 시간은 stalls에
+기록되고 logging 경고로 남습니다.
+"""
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+def slew(current, target, max_step):
+    """current를 target 방향으로 최대 max_step만큼 움직인 값."""
+    if target > current + max_step:
+        return current + max_step
+    if target < current - max_step:
+        return current - max_step
+    return target
+
+
+class DriveController:
+    """
+    주행 명령 송신 스레드.
+    send(speed, angle)는 제어 스레드에서 호출되므로 GUI 객체를 직접 건드리면 안 됩니다.
+    송신 중 예외가 발생하면 루프를 멈추고 take_error()로 꺼낼 수 있게 보관합니다.
+    gui_deadline/loop_deadline이 None이면 해당 워치독을 끕니다.
+    """
+    def __init__(self, send, rate_hz=50, accel_limit=5.0, decel_limit=10.0, steer_rate_limit=20.0,
+                 gui_deadline=0.5, loop_deadline=0.2):
+        self.send = send
+        self.rate_hz = rate_hz
+        self.accel_limit = accel_limit # 속도 크기가 커질 때 최대 변화율 (km/h/s)
+        self.decel_limit = decel_limit # 속도 크기가 작아질 때 최대 변화율 (km/h/s)
+        self.steer_rate_limit = steer_rate_limit # 조향각 최대 변화율 (deg/s)
+        self._lock = threading.Lock()
+        self._target = (0.0, 0.0)
+        self.speed = 0.0 # 마지막으로 송신한 속도 (km/h)
+        self.angle = 0.0 # 마지막으로 송신한 조향각 (deg)
+        self._thread = None
+        self._stop = threading.Event()
+        self._error = None
+        self.cycles = 0 # 송신 주기 수
+        self.overruns = 0 # 다음 주기를 놓친 횟수
+        self.max_lateness = 0.0 # 예정 시각보다 늦게 송신한 최대 시간 (초)
+        self.gui_deadline = gui_deadline # heartbeat 없이 허용하는 시간 (초)
+        self.loop_deadline = loop_deadline # 제어 루프가 늦게 깨어나도 허용하는 시간 (초)
+        self.stalls = [] # (종류 "GUI"/"loop", 시작 시각 time.time(), 멈춘 시간 초)
+        self._heartbeat = time.perf_counter()
+        self._gui_stall = None # 진행 중인 GUI 멈춤의 (시작 perf_counter, 시작 time.time())
+        self._reported = 0 # take_stalls()로 이미 꺼낸 stalls 개수
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def target(self):
+        with self._lock:
+            return self._target
+
+    def set_target(self, speed, angle):
+        """목표 속도/조향각을 바꿉니다. 다음 주기부터 한계 안에서 목표를 따라갑니다."""
+        with self._lock:
+            self._target = (float(speed), float(angle))
+
+    def stop_vehicle(self):
+        """목표와 현재 송신 값을 모두 0으로 만듭니다 (정지 버튼은 감속 한계를 적용하지 않음)."""
+        with self._lock:
+            self._target = (0.0, 0.0)
+            self.speed = 0.0
+            self.angle = 0.0
+
+    @property
+    def failsafe(self):
+        """GUI 멈춤으로 정지 명령을 보내는 중인지 여부."""
+        return self._gui_stall is not None
+
+    def heartbeat(self):
+        """GUI 스레드가 살아 있음을 알립니다. GUI 타이머에서 주기적으로 호출합니다."""
+        self._heartbeat = time.perf_counter()
+
+    def take_stalls(self):
+        """지난 호출 이후 끝난 멈춤 기록 목록을 반환합니다."""
+        stalls = self.stalls[self._reported:]
+        self._reported += len(stalls)
+        return stalls
+
+    def _enter_failsafe(self):
+        """목표 속도를 0으로 바꾸고 감속 한계 없이 바로 속도 0을 보내게 합니다 (조향각은 유지)."""
+        with self._lock:
+            self._target = (0.0, self._target[1])
+            self.speed = 0.0
+
+    def _record_stall(self, kind, started, duration):
+        self.stalls.append((kind, started, duration))
+        log.warning("%s 멈춤 %.0f ms - 속도 0 명령 송신", kind, duration * 1000)
+
+    def _check_watchdog(self, now, late):
+        """heartbeat 경과 시간과 루프 지연을 확인하여 필요하면 정지 상태로 바꿉니다."""
+        if self.loop_deadline is not None and late > self.loop_deadline:
+            self._enter_failsafe()
+            self._record_stall("loop", time.time() - late, late)
+        if self.gui_deadline is None:
+            return
+        age = now - self._heartbeat
+        if self._gui_stall is None:
+            if age > self.gui_deadline:
+                self._enter_failsafe()
+                self._gui_stall = (now - age, time.time() - age)
+        elif age <= self.gui_deadline:
+            started, started_wall = self._gui_stall
+            self._gui_stall = None
+            self._record_stall("GUI", started_wall, self._heartbeat - started)
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._error = None
+        self._heartbeat = time.perf_counter()
+        self._gui_stall = None
+        self._thread = threading.Thread(target=self._run, name="DriveController", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """루프를 멈추고 스레드가 끝날 때까지 기다립니다."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def take_error(self):
+        """제어 스레드에서 발생한 예외를 한 번만 반환합니다 (없으면 None)."""
+        error, self._error = self._error, None
+        return error
+
+    def step(self, dt):
+        """dt초 동안 한계 안에서 목표 쪽으로 움직인 (speed, angle)을 반환합니다."""
+        with self._lock:
+            target_speed, target_angle = self._target
+            speed = self.speed
+            # 목표가 현재보다 0에서 멀어지는 쪽(같은 부호)이면 가속, 그 외에는 감속 한계
+            if speed * target_speed >= 0 and abs(target_speed) > abs(speed):
+                speed = slew(speed, target_speed, self.accel_limit * dt)
+            else:
+                speed = slew(speed, target_speed, self.decel_limit * dt)
+            self.speed = speed
+            self.angle = slew(self.angle, target_angle, self.steer_rate_limit * dt)
+            return self.speed, self.angle
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        deadline = time.perf_counter()
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            late = now - deadline
+            if late > period:
+                # 주기를 놓치면 밀린 주기를 몰아서 보내지 않고 지금부터 다시 맞춤
+                self.overruns += 1
+                self.max_lateness = max(self.max_lateness, late)
+                deadline = now
+            self._check_watchdog(now, late)
+            speed, angle = self.step(period)
+            try:
+                self.send(speed, angle)
+            except Exception as e:
+                self._error = e
+                return
+            self.cycles += 1
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
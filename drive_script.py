@@ -0,0 +1,243 @@
+"""
+주행 스크립트(시간, 속도, 조향각, 방향지시등, 기어) 재생기.
+
+스크립트는 CSV(헤더: time,speed,angle[,indicator][,gear]) 또는 JSON(같은 키를 가진
+객체 목록, 또는 {"loop": true, "steps": [...]})으로 작성합니다. time은 시작부터의 초입니다.
+
+DriveScriptPlayer는 각 단계를 계획 시각에 맞추어 송신 큐에 넣습니다. 계획 시각 약 2ms 전까지는
+잠들고 나머지는 perf_counter를 확인하며 기다리므로 큐에 넣는 시각 오차가 1ms보다 작습니다.
+단계 사이에는 hold_period마다 마지막 명령을 반복 송신하여 차량 쪽 명령이 끊기지 않게 하고,
+단계마다 계획 시각, 큐에 넣은 시각, 송신 큐가 실제로 버스에 보낸 시각을 log에 남깁니다.
+"""
+import csv
+import json
+import sys
+import threading
+import time
+
+from PyQt6.QtCore import QThread
+
+GEARS = {"P": 0, "D": 1, "N": 2, "R": 3}
+INDICATORS = {"NONE": 0x00, "LEFT": 0xF1, "RIGHT": 0xF2}
+SPIN_SECONDS = 0.002 # 계획 시각 직전에 잠들지 않고 기다리는 시간
+# 재생 중 GIL 전환 주기 (기본 5ms). GUI 스레드가 GIL을 오래 잡고 있어도 재생 스레드와
+# 송신 큐 스레드가 1ms 안에 깨어나도록 재생하는 동안만 줄입니다. sys.setswitchinterval은
+# 프로세스 전체 설정이라 GUI를 포함한 모든 스레드에 적용되며 의도한 것입니다 (재생 중에는
+# GIL 전환이 잦아져 CPU 사용량이 조금 늘고, 재생이 끝나면 원래 값으로 돌아갑니다).
+SWITCH_INTERVAL = 0.0005
+
+
+class DriveStep:
+    """스크립트 한 단계. indicator/gear가 None이면 속도/조향각으로 자동 결정합니다."""
+    __slots__ = ("time", "speed", "angle", "indicator", "gear")
+
+    def __init__(self, time, speed, angle, indicator=None, gear=None):
+        self.time = time
+        self.speed = speed
+        self.angle = angle
+        self.indicator = indicator
+        self.gear = gear
+
+
+def _parse_choice(value, names, what, where):
+    """'D', 'left', '1', '0xF1' 같은 값을 정수로 변환합니다. 빈 값은 None."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        key = value.strip().upper()
+        if key in names:
+            return names[key]
+        try:
+            return int(key, 0)
+        except ValueError:
+            raise ValueError(f"{where}: 알 수 없는 {what} 값 '{value}'")
+    return int(value)
+
+
+def _make_step(row, where):
+    try:
+        step = DriveStep(float(row["time"]), float(row["speed"]), float(row["angle"]))
+    except KeyError as e:
+        raise ValueError(f"{where}: '{e.args[0]}' 값이 없습니다.")
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: time/speed/angle은 숫자여야 합니다.")
+    step.indicator = _parse_choice(row.get("indicator"), INDICATORS, "indicator", where)
+    step.gear = _parse_choice(row.get("gear"), GEARS, "gear", where)
+    if step.gear is not None and step.gear not in GEARS.values():
+        raise ValueError(f"{where}: gear는 P/D/N/R 또는 0~3이어야 합니다.")
+    return step
+
+
+def load_drive_script(path):
+    """
+    주행 스크립트 파일을 읽어 (단계 목록, loop 여부)를 반환합니다.
+    형식이 잘못되었으면 ValueError를 발생시킵니다.
+    """
+    loop = False
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                doc = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON 형식 오류: {e}")
+        if isinstance(doc, dict):
+            loop = bool(doc.get("loop", False))
+            doc = doc.get("steps")
+        if not isinstance(doc, list):
+            raise ValueError("JSON 스크립트는 단계 목록 또는 {\"steps\": [...]} 형식이어야 합니다.")
+        rows = [(f"{i + 1}번째 단계", row) for i, row in enumerate(doc)]
+        for where, row in rows:
+            if not isinstance(row, dict):
+                raise ValueError(f"{where}: 객체가 아닙니다.")
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            rows = [(f"{reader.line_num}행", {k.strip().lower(): v.strip() for k, v in row.items() if k})
+                    for row in reader]
+    steps = [_make_step(row, where) for where, row in rows]
+    if not steps:
+        raise ValueError("스크립트에 단계가 없습니다.")
+    for (where, _), prev, step in zip(rows[1:], steps, steps[1:]):
+        if step.time < prev.time:
+            raise ValueError(f"{where}: time은 증가하는 순서여야 합니다.")
+    if steps[0].time < 0:
+        raise ValueError("time은 0 이상이어야 합니다.")
+    return steps, loop
+
+
+class DriveScriptPlayer(QThread):
+    """
+    주행 스크립트 재생 스레드.
+    send(speed, angle, indicator, gear, on_sent=None)는 재생 스레드에서 호출되며, 단계 명령에는
+    on_sent(송신 시각, perf_counter 기준)를 넘겨 명령이 실제로 버스에 나간 시각을 받습니다.
+    일시정지 중에는 조향각은 유지하고 속도 0 명령을 반복 송신하며, 재개하면 멈춘 시간만큼
+    계획 시각을 미룹니다. abort()는 정지 명령(속도 0, 조향각 0)을 보낸 뒤 재생을 끝냅니다.
+    """
+    def __init__(self, steps, send, hold_period=0.02, loop=False, parent=None):
+        super().__init__(parent)
+        self.steps = steps
+        self.send = send
+        self.hold_period = hold_period
+        self.loop = loop
+        self.duration = steps[-1].time # 반복 재생 시 한 바퀴 길이
+        # [반복 회차, 단계 번호, 계획 시각, 큐에 넣은 시각, 송신 시각] - 재생 시작 기준 초
+        # 송신 시각은 송신 큐 스레드가 채우며, 아직 나가지 않았거나 버려졌으면 None
+        self.log = []
+        self.error = None
+        self.position = 0 # 다음에 보낼 단계 번호
+        self.iteration = 0
+        self._wake = threading.Event()
+        self._paused = False
+        self._aborted = False
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def pause(self):
+        self._paused = True
+        self._wake.set()
+
+    def resume(self):
+        self._paused = False
+        self._wake.set()
+
+    def abort(self):
+        self._aborted = True
+        self._wake.set()
+
+    def _wait_until(self, deadline):
+        """deadline(perf_counter 기준)까지 기다립니다. 일시정지/중단 요청이 오면 False."""
+        while True:
+            if self._aborted or self._paused:
+                return False
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return True
+            if remaining > SPIN_SECONDS:
+                self._wake.wait(remaining - SPIN_SECONDS)
+                self._wake.clear()
+
+    def lateness(self):
+        """(평균, 최대) 계획 대비 버스 송신 지연 (초). 송신된 기록이 없으면 (0, 0)."""
+        late = [sent - planned for _, _, planned, _, sent in self.log if sent is not None]
+        if not late:
+            return 0.0, 0.0
+        return sum(late) / len(late), max(late, key=abs)
+
+    def status_text(self):
+        mean, worst = self.lateness()
+        state = "paused" if self._paused else "playing"
+        return (f"Script {state} {self.position}/{len(self.steps)} (loop {self.iteration + 1}), "
+                f"late mean {mean * 1000:.3f} ms, max {worst * 1000:.3f} ms")
+
+    def save_log(self, path):
+        """
+        계획 대비 송신 시각 기록을 CSV로 저장합니다. late_ms는 버스 송신 시각 기준이며,
+        보내지 못한 단계는 sent_s/late_ms가 비어 있습니다.
+        """
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["loop", "step", "planned_s", "queued_s", "sent_s", "late_ms"])
+            for iteration, index, planned, queued, sent in self.log:
+                if sent is None:
+                    writer.writerow([iteration, index, f"{planned:.6f}", f"{queued:.6f}", "", ""])
+                else:
+                    writer.writerow([iteration, index, f"{planned:.6f}", f"{queued:.6f}", f"{sent:.6f}",
+                                     f"{(sent - planned) * 1000:.3f}"])
+
+    def run(self):
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(SWITCH_INTERVAL)
+        try:
+            self._play()
+        except Exception as e:
+            self.error = e
+        finally:
+            sys.setswitchinterval(switch_interval)
+            if self.error is None or self._aborted:
+                try:
+                    self.send(0.0, 0.0, None, None)
+                except Exception as e:
+                    self.error = self.error or e
+
+    def _play(self):
+        steps = self.steps
+        start = time.perf_counter()
+        offset = 0.0 # 일시정지/반복으로 밀린 시간
+        current = None # 마지막으로 보낸 단계 (단계 사이 반복 송신용)
+        last_send = start
+        while not self._aborted:
+            if self._paused:
+                paused_at = time.perf_counter()
+                hold_angle = current.angle if current else 0.0
+                while self._paused and not self._aborted:
+                    self.send(0.0, hold_angle, None, None)
+                    self._wake.wait(self.hold_period)
+                    self._wake.clear()
+                offset += time.perf_counter() - paused_at
+                last_send = time.perf_counter()
+                continue
+            if self.position >= len(steps):
+                if not self.loop or self.duration <= 0:
+                    return
+                self.iteration += 1
+                self.position = 0
+                offset += self.duration
+            step = steps[self.position]
+            planned = start + offset + step.time
+            next_hold = last_send + self.hold_period
+            if current is not None and next_hold < planned:
+                if self._wait_until(next_hold):
+                    self.send(current.speed, current.angle, current.indicator, current.gear)
+                    last_send = next_hold
+                continue
+            if not self._wait_until(planned):
+                continue
+            entry = [self.iteration, self.position, planned - start, time.perf_counter() - start, None]
+            self.log.append(entry)
+            self.send(step.speed, step.angle, step.indicator, step.gear,
+                      lambda sent, entry=entry: entry.__setitem__(4, sent - start))
+            current = step
+            last_send = planned
+            self.position += 1
@@ -0,0 +1,48 @@
+"""
+측정한 화면 갱신 비용에 따라 UI 갱신 주기를 조절하는 governor.
+
+갱신 한 번에 걸린 모델 갱신 시간과 그리기 시간을 지수 이동 평균으로 추적하고,
+그 합이 갱신 주기의 budget 비율을 넘지 않도록 주기를 min_hz ~ max_hz 사이에서
+늘리거나 줄입니다. 저사양 차량용 PC에서는 자동으로 갱신 빈도가 낮아져 이벤트 루프가
+입력 처리와 CAN 수신에 쓸 시간이 남게 됩니다.
+"""
+
+
+class RefreshGovernor:
+    """
+    UI 갱신 주기 조절기.
+    record()로 갱신 비용을 넘기면 interval_ms가 다음 갱신 주기를 알려줍니다.
+    """
+    def __init__(self, min_hz=5, max_hz=60, budget=0.3, smoothing=0.2):
+        self.min_interval = 1.0 / max_hz
+        self.max_interval = 1.0 / min_hz
+        self.budget = budget # 갱신 주기 중 UI 갱신에 쓸 수 있는 시간 비율
+        self.smoothing = smoothing # 이동 평균 가중치 (클수록 최근 측정값을 빨리 반영)
+        self.update_cost = 0.0 # 모델 갱신 시간 평균 (초)
+        self.paint_cost = 0.0 # 그리기 시간 평균 (초)
+        self.interval = self.min_interval
+
+    def record(self, update_seconds, paint_seconds):
+        """갱신 한 번의 측정값을 반영하고 다음 주기(초)를 반환합니다."""
+        a = self.smoothing
+        self.update_cost += a * (update_seconds - self.update_cost)
+        self.paint_cost += a * (paint_seconds - self.paint_cost)
+        target = (self.update_cost + self.paint_cost) / self.budget
+        # 느려질 때는 바로, 빨라질 때는 천천히 따라가서 주기가 흔들리지 않도록 함
+        if target < self.interval:
+            target = self.interval + a * (target - self.interval)
+        self.interval = min(max(target, self.min_interval), self.max_interval)
+        return self.interval
+
+    @property
+    def interval_ms(self):
+        return int(round(self.interval * 1000))
+
+    @property
+    def rate_hz(self):
+        return 1.0 / self.interval
+
+    def status_text(self):
+        """상태 표시줄용 요약 문자열."""
+        return (f"UI {self.rate_hz:.0f} Hz (update {self.update_cost * 1000:.1f} ms, "
+                f"paint {self.paint_cost * 1000:.1f} ms)")